@@ -0,0 +1,14 @@
+"""
+Бенчмарки уровней: setup(), тик симуляции, коллизии и отрисовка слоев.
+
+Запуск из корня проекта:
+    python -m benchmarks
+    python -m benchmarks --save-baseline
+"""
+import os
+import sys
+
+# Уровни импортируют друг друга как модули из папки levels
+LEVELS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "levels")
+if LEVELS_DIR not in sys.path:
+    sys.path.append(LEVELS_DIR)
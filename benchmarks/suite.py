@@ -0,0 +1,265 @@
+"""
+Набор бенчмарков уровней и сравнение с сохраненной базой
+"""
+import argparse
+import json
+import os
+import sys
+
+import arcade
+import numpy as np
+
+from benchmarks.timing import measure
+from culling import ChunkCuller
+from headless import HeadlessRunner
+from swarm import WormSwarm
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# Насколько p50 может вырасти относительно базы, прежде чем считаться регрессией
+DEFAULT_TOLERANCE = 0.2
+
+# Слои, которые рисует on_draw уровней (в том же порядке)
+DRAW_LAYERS = [
+    "wall_list",
+    "background_list",
+    "ladder_list",
+    "coin_list",
+    "door_list",
+    "enemy_list",
+    "spike_list",
+    "player_list",
+]
+
+# Слои, которые on_draw рисует через отсечение по чанкам
+CULLED_LAYERS = ["wall_list", "background_list", "ladder_list", "coin_list", "spike_list"]
+
+
+# Сколько слизней добавляет бенчмарк "много врагов"
+EXTRA_ENEMIES = 300
+
+
+def add_enemies(game, count):
+    """Расставляет еще count слизней по уровню вдали от игрока"""
+    from level_2 import WormEnemy
+
+    y = game.enemy_list[0].center_y
+    for x in np.linspace(1000, game.end_of_map - 100, count).tolist():
+        enemy = WormEnemy()
+        enemy.position = (x, y)
+        game.enemy_list.append(enemy)
+    game.enemy_swarm = WormSwarm(game.enemy_list, game.timestep.dt)
+
+
+def make_runner(level_number, enemies=True, extra_enemies=0):
+    """Уровень без окна, интро пропущено, игрок стоит на земле"""
+    runner = HeadlessRunner(level_number, skip_intro=True)
+    if getattr(runner.game, "enemy_list", None) is not None:
+        if not enemies:
+            runner.game.enemy_list.clear()
+            runner.game.enemy_swarm = WormSwarm(runner.game.enemy_list, runner.game.timestep.dt)
+        elif extra_enemies:
+            add_enemies(runner.game, extra_enemies)
+    # Даем игроку приземлиться и камере доехать
+    runner.step(120)
+    return runner
+
+
+def setup_cases(level_number):
+    """Создание уровня: спрайты, текстуры, физический движок"""
+    from level_1 import PlayerCharacter
+
+    game = HeadlessRunner(level_number).game
+    return [
+        (f"setup.level{level_number}", game.setup, 50),
+        (f"setup.level{level_number}.player_character", PlayerCharacter, 100),
+    ]
+
+
+def update_cases(level_number):
+    """Один тик симуляции в установившемся режиме"""
+    cases = [(f"update.level{level_number}", make_runner(level_number).game.simulation_step, 600)]
+    if level_number == 2:
+        game = make_runner(level_number, enemies=False).game
+        cases.append((f"update.level{level_number}.no_enemies", game.simulation_step, 600))
+        game = make_runner(level_number, extra_enemies=EXTRA_ENEMIES).game
+        cases.append((f"update.level{level_number}.many_enemies", game.simulation_step, 600))
+    return cases
+
+
+def collision_cases(level_number):
+    """Проверки столкновений, которые уровень делает каждый тик"""
+    game = make_runner(level_number).game
+    player = game.player_sprite
+    engine = game.physics_engine
+    cases = []
+
+    for layer_name in ("coin_list", "wall_list", "enemy_list", "spike_list"):
+        layer = getattr(game, layer_name, None)
+        if layer is None:
+            continue
+        cases.append((
+            f"collision.level{level_number}.{layer_name}",
+            lambda layer=layer: arcade.check_for_collision_with_list(player, layer),
+            1000
+        ))
+
+    # То же через сетки broadphase, как проверяет уровень
+    for grid_name in ("coin_grid", "spike_grid"):
+        grid = getattr(game, grid_name, None)
+        if grid is None:
+            continue
+        cases.append((f"collision.level{level_number}.{grid_name}", lambda grid=grid: grid.collide(player), 1000))
+
+    swarm = getattr(game, "enemy_swarm", None)
+    if swarm is not None:
+        cases.append((f"collision.level{level_number}.enemy_swarm", lambda: swarm.collide(player), 1000))
+
+    cases.append((f"collision.level{level_number}.can_jump", engine.can_jump, 1000))
+    cases.append((f"collision.level{level_number}.is_on_ladder", engine.is_on_ladder, 1000))
+    return cases
+
+
+def draw_cases(level_number, window):
+    """Отрисовка каждого слоя мира отдельно (нужно окно с OpenGL)"""
+    from arcade.camera import Camera2D
+
+    game = make_runner(level_number).game
+    camera = Camera2D()
+    camera.position = game.world_camera.position
+    camera.use()
+
+    cases = []
+    for layer_name in DRAW_LAYERS:
+        layer = getattr(game, layer_name, None)
+        if layer is None:
+            continue
+
+        def draw_layer(layer=layer):
+            layer.draw()
+            window.ctx.finish()
+
+        cases.append((f"draw.level{level_number}.{layer_name}", draw_layer, 300))
+
+    # Слои уровня с отсечением по видимым чанкам, как в on_draw.
+    # Уровень без окна не ведет спрайт-листы чанков - перезагружаем чанки с ними
+    streamer = game.chunks
+    streamer.draw_lists = True
+    for key in list(streamer.loaded):
+        streamer.unload_chunk(key)
+    streamer.view_key = None
+    streamer.update(game.world_camera)
+    culler = ChunkCuller(streamer)
+
+    def draw_culled():
+        culler.begin(camera)
+        for layer_name in CULLED_LAYERS:
+            culler.draw(layer_name)
+        window.ctx.finish()
+
+    cases.append((f"draw.level{level_number}.culled_world", draw_culled, 300))
+
+    # То же со статичными слоями, запеченными в текстуры
+    baked_culler = ChunkCuller(streamer, bake=True)
+
+    def draw_baked():
+        baked_culler.begin(camera)
+        for layer_name in CULLED_LAYERS:
+            baked_culler.draw(layer_name)
+        window.ctx.finish()
+
+    cases.append((f"draw.level{level_number}.baked_world", draw_baked, 300))
+    return cases
+
+
+def create_window():
+    """Скрытое окно для замеров отрисовки; None, если OpenGL недоступен"""
+    from level_1 import SCREEN_WIDTH, SCREEN_HEIGHT
+
+    try:
+        return arcade.Window(SCREEN_WIDTH, SCREEN_HEIGHT, "benchmarks", visible=False)
+    except Exception as e:
+        print(f"Окно не создано, замеры отрисовки пропущены: {e}")
+        return None
+
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_baseline(path, results):
+    data = {result.name: result.to_dict() for result in results}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False, sort_keys=True)
+    print(f"База сохранена: {path}")
+
+
+def print_results(results, baseline, tolerance):
+    """Печатает таблицу и возвращает список регрессий"""
+    regressions = []
+    header = f"{'бенчмарк':<44} {'p50 мс':>9} {'p95 мс':>9} {'p99 мс':>9} {'КиБ':>8} {'блоки':>7}  база"
+    print(header)
+    print("-" * len(header))
+
+    for result in results:
+        line = (f"{result.name:<44} {result.p50:>9.4f} {result.p95:>9.4f} {result.p99:>9.4f} "
+                f"{result.alloc_kb:>8.1f} {result.blocks_per_call:>7.1f}")
+
+        base = baseline.get(result.name)
+        if baseline and not base:
+            line += "  нет в базе"
+        elif base and base["p50"] > 0:
+            ratio = result.p50 / base["p50"]
+            line += f"  x{ratio:.2f}"
+            if ratio > 1 + tolerance:
+                line += " МЕДЛЕННЕЕ"
+                regressions.append(result.name)
+        print(line)
+
+    return regressions
+
+
+def main():
+    """ Запуск бенчмарков """
+    parser = argparse.ArgumentParser(description="Бенчмарки уровней")
+    parser.add_argument("--filter", default="", help="запускать только бенчмарки, содержащие строку")
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 2, 3], help="номера уровней")
+    parser.add_argument("--no-draw", action="store_true", help="не замерять отрисовку")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="файл базы для сравнения")
+    parser.add_argument("--save-baseline", action="store_true", help="сохранить результаты как базу")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="допустимый рост p50 относительно базы (0.2 = 20%%)")
+    parser.add_argument("--check", action="store_true", help="код возврата 1 при регрессиях")
+    args = parser.parse_args()
+
+    window = None if args.no_draw else create_window()
+
+    cases = []
+    for level_number in args.levels:
+        cases += setup_cases(level_number)
+        cases += update_cases(level_number)
+        cases += collision_cases(level_number)
+        if window:
+            cases += draw_cases(level_number, window)
+
+    results = []
+    for name, func, repeat in cases:
+        if args.filter in name:
+            results.append(measure(name, func, repeat=repeat))
+
+    baseline = load_baseline(args.baseline)
+    if not baseline:
+        print(f"База не найдена ({args.baseline}), сравнение пропущено. "
+              f"Сохранить текущие результаты как базу: --save-baseline\n")
+    regressions = print_results(results, baseline, args.tolerance)
+
+    if args.save_baseline:
+        save_baseline(args.baseline, results)
+
+    if regressions:
+        print(f"\nРегрессии ({len(regressions)}): {', '.join(regressions)}")
+        if args.check:
+            sys.exit(1)
@@ -0,0 +1,96 @@
+"""
+Замер времени и памяти одного бенчмарка
+"""
+import gc
+import time
+import tracemalloc
+
+# Сколько вызовов делать под tracemalloc (он сильно замедляет код)
+ALLOCATION_SAMPLES = 50
+
+# Снимки не учитывают память самого tracemalloc и этого модуля
+SNAPSHOT_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+]
+
+
+def percentile(sorted_values, percent):
+    """Перцентиль по уже отсортированному списку (ближайший ранг)"""
+    if not sorted_values:
+        return 0.0
+    index = round(percent / 100 * (len(sorted_values) - 1))
+    return sorted_values[index]
+
+
+class BenchResult:
+    """Результат бенчмарка: время вызова в миллисекундах и аллокации"""
+
+    def __init__(self, name, samples_ms, alloc_kb, blocks_per_call):
+        self.name = name
+        self.samples = sorted(samples_ms)
+        self.p50 = percentile(self.samples, 50)
+        self.p95 = percentile(self.samples, 95)
+        self.p99 = percentile(self.samples, 99)
+        self.alloc_kb = alloc_kb
+        self.blocks_per_call = blocks_per_call
+
+    def to_dict(self):
+        return {
+            "p50": self.p50,
+            "p95": self.p95,
+            "p99": self.p99,
+            "alloc_kb": self.alloc_kb,
+            "blocks_per_call": self.blocks_per_call,
+        }
+
+
+def measure(name, func, repeat=300, warmup=30):
+    """
+    Вызывает func repeat раз и собирает статистику.
+
+    Время меряется без tracemalloc, потом отдельным коротким проходом
+    считаются пиковая память на вызов и число блоков памяти, которые
+    вызов выделил и оставил (по снимкам tracemalloc до и после вызова;
+    выделенные и освобожденные внутри вызова видны только в пике).
+    """
+    for _ in range(warmup):
+        func()
+
+    # --- Время ---
+    samples = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            samples.append((time.perf_counter() - start) * 1000.0)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    # --- Память ---
+    alloc_samples = []
+    block_samples = []
+    calls = min(repeat, ALLOCATION_SAMPLES)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        for _ in range(calls):
+            before = tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
+            tracemalloc.reset_peak()
+            current_before = tracemalloc.get_traced_memory()[0]
+            func()
+            peak = tracemalloc.get_traced_memory()[1]
+            after = tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
+            alloc_samples.append((peak - current_before) / 1024.0)
+            # Новые блоки по строкам кода, которые выделил вызов
+            stats = after.compare_to(before, "lineno")
+            block_samples.append(sum(stat.count_diff for stat in stats if stat.count_diff > 0))
+    finally:
+        tracemalloc.stop()
+
+    alloc_kb = percentile(sorted(alloc_samples), 50)
+    blocks_per_call = percentile(sorted(block_samples), 50)
+    return BenchResult(name, samples, alloc_kb, blocks_per_call)
@@ -0,0 +1,59 @@
+"""
+Область активности вокруг камеры.
+
+Сущности уровня обновляются, только пока находятся в прямоугольнике
+видимой области камеры, расширенном на запас (margin). Остальные
+спят: не двигаются и не анимируются, а при пробуждении сразу
+оказываются в том состоянии, в котором были бы (см. swarm.py).
+Так бюджет тика не зависит от длины уровня и числа врагов на нем.
+
+Запас можно задать переменной окружения PLATFORMER_ACTIVITY_MARGIN.
+"""
+import os
+
+import numpy as np
+
+# Запас вокруг видимой области камеры (пикселей)
+ACTIVITY_MARGIN = int(os.environ.get("PLATFORMER_ACTIVITY_MARGIN", "384"))
+
+
+class ActivityRegion:
+    """Прямоугольник вокруг камеры, в котором сущности живут"""
+
+    def __init__(self, margin=ACTIVITY_MARGIN):
+        self.margin = margin
+        self.left = self.bottom = self.right = self.top = 0.0
+        # Видимая область камеры (без запаса)
+        self.view = (0.0, 0.0, 0.0, 0.0)
+
+    def update(self, camera):
+        """Пересчитывает область по положению камеры"""
+        cam_x, cam_y = camera.position
+        half_w = camera.width / 2 + self.margin
+        half_h = camera.height / 2 + self.margin
+        self.left = cam_x - half_w
+        self.right = cam_x + half_w
+        self.bottom = cam_y - half_h
+        self.top = cam_y + half_h
+        self.view = (self.left + self.margin, self.bottom + self.margin,
+                     self.right - self.margin, self.top - self.margin)
+
+    @property
+    def rect(self):
+        """(left, bottom, right, top)"""
+        return self.left, self.bottom, self.right, self.top
+
+    def contains(self, left, bottom, right, top):
+        """Задевает ли прямоугольник область"""
+        return left < self.right and right > self.left and bottom < self.top and top > self.bottom
+
+    def mask(self, left, bottom, right, top):
+        """То же для массивов numpy: маска прямоугольников, задевающих область"""
+        return ((np.asarray(left) < self.right) & (np.asarray(right) > self.left)
+                & (np.asarray(bottom) < self.top) & (np.asarray(top) > self.bottom))
+
+    def view_mask(self, left, bottom, right, top):
+        """Маска прямоугольников, задевающих видимую область камеры"""
+        view_left, view_bottom, view_right, view_top = self.view
+        return ((np.asarray(left) < view_right) & (np.asarray(right) > view_left)
+                & (np.asarray(bottom) < view_top) & (np.asarray(top) > view_bottom))
@@ -0,0 +1,109 @@
+"""
+Общий на весь процесс кеш текстур и звуков.
+
+Текстура загружается с диска один раз и дальше раздается всем
+спрайтам, которым она нужна: игроку при каждом setup() и рестарте,
+каждому слизню, шипу, стене и монете. Звуки загружаются заранее
+и тоже не перечитываются при перезапуске уровня.
+"""
+import arcade
+from PIL import Image
+
+
+class AssetCache:
+    """Кеш текстур и звуков по пути файла и преобразованию"""
+
+    def __init__(self):
+        self.textures = {}
+        self.sounds = {}
+        self.hits = 0
+        self.misses = 0
+
+    def texture(self, path, flipped=False, hit_box_points=None):
+        """
+        Текстура по пути; flipped - зеркальная по горизонтали.
+        Масштаб в ключ не входит: он задается спрайту, а не текстуре.
+        hit_box_points - заранее посчитанный хитбокс (из скомпилированного
+        уровня), тогда он не считается по пикселям картинки.
+        """
+        key = (path, flipped)
+        texture = self.textures.get(key)
+        if texture is not None:
+            self.hits += 1
+            return texture
+
+        self.misses += 1
+        if flipped:
+            # Исходная текстура берется мимо счетчиков: это тот же промах
+            base = self.textures.get((path, False))
+            if base is None:
+                base = self._load_texture(path, hit_box_points)
+                self.textures[(path, False)] = base
+            texture = base.flip_horizontally()
+        else:
+            texture = self._load_texture(path, hit_box_points)
+        self.textures[key] = texture
+        return texture
+
+    @staticmethod
+    def _load_texture(path, hit_box_points=None):
+        """Загружает текстуру с диска"""
+        if hit_box_points:
+            file_path = arcade.resources.resolve(path)
+            image = Image.open(file_path).convert("RGBA")
+            texture = arcade.Texture(image, hit_box_points=hit_box_points)
+            texture.file_path = file_path
+            return texture
+        return arcade.load_texture(path)
+
+    def texture_pair(self, path):
+        """Пара текстур: оригинальная и зеркальная"""
+        return [self.texture(path), self.texture(path, flipped=True)]
+
+    def sound(self, path):
+        """Звук по пути, загружается целиком один раз"""
+        sound = self.sounds.get(path)
+        if sound is not None:
+            self.hits += 1
+            return sound
+
+        self.misses += 1
+        sound = arcade.load_sound(path)
+        self.sounds[path] = sound
+        return sound
+
+    def preload_sounds(self, paths):
+        """Загружает звуки заранее, чтобы первое проигрывание не читало диск"""
+        for path in paths:
+            if path not in self.sounds:
+                self.sound(path)
+
+    def sprite(self, path, scale=1.0):
+        """Спрайт с общей текстурой из кеша"""
+        return arcade.Sprite(self.texture(path), scale)
+
+    def stats(self):
+        """Счетчики кеша"""
+        return {
+            "textures": len(self.textures),
+            "sounds": len(self.sounds),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def clear(self):
+        """Очищает кеш и счетчики"""
+        self.textures.clear()
+        self.sounds.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+# Кеш процесса, его используют все уровни
+cache = AssetCache()
+
+get_texture = cache.texture
+get_texture_pair = cache.texture_pair
+get_sound = cache.sound
+preload_sounds = cache.preload_sounds
+make_sprite = cache.sprite
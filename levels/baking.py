@@ -0,0 +1,206 @@
+"""
+Запекание статичных слоев чанков в текстуры.
+
+Вместо спрайта на каждый тайл статичный слой чанка (static_layers.py)
+один раз рисуется в текстуру вне экрана, а дальше выводится одним
+прямоугольником. На широких уровнях из сотен одинаковых тайлов это
+несколько вызовов отрисовки на видимый чанк вместо тысяч вершин,
+что заметно на слабых видеокартах и программной отрисовке.
+
+Текстура покрывает только спрайты слоя в чанке, а не весь чанк.
+Запекается при первой отрисовке чанка и перезапекается, только если
+изменился спрайт-лист слоя: другой список или новая версия списка
+(static_layers.VersionedSpriteList считает изменения спрайтов и состава).
+Текстуры выгруженных чанков освобождаются.
+
+Включается переменной окружения PLATFORMER_BAKE_LAYERS=1.
+"""
+import math
+import os
+from array import array
+
+import arcade
+from arcade.camera import Camera2D
+from arcade.gl import BufferDescription
+from arcade.types import LBWH, LRBT
+
+from static_layers import STATIC_LAYERS
+
+# Запекать статичные слои по умолчанию
+BAKE_LAYERS = os.environ.get("PLATFORMER_BAKE_LAYERS", "0") not in ("", "0")
+
+# Прямоугольник с текстурой в мировых координатах (через матрицы камеры)
+BAKED_VERTEX_SHADER = """
+#version 330
+
+uniform WindowBlock {
+    mat4 projection;
+    mat4 view;
+} window;
+
+in vec2 in_vert;
+in vec2 in_uv;
+out vec2 v_uv;
+
+void main() {
+    gl_Position = window.projection * window.view * vec4(in_vert, 0.0, 1.0);
+    v_uv = in_uv;
+}
+"""
+
+BAKED_FRAGMENT_SHADER = """
+#version 330
+
+uniform sampler2D texture0;
+
+in vec2 v_uv;
+out vec4 f_color;
+
+void main() {
+    f_color = texture(texture0, v_uv);
+}
+"""
+
+# При запекании цвет умножается на альфу, а альфа накапливается как есть
+BAKE_BLEND = (arcade.gl.SRC_ALPHA, arcade.gl.ONE_MINUS_SRC_ALPHA, arcade.gl.ONE, arcade.gl.ONE_MINUS_SRC_ALPHA)
+
+# Запеченная текстура выводится с уже умноженной альфой
+DRAW_BLEND = (arcade.gl.ONE, arcade.gl.ONE_MINUS_SRC_ALPHA)
+
+
+class BakedLayer:
+    """Слой чанка, запеченный в текстуру"""
+
+    def __init__(self, ctx, program, sprite_list, bounds):
+        """
+        Args:
+            ctx: контекст OpenGL
+            program: шейдер вывода (общий для всех слоев)
+            sprite_list: спрайт-лист слоя в чанке
+            bounds: (left, bottom, right, top) в целых пикселях мира
+        """
+        self.source = sprite_list
+        self.count = len(sprite_list)
+        self.program = program
+
+        left, bottom, right, top = bounds
+        width = right - left
+        height = top - bottom
+        # Пиксель в пиксель мира: при целой позиции камеры картинка та же, что у спрайтов
+        self.texture = ctx.texture((width, height), components=4, filter=(ctx.NEAREST, ctx.NEAREST))
+        framebuffer = ctx.framebuffer(color_attachments=[self.texture])
+
+        # Камера, которая видит ровно прямоугольник слоя
+        camera = Camera2D(viewport=LBWH(0, 0, width, height),
+                          position=(left + width / 2, bottom + height / 2),
+                          projection=LRBT(-width / 2, width / 2, -height / 2, height / 2),
+                          render_target=framebuffer)
+        with camera.activate():
+            framebuffer.clear()
+            sprite_list.draw(blend_function=BAKE_BLEND)
+        framebuffer.delete()
+        # Версия после отрисовки: первая отрисовка сама записывает текстуры спрайтов
+        self.version = getattr(sprite_list, "version", None)
+
+        data = array("f", [
+            left, top, 0.0, 1.0,
+            left, bottom, 0.0, 0.0,
+            right, top, 1.0, 1.0,
+            right, bottom, 1.0, 0.0,
+        ])
+        self.geometry = ctx.geometry([BufferDescription(ctx.buffer(data=data), "2f 2f", ["in_vert", "in_uv"])],
+                                     mode=ctx.TRIANGLE_STRIP)
+
+    def is_stale(self, sprite_list):
+        """Изменился ли слой с момента запекания"""
+        return (sprite_list is not self.source
+                or len(sprite_list) != self.count
+                or getattr(sprite_list, "version", None) != self.version)
+
+    def draw(self, ctx):
+        """Выводит слой одним прямоугольником"""
+        ctx.enable(ctx.BLEND)
+        ctx.blend_func = DRAW_BLEND
+        self.texture.use(0)
+        self.geometry.render(self.program)
+        ctx.blend_func = ctx.BLEND_DEFAULT
+
+    def release(self):
+        """Освобождает текстуру"""
+        self.texture.delete()
+
+
+def layer_bounds(sprite_list):
+    """Прямоугольник, который покрывают текстуры спрайтов слоя (в целых пикселях)"""
+    left = bottom = math.inf
+    right = top = -math.inf
+    for sprite in sprite_list:
+        x, y = sprite.position
+        half_w = sprite.width / 2
+        half_h = sprite.height / 2
+        left = min(left, x - half_w)
+        right = max(right, x + half_w)
+        bottom = min(bottom, y - half_h)
+        top = max(top, y + half_h)
+    return math.floor(left), math.floor(bottom), math.ceil(right), math.ceil(top)
+
+
+class ChunkBaker:
+    """Запеченные статичные слои загруженных чанков"""
+
+    def __init__(self, ctx=None):
+        self.ctx = ctx
+        self.program = None
+        # (ключ чанка, имя спрайт-листа игры) -> BakedLayer
+        self.bakes = {}
+        self.baked = 0
+
+    def draw(self, key, list_name, sprite_list):
+        """
+        Рисует слой чанка из запеченной текстуры (запекает при необходимости).
+        Возвращает False, если слой не запекается и его надо рисовать спрайтами.
+        """
+        if list_name not in STATIC_LAYERS:
+            return False
+
+        baked = self.bakes.get((key, list_name))
+        if baked is None or baked.is_stale(sprite_list):
+            if baked is not None:
+                baked.release()
+            baked = self.bake(sprite_list)
+            if baked is None:
+                self.bakes.pop((key, list_name), None)
+                return False
+            self.bakes[(key, list_name)] = baked
+
+        baked.draw(self.ctx)
+        return True
+
+    def bake(self, sprite_list):
+        """Запекает спрайт-лист (None, если слой не влезает в текстуру)"""
+        if self.ctx is None:
+            self.ctx = arcade.get_window().ctx
+        if self.program is None:
+            self.program = self.ctx.program(vertex_shader=BAKED_VERTEX_SHADER,
+                                            fragment_shader=BAKED_FRAGMENT_SHADER)
+
+        left, bottom, right, top = layer_bounds(sprite_list)
+        max_size = self.ctx.info.MAX_TEXTURE_SIZE
+        if right - left > max_size or top - bottom > max_size:
+            return None
+
+        self.baked += 1
+        return BakedLayer(self.ctx, self.program, sprite_list, (left, bottom, right, top))
+
+    def prune(self, chunk_lists):
+        """Освобождает текстуры чанков, которых больше нет"""
+        for bake_key in [bake_key for bake_key in self.bakes if bake_key[0] not in chunk_lists]:
+            self.bakes.pop(bake_key).release()
+
+    def invalidate(self, key=None):
+        """Сбрасывает запеченные слои чанка (или все): они перезапекутся при отрисовке"""
+        for bake_key in [bake_key for bake_key in self.bakes if key is None or bake_key[0] == key]:
+            self.bakes.pop(bake_key).release()
+
+    def __len__(self):
+        return len(self.bakes)
@@ -0,0 +1,91 @@
+"""
+Broadphase проверок столкновений игрока с монетами и шипами.
+
+Спрайты разложены по ячейкам равномерной сетки BROADPHASE_CELL.
+Они добавляются один раз, когда загружается их чанк, и убираются при
+выгрузке или сборе. За тик игрок проверяется только со спрайтами из
+ячеек, которые он задевает, поэтому стоимость проверок не зависит от
+длины уровня. Враги проверяются отдельно (swarm.py).
+"""
+import arcade
+
+# Размер ячейки сетки (два тайла: игрок задевает не больше 2x2 ячеек)
+BROADPHASE_CELL = 128
+
+
+class SpatialGrid:
+    """Спрайты по ячейкам сетки"""
+
+    def __init__(self, cell_size=BROADPHASE_CELL):
+        self.cell_size = cell_size
+        # Ячейка -> спрайты (dict как упорядоченное множество: порядок обхода не зависит от запуска)
+        self.cells = {}
+        # Спрайт -> ячейки, в которых он лежит
+        self.sprite_cells = {}
+
+    def _cells_of(self, sprite):
+        # Прямоугольник текстуры, а не хитбокса: он покрывает хитбокс и считается
+        # без пересчета точек хитбокса (left/right спрайта в разы дороже)
+        size = self.cell_size
+        x, y = sprite.position
+        half_w = sprite.width / 2
+        half_h = sprite.height / 2
+        x0 = int((x - half_w) // size)
+        x1 = int((x + half_w) // size)
+        y0 = int((y - half_h) // size)
+        y1 = int((y + half_h) // size)
+
+        # Спрайт не больше ячейки - до 2x2 ячеек, собираем без циклов
+        if x1 - x0 <= 1 and y1 - y0 <= 1:
+            if x0 == x1:
+                return ((x0, y0),) if y0 == y1 else ((x0, y0), (x0, y1))
+            if y0 == y1:
+                return ((x0, y0), (x1, y0))
+            return ((x0, y0), (x1, y0), (x0, y1), (x1, y1))
+        return tuple((cx, cy) for cx in range(x0, x1 + 1) for cy in range(y0, y1 + 1))
+
+    def _insert(self, sprite, keys):
+        self.sprite_cells[sprite] = keys
+        for key in keys:
+            self.cells.setdefault(key, {})[sprite] = None
+
+    def add(self, sprite):
+        """Добавляет спрайт в ячейки, которые он задевает"""
+        self._insert(sprite, self._cells_of(sprite))
+
+    def remove(self, sprite):
+        """Убирает спрайт (если его нет - ничего не делает)"""
+        keys = self.sprite_cells.pop(sprite, None)
+        if keys is None:
+            return
+        for key in keys:
+            cell = self.cells[key]
+            del cell[sprite]
+            if not cell:
+                del self.cells[key]
+
+    def near(self, sprite):
+        """Спрайты из ячеек, которые задевает спрайт"""
+        keys = self._cells_of(sprite)
+        if len(keys) == 1:
+            return self.cells.get(keys[0], ())
+
+        found = {}
+        cells = self.cells
+        for key in keys:
+            cell = cells.get(key)
+            if cell:
+                found.update(cell)
+        return found
+
+    def collide(self, sprite):
+        """Спрайты сетки, с которыми сталкивается спрайт (как check_for_collision_with_list)"""
+        return [other for other in self.near(sprite) if arcade.check_for_collision(sprite, other)]
+
+    def clear(self):
+        """Убирает все спрайты"""
+        self.cells.clear()
+        self.sprite_cells.clear()
+
+    def __len__(self):
+        return len(self.sprite_cells)
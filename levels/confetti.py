@@ -0,0 +1,180 @@
+"""
+Конфетти экрана завершения уровня.
+
+Частицы хранятся в массивах numpy (позиция, скорость, время жизни,
+размер, цвет) и обновляются одним векторным шагом на тик. Рисуются
+одним вызовом: все частицы - точки одного буфера, круг вырезает
+фрагментный шейдер. Поэтому стоимость кадра почти не зависит от
+числа частиц - хоть сто, хоть десять тысяч.
+"""
+import arcade
+import numpy as np
+from pyglet.gl import GL_PROGRAM_POINT_SIZE
+
+from timestep import TICK_SCALE
+
+# Цвета конфетти
+CONFETTI_COLORS = np.array([
+    (255, 0, 0),  # RED
+    (0, 0, 255),  # BLUE
+    (0, 255, 0),  # GREEN
+    (255, 255, 0),  # YELLOW
+    (128, 0, 128),  # PURPLE
+    (255, 165, 0),  # ORANGE
+    (255, 192, 203),  # PINK
+    (0, 255, 255)  # CYAN
+], dtype=np.uint8)
+
+# Гравитация в пикс/тик^2
+CONFETTI_GRAVITY = 0.2 * TICK_SCALE ** 2
+
+# Вершина буфера: центр, диаметр в пикселях, цвет
+VERTEX_DTYPE = np.dtype([("pos", np.float32, 2), ("size", np.float32), ("color", np.uint8, 4)])
+
+POINT_VERTEX_SHADER = """
+#version 330
+
+uniform WindowBlock {
+    mat4 projection;
+    mat4 view;
+} window;
+
+in vec2 in_pos;
+in float in_size;
+in vec4 in_color;
+out vec4 v_color;
+
+void main() {
+    gl_Position = window.projection * window.view * vec4(in_pos, 0.0, 1.0);
+    gl_PointSize = in_size;
+    v_color = in_color;
+}
+"""
+
+POINT_FRAGMENT_SHADER = """
+#version 330
+
+in vec4 v_color;
+out vec4 f_color;
+
+void main() {
+    // Точка - квадрат, оставляем вписанный круг
+    vec2 offset = gl_PointCoord - vec2(0.5);
+    if (dot(offset, offset) > 0.25) {
+        discard;
+    }
+    f_color = v_color;
+}
+"""
+
+
+class ConfettiSystem:
+    """Частицы конфетти в массивах numpy"""
+
+    def __init__(self, capacity=100, seed=None):
+        """
+        Args:
+            capacity: сколько частиц помещается без перевыделения массивов
+            seed: зерно генератора случайных чисел
+        """
+        self.rng = np.random.default_rng(seed)
+        self.count = 0
+        self._allocate(capacity)
+
+        # Объекты OpenGL создаются при первой отрисовке (им нужно окно)
+        self.program = None
+        self.buffer = None
+        self.geometry = None
+
+    def _allocate(self, capacity):
+        count = self.count
+        old = getattr(self, "pos", None)
+        self.capacity = capacity
+        arrays = {
+            "pos": np.zeros((capacity, 2)),
+            "velocity": np.zeros((capacity, 2)),
+            "timer": np.zeros(capacity),
+            "lifetime": np.ones(capacity),
+            "size": np.zeros(capacity),
+            "color": np.zeros((capacity, 3), dtype=np.uint8),
+        }
+        for name, array in arrays.items():
+            if old is not None:
+                array[:count] = getattr(self, name)[:count]
+            setattr(self, name, array)
+        self.vertices = np.zeros(capacity, dtype=VERTEX_DTYPE)
+
+    def __len__(self):
+        return self.count
+
+    def spawn(self, xs, ys):
+        """Добавляет частицы в точках (xs, ys) со случайными скоростью, размером, цветом и временем жизни"""
+        xs = np.atleast_1d(np.asarray(xs, dtype=np.float64))
+        ys = np.atleast_1d(np.asarray(ys, dtype=np.float64))
+        n = len(xs)
+        start = self.count
+        end = start + n
+        if end > self.capacity:
+            self._allocate(max(end, self.capacity * 2))
+
+        rng = self.rng
+        self.pos[start:end, 0] = xs
+        self.pos[start:end, 1] = ys
+        self.velocity[start:end, 0] = rng.uniform(-3, 3, n) * TICK_SCALE
+        self.velocity[start:end, 1] = rng.uniform(2, 8, n) * TICK_SCALE
+        self.size[start:end] = rng.integers(3, 9, n)
+        self.lifetime[start:end] = rng.uniform(1.0, 2.5, n)
+        self.timer[start:end] = 0.0
+        self.color[start:end] = CONFETTI_COLORS[rng.integers(0, len(CONFETTI_COLORS), n)]
+        self.count = end
+
+    def spawn_random(self, n, left, bottom, right, top):
+        """Добавляет n частиц в случайных точках прямоугольника (целые координаты)"""
+        self.spawn(self.rng.integers(left, right + 1, n), self.rng.integers(bottom, top + 1, n))
+
+    def update(self, delta_time):
+        """Один тик: движение, гравитация, старение и удаление отживших"""
+        n = self.count
+        if not n:
+            return
+        pos = self.pos[:n]
+        velocity = self.velocity[:n]
+        pos += velocity
+        velocity[:, 1] -= CONFETTI_GRAVITY
+        self.timer[:n] += delta_time
+
+        alive = self.timer[:n] < self.lifetime[:n]
+        if not alive.all():
+            live = int(alive.sum())
+            for array in (self.pos, self.velocity, self.timer, self.lifetime, self.size, self.color):
+                array[:live] = array[:n][alive]
+            self.count = live
+
+    def draw(self):
+        """Рисует все частицы одним вызовом (камера интерфейса: 1 единица = 1 пиксель)"""
+        n = self.count
+        if not n:
+            return
+
+        ctx = arcade.get_window().ctx
+        if self.program is None:
+            self.program = ctx.program(vertex_shader=POINT_VERTEX_SHADER, fragment_shader=POINT_FRAGMENT_SHADER)
+        if self.buffer is None or self.buffer.size < self.capacity * VERTEX_DTYPE.itemsize:
+            self.buffer = ctx.buffer(reserve=self.capacity * VERTEX_DTYPE.itemsize)
+            self.geometry = ctx.geometry(
+                [arcade.gl.BufferDescription(self.buffer, "2f 1f 4f1", ["in_pos", "in_size", "in_color"])],
+                mode=ctx.POINTS,
+            )
+
+        # Прозрачность падает к концу жизни
+        vertices = self.vertices[:n]
+        vertices["pos"] = self.pos[:n]
+        vertices["size"] = self.size[:n] * 2
+        vertices["color"][:, :3] = self.color[:n]
+        vertices["color"][:, 3] = (255 * (1 - self.timer[:n] / self.lifetime[:n])).astype(np.uint8)
+        self.buffer.write(vertices.tobytes())
+
+        ctx.enable(ctx.BLEND, GL_PROGRAM_POINT_SIZE)
+        ctx.blend_func = ctx.BLEND_DEFAULT
+        self.geometry.render(self.program, vertices=n)
+        ctx.disable(GL_PROGRAM_POINT_SIZE)
@@ -0,0 +1,79 @@
+"""
+Отсечение невидимого при отрисовке мира.
+
+Слои уровня рисуются не целиком, а по спрайт-листам чанков
+(streaming.ChunkStreamer.chunk_lists), которые пересекают
+видимую область камеры. Стоимость отрисовки зависит от того,
+что на экране, а не от ширины уровня.
+
+С запеканием (baking.py) статичные слои видимых чанков выводятся
+готовыми текстурами, по прямоугольнику на слой чанка.
+"""
+from baking import BAKE_LAYERS, ChunkBaker
+from streaming import chunk_range
+
+# Запас вокруг камеры: тайл с центром в соседнем чанке может заходить на экран
+CULL_PADDING = 64
+
+
+class ChunkCuller:
+    """Рисует слои уровня только по видимым чанкам и считает спрайты"""
+
+    def __init__(self, streamer, bake=BAKE_LAYERS):
+        """
+        Args:
+            streamer: подгрузка чанков со спрайт-листами чанков
+            bake: выводить статичные слои запеченными текстурами
+        """
+        self.streamer = streamer
+        self.baker = ChunkBaker() if bake else None
+        self.visible = []
+
+        # Счетчики последнего кадра
+        self.drawn = 0
+        self.culled = 0
+        self.quads = 0
+
+    def begin(self, camera):
+        """Определяет видимые чанки для кадра (после интерполяции камеры)"""
+        cam_x, cam_y = camera.position
+        half_w = camera.width / 2 + CULL_PADDING
+        half_h = camera.height / 2 + CULL_PADDING
+
+        chunk_lists = self.streamer.chunk_lists
+        self.visible = [(key, chunk_lists[key])
+                        for key in sorted(chunk_range(cam_x - half_w, cam_y - half_h,
+                                                      cam_x + half_w, cam_y + half_h))
+                        if key in chunk_lists]
+        if self.baker is not None:
+            self.baker.prune(chunk_lists)
+        self.drawn = 0
+        self.culled = 0
+        self.quads = 0
+
+    def draw(self, list_name):
+        """Рисует слой (имя спрайт-листа игры) по видимым чанкам"""
+        drawn = 0
+        for key, chunk_lists in self.visible:
+            sprite_list = chunk_lists.get(list_name)
+            if sprite_list:
+                if self.baker is not None and self.baker.draw(key, list_name, sprite_list):
+                    self.quads += 1
+                else:
+                    sprite_list.draw()
+                    self.quads += len(sprite_list)
+                drawn += len(sprite_list)
+
+        # Слой целиком (у уровня 1 нет шипов)
+        layer = getattr(self.streamer.game, list_name, None)
+        self.drawn += drawn
+        self.culled += (len(layer) if layer is not None else 0) - drawn
+
+    def stats(self):
+        """Счетчики последнего кадра"""
+        return {
+            "chunks": len(self.visible),
+            "drawn": self.drawn,
+            "culled": self.culled,
+            "quads": self.quads,
+        }
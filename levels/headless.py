@@ -0,0 +1,112 @@
+"""
+Безоконный режим уровней: без окна, OpenGL и звука.
+Логика игры крутится с максимальной скоростью процессора,
+что нужно для бенчмарков, ботов и регрессионных прогонов.
+
+Запуск:
+    python levels/headless.py --level 2 --ticks 10000 --skip-intro
+"""
+import argparse
+import os
+import sys
+import time
+
+# Добавляем папку уровней для импорта
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+
+class HeadlessCamera:
+    """Замена Camera2D без окна: хранит только позицию"""
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.position = (width / 2, height / 2)
+
+    def use(self):
+        """Рисовать некуда, ничего не делаем"""
+        pass
+
+
+def get_level_class(level_number):
+    """Возвращает класс игры для номера уровня"""
+    if level_number == 1:
+        from level_1 import MyGame
+    elif level_number == 2:
+        from level_2 import MyGame
+    elif level_number == 3:
+        from level_3 import MyGame
+    else:
+        raise ValueError(f"Уровень {level_number} не поддерживает безоконный режим")
+    return MyGame
+
+
+class HeadlessRunner:
+    """Создает уровень без окна и прогоняет его тики симуляции"""
+
+    def __init__(self, level_number, skip_intro=False):
+        self.level_number = level_number
+        self.finished = False
+
+        level_class = get_level_class(level_number)
+        self.game = level_class(headless=True)
+        self.game.host = self
+        self.game.setup()
+
+        # Интро длится несколько секунд, бот может сразу начать игру
+        if skip_intro:
+            self.game.intro_timer = self.game.intro_duration
+
+    def show_level(self, game):
+        """Уровень перезапустился (после проигрыша) - продолжаем с новым"""
+        game.host = self
+        self.game = game
+
+    def exit_level(self, game):
+        """Игрок нажал "вернуться в меню" на экране завершения"""
+        self.finished = True
+
+    def step(self, ticks=1):
+        """Выполняет заданное количество тиков"""
+        for _ in range(ticks):
+            self.game.simulation_step()
+
+    def press_key(self, key, modifiers=0):
+        """Нажатие клавиши, как его получил бы уровень в окне"""
+        self.game.on_key_press(key, modifiers)
+
+    def release_key(self, key, modifiers=0):
+        """Отпускание клавиши"""
+        self.game.on_key_release(key, modifiers)
+
+    def click(self, x, y, button, modifiers=0):
+        """Нажатие кнопки мыши"""
+        self.game.on_mouse_press(x, y, button, modifiers)
+
+
+def main():
+    """ Прогон уровня без окна с замером скорости """
+    parser = argparse.ArgumentParser(description="Безоконный прогон уровня")
+    parser.add_argument("--level", type=int, default=1, help="номер уровня")
+    parser.add_argument("--ticks", type=int, default=10000, help="количество тиков")
+    parser.add_argument("--skip-intro", action="store_true", help="пропустить интро")
+    args = parser.parse_args()
+
+    runner = HeadlessRunner(args.level, skip_intro=args.skip_intro)
+
+    start_time = time.perf_counter()
+    runner.step(args.ticks)
+    elapsed = time.perf_counter() - start_time
+
+    game = runner.game
+    print(f"Уровень {args.level}: {args.ticks} тиков за {elapsed:.3f} сек "
+          f"({args.ticks / elapsed:.0f} тиков/сек)")
+    print(f"Игрок: ({game.player_sprite.center_x:.2f}, {game.player_sprite.center_y:.2f}), "
+          f"очки: {game.player_sprite.score}")
+
+    from assets import cache
+    print(f"Кеш ресурсов: {cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
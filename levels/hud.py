@@ -0,0 +1,43 @@
+"""
+Надписи интерфейса без перекладки текста каждый кадр.
+
+arcade.draw_text на каждом вызове заново раскладывает текст (один
+кеш на стиль, а надписей одного стиля на экране несколько). Здесь
+у каждой надписи свой постоянный arcade.Text по ключу: текст
+раскладывается заново, только когда изменилось его содержимое,
+а позиция и цвет меняются без перекладки.
+"""
+import arcade
+
+
+class HudText:
+    """Постоянные arcade.Text надписей интерфейса по ключам"""
+
+    def __init__(self):
+        self.texts = {}
+        # Сколько раз текст раскладывался (создание или новое содержимое)
+        self.layouts = 0
+
+    def draw(self, key, text, x, y, color, font_size, **kwargs):
+        """
+        Рисует надпись key - аргументы как у arcade.draw_text.
+        Стиль (bold, anchor_x, ...) задается при первом вызове и дальше не меняется.
+        """
+        label = self.texts.get(key)
+        if label is None:
+            label = arcade.Text(text, x, y, color, font_size, **kwargs)
+            self.texts[key] = label
+            self.layouts += 1
+        else:
+            if label.text != text:
+                label.text = text
+                self.layouts += 1
+            if label.x != x or label.y != y:
+                label.position = (x, y)
+            if label.color != color:
+                label.color = color
+        label.draw()
+
+    def clear(self):
+        """Забывает все надписи"""
+        self.texts.clear()
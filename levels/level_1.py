@@ -2,13 +2,31 @@
 Платформер
 """
 import arcade
+import argparse
 import os
 import math
-import random
-import sqlite3
 import time
 from arcade.camera import Camera2D
-from arcade import PhysicsEnginePlatformer
+
+from assets import get_sound, get_texture, get_texture_pair, preload_sounds
+from broadphase import SpatialGrid
+from confetti import ConfettiSystem
+from headless import HeadlessCamera
+from hud import HudText
+from quality import QualityGovernor
+from level_data import build_level, load_level_data, tile_rects
+from replay import add_replay_arguments, attach_input
+from score_badge import ScoreBadge
+from settings_cache import get_settings_cache
+from static_layers import make_layer
+from storage import connect, transaction
+from tile_physics import TilePhysicsEngine
+from timestep import (
+    FixedTimestep,
+    InterpolatedPositions,
+    SIMULATION_RATE,
+    TICK_SCALE
+)
 
 # Константы
 SCREEN_WIDTH = 1000
@@ -23,10 +41,14 @@ DOOR_SCALING = TILE_SCALING * 1.5
 SPRITE_PIXEL_SIZE = 128
 GRID_PIXEL_SIZE = (SPRITE_PIXEL_SIZE * TILE_SCALING)
 
+# Частота отрисовки. Скорость игры от неё не зависит,
+# логика выполняется фиксированными тиками (SIMULATION_RATE в секунду)
+RENDER_RATE = 1 / 60
+
 # Физика и движение
-GRAVITY = 1.5  # Гравитация в пикс/с^2
-PLAYER_MOVEMENT_SPEED = 7  # Скорость движения в пикс/с
-PLAYER_JUMP_SPEED = 30  # Начальная скорость прыжка в пикс/с
+GRAVITY = 1.5 * TICK_SCALE ** 2  # Гравитация в пикс/тик^2
+PLAYER_MOVEMENT_SPEED = 7 * TICK_SCALE  # Скорость движения в пикс/тик
+PLAYER_JUMP_SPEED = 30 * TICK_SCALE  # Начальная скорость прыжка в пикс/тик
 
 # Улучшения управления
 COYOTE_TIME = 0.08  # Время после схода с платформы, когда еще можно прыгнуть
@@ -34,29 +56,39 @@ JUMP_BUFFER = 0.12  # Если нажали прыжок чуть раньше 
 MAX_JUMPS = 1  # Количество прыжков (1 = без двойного прыжка)
 
 # Настройки камеры
-CAMERA_LERP = 0.12  # Плавность движения камеры
-
-# Стартовая позиция игрока
-PLAYER_START_X = SPRITE_PIXEL_SIZE * TILE_SCALING * 2
-PLAYER_START_Y = SPRITE_PIXEL_SIZE * TILE_SCALING * 1
-
-# Позиция двери
-DOOR_X = 1900  # Правая часть карты
-DOOR_Y = 120  # На уровне земли
+CAMERA_LERP = 1 - (1 - 0.12) ** TICK_SCALE  # Плавность движения камеры (за тик)
 
 # Направление взгляда персонажа
 RIGHT_FACING = 0
 LEFT_FACING = 1
 
+# Сколько всплывающих текстов "+10" может быть на экране одновременно
+MAX_FLOATING_TEXTS = 8
+
+# Звуки эффектов уровней
+SOUND_FILES = [
+    ":resources:sounds/coin1.wav",
+    ":resources:sounds/jump1.wav",
+    ":resources:sounds/gameover1.wav",
+    ":resources:sounds/upgrade1.wav",
+]
+
+# Папка с музыкой интро
+SOUNDS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets", "sounds")
+
+
+def level_sound_paths(intro_sound):
+    """Все звуки уровня: эффекты и музыка интро (если файл есть)"""
+    intro_path = os.path.join(SOUNDS_DIR, intro_sound)
+    return SOUND_FILES + ([intro_path] if os.path.exists(intro_path) else [])
+
 
 def load_texture_pair(filename):
     """
     Загружает пару текстур: оригинальную и зеркальную.
+    Текстуры берутся из общего кеша.
     """
-    texture = arcade.load_texture(filename)
-    flipped_texture = texture.flip_horizontally()
-
-    return [texture, flipped_texture]
+    return get_texture_pair(filename)
 
 
 class SoundDatabase:
@@ -73,106 +105,56 @@ class SoundDatabase:
         self.db_name = db_name
         self.init_database()
 
+        # Настройки читаются из памяти, изменения уходят в базу в фоне
+        self.cache = get_settings_cache(self.db_name)
+
     def init_database(self):
         """Инициализация базы данных и создание таблиц"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
+        with transaction(self.db_name) as conn:
+            cursor = conn.cursor()
 
-        # Создаем таблицу для настроек звуков
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS sound_settings (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                sound_type TEXT NOT NULL,
-                volume REAL NOT NULL,
-                is_enabled INTEGER DEFAULT 1,
-                last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(sound_type)
-            )
-        ''')
-
-        # Вставляем начальные значения, если их нет
-        default_settings = [
-            ('music', 0.5),
-            ('ui_click', 0.8),
-            ('environment', 0.6),
-            ('door_open', 0.7),  # Громкость открытия двери
-            ('game_over', 0.6)  # Громкость проигрыша
-        ]
-
-        for sound_type, volume in default_settings:
+            # Создаем таблицу для настроек звуков
             cursor.execute('''
-                INSERT OR IGNORE INTO sound_settings (sound_type, volume)
-                VALUES (?, ?)
-            ''', (sound_type, volume))
-
-        conn.commit()
-        conn.close()
+                CREATE TABLE IF NOT EXISTS sound_settings (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    sound_type TEXT NOT NULL,
+                    volume REAL NOT NULL,
+                    is_enabled INTEGER DEFAULT 1,
+                    last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    UNIQUE(sound_type)
+                )
+            ''')
+
+            # Вставляем начальные значения, если их нет
+            default_settings = [
+                ('music', 0.5),
+                ('ui_click', 0.8),
+                ('environment', 0.6),
+                ('door_open', 0.7),  # Громкость открытия двери
+                ('game_over', 0.6)  # Громкость проигрыша
+            ]
+
+            for sound_type, volume in default_settings:
+                cursor.execute('''
+                    INSERT OR IGNORE INTO sound_settings (sound_type, volume)
+                    VALUES (?, ?)
+                ''', (sound_type, volume))
 
     def get_volume(self, sound_type):
-        """Получает громкость для типа звука"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-
-        cursor.execute('''
-            SELECT volume, is_enabled FROM sound_settings WHERE sound_type = ?
-        ''', (sound_type,))
-
-        result = cursor.fetchone()
-        conn.close()
-
-        if result:
-            volume, is_enabled = result
-            return volume if is_enabled else 0.0
-        return 0.5
+        """Получает громкость для типа звука (из памяти)"""
+        return self.cache.get_volume(sound_type)
 
     def set_volume(self, sound_type, volume):
-        """Устанавливает громкость для типа звука"""
-        volume = max(0.0, min(1.0, volume))  # Ограничиваем от 0 до 1
-
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-
-        cursor.execute('''
-            UPDATE sound_settings 
-            SET volume = ?, last_updated = CURRENT_TIMESTAMP
-            WHERE sound_type = ?
-        ''', (volume, sound_type))
-
-        conn.commit()
-        conn.close()
+        """Устанавливает громкость для типа звука (запись в БД откладывается)"""
+        self.cache.set_volume(sound_type, volume)
 
     def get_all_settings(self):
-        """Получает все настройки звуков"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-
-        cursor.execute('''
-            SELECT sound_type, volume, is_enabled FROM sound_settings
-        ''')
-
-        settings = {}
-        for sound_type, volume, is_enabled in cursor.fetchall():
-            settings[sound_type] = {
-                'volume': volume,
-                'enabled': bool(is_enabled)
-            }
-
-        conn.close()
-        return settings
+        """Получает все настройки звуков (из памяти)"""
+        return self.cache.get_all()
 
     def enable_sound(self, sound_type, enabled=True):
-        """Включает или выключает звук"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-
-        cursor.execute('''
-            UPDATE sound_settings 
-            SET is_enabled = ?, last_updated = CURRENT_TIMESTAMP
-            WHERE sound_type = ?
-        ''', (1 if enabled else 0, sound_type))
-
-        conn.commit()
-        conn.close()
+        """Включает или выключает звук (запись в БД откладывается)"""
+        self.cache.set_enabled(sound_type, enabled)
 
 
 class DatabaseManager:
@@ -191,62 +173,55 @@ class DatabaseManager:
 
     def init_database(self):
         """Инициализация базы данных и создание таблиц"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-
-        # Создаем таблицу для статистики игроков
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS player_stats (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                player_id TEXT NOT NULL,
-                level INTEGER NOT NULL,
-                score INTEGER NOT NULL,
-                play_time_seconds REAL NOT NULL,
-                completed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-
-        # Создаем таблицу для результатов уровней
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS level_results (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                player_id TEXT NOT NULL,
-                level_number INTEGER NOT NULL,
-                score INTEGER NOT NULL,
-                completed INTEGER DEFAULT 0,
-                play_time_seconds REAL DEFAULT 0,
-                completed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-
-        # Создаем индексы для быстрого поиска
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_player_level 
-            ON level_results (player_id, level_number)
-        ''')
+        with transaction(self.db_name) as conn:
+            cursor = conn.cursor()
 
-        conn.commit()
-        conn.close()
+            # Создаем таблицу для статистики игроков
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS player_stats (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    player_id TEXT NOT NULL,
+                    level INTEGER NOT NULL,
+                    score INTEGER NOT NULL,
+                    play_time_seconds REAL NOT NULL,
+                    completed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+
+            # Создаем таблицу для результатов уровней
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS level_results (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    player_id TEXT NOT NULL,
+                    level_number INTEGER NOT NULL,
+                    score INTEGER NOT NULL,
+                    completed INTEGER DEFAULT 0,
+                    play_time_seconds REAL DEFAULT 0,
+                    completed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+
+            # Создаем индексы для быстрого поиска
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_player_level 
+                ON level_results (player_id, level_number)
+            ''')
 
     def save_level_result(self, player_id, level, score, play_time_seconds):
         """Сохраняет результат прохождения уровня"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-
-        # Обновляем или вставляем результат уровня
-        cursor.execute('''
-            INSERT OR REPLACE INTO level_results 
-            (player_id, level_number, score, completed, play_time_seconds, completed_at)
-            VALUES (?, ?, ?, 1, ?, CURRENT_TIMESTAMP)
-        ''', (player_id, level, score, play_time_seconds))
+        with transaction(self.db_name) as conn:
+            cursor = conn.cursor()
 
-        conn.commit()
-        conn.close()
+            # Обновляем или вставляем результат уровня
+            cursor.execute('''
+                INSERT OR REPLACE INTO level_results 
+                (player_id, level_number, score, completed, play_time_seconds, completed_at)
+                VALUES (?, ?, ?, 1, ?, CURRENT_TIMESTAMP)
+            ''', (player_id, level, score, play_time_seconds))
 
     def get_player_stats(self, player_id):
         """Получает статистику игрока"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
+        cursor = connect(self.db_name).cursor()
 
         cursor.execute('''
             SELECT level, score, play_time_seconds, completed_at
@@ -256,14 +231,12 @@ class DatabaseManager:
         ''', (player_id,))
 
         stats = cursor.fetchall()
-        conn.close()
 
         return stats
 
     def get_completed_levels_count(self, player_id="player_1"):
         """Получает количество пройденных уровней"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
+        cursor = connect(self.db_name).cursor()
 
         cursor.execute('''
             SELECT COUNT(DISTINCT level_number) 
@@ -272,14 +245,12 @@ class DatabaseManager:
         ''', (player_id,))
 
         result = cursor.fetchone()
-        conn.close()
 
         return result[0] if result else 0
 
     def get_level_best_score(self, player_id, level):
         """Получает лучший счет для уровня"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
+        cursor = connect(self.db_name).cursor()
 
         cursor.execute('''
             SELECT MAX(score) FROM level_results 
@@ -287,7 +258,6 @@ class DatabaseManager:
         ''', (player_id, level))
 
         result = cursor.fetchone()
-        conn.close()
 
         return result[0] if result and result[0] else 0
 
@@ -313,7 +283,7 @@ class PlayerCharacter(arcade.Sprite):
 
         # Очки игрока, отображаемые над головой
         self.score = 0
-        self.score_text = None
+        self.score_badge = None
 
         # --- Загрузка текстур ---
         main_path = ":resources:images/animated_characters/male_person/malePerson"
@@ -331,9 +301,9 @@ class PlayerCharacter(arcade.Sprite):
 
         # Текстуры для лазания по лестнице
         self.climbing_textures = []
-        texture = arcade.load_texture(f"{main_path}_climb0.png")
+        texture = get_texture(f"{main_path}_climb0.png")
         self.climbing_textures.append(texture)
-        texture = arcade.load_texture(f"{main_path}_climb1.png")
+        texture = get_texture(f"{main_path}_climb1.png")
         self.climbing_textures.append(texture)
 
         # Устанавливаем начальную текстуру
@@ -385,125 +355,122 @@ class PlayerCharacter(arcade.Sprite):
 
     def draw_score(self):
         """Отрисовывает счет над головой игрока"""
-        if self.score_text is None:
-            self.score_text = arcade.Text(
-                f"Очки: {self.score}",
-                self.center_x,
-                self.top + 20,
-                arcade.color.YELLOW,
-                14,
-                bold=True,
-                anchor_x="center"
-            )
-        else:
-            self.score_text.text = f"Points: {self.score}"
-            self.score_text.x = self.center_x
-            self.score_text.y = self.top + 20
+        # Плашка создается при первой отрисовке (ей нужно окно)
+        if self.score_badge is None:
+            self.score_badge = ScoreBadge()
+        self.score_badge.draw(self.score, self.center_x, self.top + 20)
 
-        # Получаем размеры текста
-        text_width = self.score_text.content_width
-        text_height = self.score_text.content_height
 
-        # Рисуем фон для лучшей видимости
-        left = self.center_x - (text_width + 10) // 2
-        right = self.center_x + (text_width + 10) // 2
-        bottom = (self.top + 20) - (text_height + 6) // 2
-        top = (self.top + 20) + (text_height + 6) // 2
-
-        arcade.draw_lrbt_rectangle_filled(
-            left, right, bottom, top,
-            arcade.color.BLACK
-        )
-
-        # Рисуем рамку
-        arcade.draw_lrbt_rectangle_outline(
-            left, right, bottom, top,
-            arcade.color.WHITE,
-            2
-        )
-
-        # Рисуем текст счета
-        self.score_text.draw()
+class FloatingText:
+    """Текст, который всплывает над спрайтом и исчезает (переиспользуется пулом)"""
 
+    __slots__ = ("sprite", "label", "color", "font_size", "x", "y", "text", "lifetime", "timer")
 
-class FloatingText:
-    """Текст, который всплывает над спрайтом и исчезает"""
+    def __init__(self, text="", sprite=None, color=arcade.color.GREEN, font_size=16):
+        self.color = color
+        self.font_size = font_size
+        # arcade.Text создается при первой отрисовке (ему нужно окно)
+        self.text = None
+        self.lifetime = 1.0
+        self.sprite = None
+        self.label = text
+        self.x = 0.0
+        self.y = 0.0
+        self.timer = 0.0
+        if sprite is not None:
+            self.reset(text, sprite)
 
-    def __init__(self, text, sprite, color=arcade.color.GREEN, font_size=16):
+    def reset(self, text, sprite):
+        """Запускает текст заново над спрайтом"""
         self.sprite = sprite
-        self.text = arcade.Text(
-            text,
-            sprite.center_x,
-            sprite.top + 30,
-            color,
-            font_size,
-            bold=True,
-            anchor_x="center"
-        )
-        self.lifetime = 1.0
+        self.label = text
+        self.x = sprite.center_x
+        self.y = sprite.top + 30
         self.timer = 0.0
+        # Текст раскладывается заново, только если надпись другая
+        if self.text is not None and self.text.text != text:
+            self.text.text = text
 
     def update(self, delta_time):
         """Обновляет позицию и время жизни"""
-        self.text.x = self.sprite.center_x
-        self.text.y += 1
+        self.x = self.sprite.center_x
+        self.y += TICK_SCALE
         self.timer += delta_time
         return self.timer < self.lifetime
 
     def draw(self):
         """Отрисовывает текст"""
+        if self.text is None:
+            self.text = arcade.Text(
+                self.label,
+                self.x,
+                self.y,
+                self.color,
+                self.font_size,
+                bold=True,
+                anchor_x="center"
+            )
+        else:
+            self.text.position = (self.x, self.y)
         self.text.draw()
 
 
-class ConfettiParticle:
-    """Частица для эффекта салюта"""
+class FloatingTextPool:
+    """
+    Пул плавающих текстов фиксированного размера.
 
-    def __init__(self, x, y):
-        self.x = x
-        self.y = y
-        self.size = random.randint(3, 8)
-        self.velocity_x = random.uniform(-3, 3)
-        self.velocity_y = random.uniform(2, 8)
-        self.gravity = 0.2
-        self.lifetime = random.uniform(1.0, 2.5)
-        self.timer = 0.0
+    Тексты создаются один раз и переиспользуются: подбор монеты не
+    создает новый arcade.Text. Живые тексты лежат в начале списка,
+    отжившие убираются перестановкой на месте. Если живых уже
+    limit (не больше MAX_FLOATING_TEXTS), новый текст занимает место
+    самого старого.
+    """
 
-        # Случайный цвет для разнообразия
-        colors = [
-            (255, 0, 0),  # RED
-            (0, 0, 255),  # BLUE
-            (0, 255, 0),  # GREEN
-            (255, 255, 0),  # YELLOW
-            (128, 0, 128),  # PURPLE
-            (255, 165, 0),  # ORANGE
-            (255, 192, 203),  # PINK
-            (0, 255, 255)  # CYAN
-        ]
-        self.color = colors[random.randint(0, len(colors) - 1)]
+    def __init__(self, size=MAX_FLOATING_TEXTS):
+        self.items = [FloatingText() for _ in range(size)]
+        self.count = 0
+        self.limit = size
+
+    def set_limit(self, limit):
+        """Меняет предел одновременных текстов (лишние доживают свое)"""
+        self.limit = max(1, min(limit, len(self.items)))
+
+    def spawn(self, text, sprite):
+        """Показывает текст над спрайтом"""
+        items = self.items
+        if self.count < self.limit:
+            item = items[self.count]
+            self.count += 1
+        else:
+            # Предел достигнут - переиспользуем самый старый, он становится самым новым
+            item = items.pop(0)
+            items.insert(self.count - 1, item)
+        item.reset(text, sprite)
+        return item
 
     def update(self, delta_time):
-        """Обновляет частицу"""
-        self.x += self.velocity_x
-        self.y += self.velocity_y
-        self.velocity_y -= self.gravity
-        self.timer += delta_time
-        return self.timer < self.lifetime
-
-    def draw(self):
-        """Рисует частицу"""
-        alpha = int(255 * (1 - self.timer / self.lifetime))
-
-        rgba_color = (
-            self.color[0],
-            self.color[1],
-            self.color[2],
-            alpha
-        )
-
-        arcade.draw_circle_filled(
-            self.x, self.y, self.size,
-            rgba_color
-        )
+        """Обновляет живые тексты и сдвигает отжившие за живые"""
+        items = self.items
+        live = 0
+        for i in range(self.count):
+            item = items[i]
+            if item.update(delta_time):
+                if i != live:
+                    items[live], items[i] = item, items[live]
+                live += 1
+        self.count = live
+
+    def clear(self):
+        """Убирает все тексты"""
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        items = self.items
+        for i in range(self.count):
+            yield items[i]
 
 
 class Door(arcade.Sprite):
@@ -511,7 +478,7 @@ class Door(arcade.Sprite):
 
     def __init__(self):
         super().__init__()
-        self.texture = arcade.load_texture(":resources:images/tiles/doorClosed_mid.png")
+        self.texture = get_texture(":resources:images/tiles/doorClosed_mid.png")
         self.scale = DOOR_SCALING
         self.is_open = False
         self.interaction_radius = 50
@@ -521,29 +488,31 @@ class Door(arcade.Sprite):
 class LevelCompleteView:
     """Вью для завершения уровня"""
 
-    def __init__(self, window, score, play_time_seconds, current_level=1):
+    def __init__(self, window, score, play_time_seconds, current_level=1, save_result=True, confetti_scale=1.0):
         self.window = window
         self.score = score
         self.play_time_seconds = play_time_seconds
         self.current_level = current_level
         self.alpha = 0
-        self.particles = []
+        self.particles = ConfettiSystem()
         self.show_exit_button = False
         self.exit_button_rect = None
         self.level_saved = False
+        self.hud = HudText()
+
+        # Доля частиц от полного салюта (регулятор качества)
+        self.confetti_scale = confetti_scale
 
         # Создаем частицы салюта
-        for _ in range(100):
-            x = random.randint(200, SCREEN_WIDTH - 200)
-            y = random.randint(100, SCREEN_HEIGHT - 100)
-            self.particles.append(ConfettiParticle(x, y))
+        self.particles.spawn_random(int(100 * confetti_scale), 200, 100, SCREEN_WIDTH - 200, SCREEN_HEIGHT - 100)
 
         # Сохраняем результат сразу при создании вью
-        self.save_to_database()
+        # (безоконные прогоны не трогают прогресс игрока)
+        if save_result:
+            self.save_to_database()
 
     def save_to_database(self):
         """Сохраняет результат уровня в базу данных"""
-        import sqlite3
         from pathlib import Path
 
         try:
@@ -555,44 +524,43 @@ class LevelCompleteView:
             print(f"\n=== СОХРАНЕНИЕ ПРОГРЕССА УРОВНЯ {self.current_level} ===")
             print(f"Путь к БД: {db_path}")
 
-            conn = sqlite3.connect(str(db_path))
-            cursor = conn.cursor()
-
-            # Вставляем результат уровня
-            player_id = "player_1"
-            level_number = self.current_level
-
-            # Проверяем, есть ли уже запись для этого уровня
-            cursor.execute('''
-                SELECT score FROM level_results 
-                WHERE player_id = ? AND level_number = ?
-            ''', (player_id, level_number))
+            # Чтение старого результата и запись нового - одна транзакция
+            with transaction(str(db_path)) as conn:
+                cursor = conn.cursor()
 
-            existing_result = cursor.fetchone()
+                # Вставляем результат уровня
+                player_id = "player_1"
+                level_number = self.current_level
 
-            if existing_result:
-                # Если результат уже есть, обновляем только если новый результат лучше
-                old_score = existing_result[0]
-                if self.score > old_score:
-                    cursor.execute('''
-                        UPDATE level_results 
-                        SET score = ?, play_time_seconds = ?, completed = 1, completed_at = CURRENT_TIMESTAMP
-                        WHERE player_id = ? AND level_number = ?
-                    ''', (self.score, self.play_time_seconds, player_id, level_number))
-                    print(f"✅ Результат уровня {level_number} обновлен: {self.score} (было: {old_score})")
-                else:
-                    print(f"✅ Старый результат лучше: {old_score} > {self.score}, оставляем старый")
-            else:
-                # Если записи нет, создаем новую
+                # Проверяем, есть ли уже запись для этого уровня
                 cursor.execute('''
-                    INSERT INTO level_results 
-                    (player_id, level_number, score, completed, play_time_seconds)
-                    VALUES (?, ?, ?, 1, ?)
-                ''', (player_id, level_number, self.score, self.play_time_seconds))
-                print(f"✅ Результат уровня {level_number} сохранен: {self.score}")
-
-            conn.commit()
-            conn.close()
+                    SELECT score FROM level_results 
+                    WHERE player_id = ? AND level_number = ?
+                ''', (player_id, level_number))
+
+                existing_result = cursor.fetchone()
+
+                if existing_result:
+                    # Если результат уже есть, обновляем только если новый результат лучше
+                    old_score = existing_result[0]
+                    if self.score > old_score:
+                        cursor.execute('''
+                            UPDATE level_results 
+                            SET score = ?, play_time_seconds = ?, completed = 1, completed_at = CURRENT_TIMESTAMP
+                            WHERE player_id = ? AND level_number = ?
+                        ''', (self.score, self.play_time_seconds, player_id, level_number))
+                        print(f"✅ Результат уровня {level_number} обновлен: {self.score} (было: {old_score})")
+                    else:
+                        print(f"✅ Старый результат лучше: {old_score} > {self.score}, оставляем старый")
+                else:
+                    # Если записи нет, создаем новую
+                    cursor.execute('''
+                        INSERT INTO level_results 
+                        (player_id, level_number, score, completed, play_time_seconds)
+                        VALUES (?, ?, ?, 1, ?)
+                    ''', (player_id, level_number, self.score, self.play_time_seconds))
+                    print(f"✅ Результат уровня {level_number} сохранен: {self.score}")
+
             self.level_saved = True
 
             print(f"Игрок: {player_id}")
@@ -612,13 +580,11 @@ class LevelCompleteView:
             self.alpha = min(255, self.alpha + 5)
 
         # Обновляем частицы
-        self.particles = [p for p in self.particles if p.update(delta_time)]
+        self.particles.update(delta_time)
 
         # Добавляем новые частицы
-        if len(self.particles) < 50:
-            x = random.randint(200, SCREEN_WIDTH - 200)
-            y = random.randint(100, SCREEN_HEIGHT - 100)
-            self.particles.append(ConfettiParticle(x, y))
+        if len(self.particles) < 50 * self.confetti_scale:
+            self.particles.spawn_random(1, 200, 100, SCREEN_WIDTH - 200, SCREEN_HEIGHT - 100)
 
         # Показываем кнопку через 1 секунду
         if self.alpha >= 255:
@@ -645,9 +611,8 @@ class LevelCompleteView:
             (0, 0, 0, int(self.alpha * 0.7))
         )
 
-        # Частицы
-        for particle in self.particles:
-            particle.draw()
+        # Частицы (одним вызовом)
+        self.particles.draw()
 
         container_width = 600
         container_height = 350
@@ -673,7 +638,8 @@ class LevelCompleteView:
         )
 
         # Заголовок
-        arcade.draw_text(
+        self.hud.draw(
+            "title",
             "УРОВЕНЬ ПРОЙДЕН!",
             container_x,
             container_y + 80,
@@ -685,7 +651,8 @@ class LevelCompleteView:
         )
 
         # Подзаголовок
-        arcade.draw_text(
+        self.hud.draw(
+            "subtitle",
             "Вы справились!",
             container_x,
             container_y + 30,
@@ -697,7 +664,8 @@ class LevelCompleteView:
         )
 
         # Счет
-        arcade.draw_text(
+        self.hud.draw(
+            "score",
             f"Ваш счет: {self.score}",
             container_x,
             container_y - 20,
@@ -710,7 +678,8 @@ class LevelCompleteView:
 
         # Время прохождения (в секундах и минутах)
         play_time_minutes = self.play_time_seconds / 60.0
-        arcade.draw_text(
+        self.hud.draw(
+            "time",
             f"Время: {self.play_time_seconds:.1f} сек ({play_time_minutes:.1f} мин)",
             container_x,
             container_y - 60,
@@ -723,7 +692,8 @@ class LevelCompleteView:
 
         # Сообщение о сохранении
         if self.level_saved:
-            arcade.draw_text(
+            self.hud.draw(
+                "saved",
                 "Прогресс сохранен!",
                 container_x,
                 container_y - 100,
@@ -760,7 +730,8 @@ class LevelCompleteView:
                 3
             )
 
-            arcade.draw_text(
+            self.hud.draw(
+                "exit_button",
                 "ВЕРНУТЬСЯ В МЕНЮ",
                 x + w // 2,
                 y + h // 2,
@@ -777,21 +748,37 @@ class LevelCompleteView:
             button_x, button_y, button_w, button_h = self.exit_button_rect
             if (button_x <= x <= button_x + button_w and
                     button_y <= y <= button_y + button_h):
-                # Закрываем окно уровня
-                self.window.close()
+                # Выходим из уровня
+                self.window.exit_level()
 
 
-class MyGame(arcade.Window):
+class MyGame(arcade.View):
     """
     Главный класс игры
     """
 
-    def __init__(self):
+    # Музыка интро (assets/sounds)
+    INTRO_SOUND = "intro_level_1.mp3"
+
+    def __init__(self, headless=False):
         """
         Инициализатор игры
+
+        Args:
+            headless: безоконный режим - без окна, OpenGL и звука
         """
+        if headless:
+            self.window = None
+        else:
+            super().__init__()
+
+        self.headless = headless
+
+        # Кто запустил уровень (None - отдельное окно)
+        self.host = None
+
         # инициализация БД звуков
-        self.sound_db = SoundDatabase()
+        self.sound_db = None if headless else SoundDatabase()
 
         # интро
         self.show_intro = True
@@ -801,16 +788,21 @@ class MyGame(arcade.Window):
         # заморозка игрока
         self.player_frozen = True
 
+        # Все звуки уровня загружаются сразу, а не при первом проигрывании
+        if not headless:
+            preload_sounds(level_sound_paths(self.INTRO_SOUND))
+
         # музыка
-        sound_path = os.path.join(os.path.dirname(os.path.dirname(__file__)),
-                                  "assets", "sounds", "intro_level_1.mp3")
+        sound_path = os.path.join(SOUNDS_DIR, self.INTRO_SOUND)
 
         # Загружаем звук
-        self.intro_sound = arcade.load_sound(sound_path)
+        self.intro_sound = self.load_sound(sound_path)
+        self.intro_player = None
 
         # Загружаем громкость музыки из БД
-        music_volume = self.sound_db.get_volume('music')
-        self.intro_player = arcade.play_sound(self.intro_sound, volume=music_volume, loop=False)
+        if self.intro_sound:
+            music_volume = self.sound_db.get_volume('music')
+            self.intro_player = arcade.play_sound(self.intro_sound, volume=music_volume, loop=False)
 
         # Вью завершения уровня
         self.level_complete_view = None
@@ -826,16 +818,23 @@ class MyGame(arcade.Window):
         # Номер текущего уровня
         self.current_level = 1
 
-        # Вызываем родительский класс и настраиваем окно
-        super().__init__(SCREEN_WIDTH, SCREEN_HEIGHT, SCREEN_TITLE)
+        # Фиксированный шаг симуляции и интерполяция для отрисовки
+        self.timestep = FixedTimestep(SIMULATION_RATE)
+        self.interpolation = InterpolatedPositions()
+        self.tick = 0
 
-        # Устанавливаем путь к программе
-        file_path = os.path.dirname(os.path.abspath(__file__))
-        os.chdir(file_path)
+        # Запись и повтор ввода (replay.py)
+        self.input_recorder = None
+        self.input_replay = None
+        self.replaced_by = None
 
         # Камеры
-        self.world_camera = Camera2D()
-        self.gui_camera = Camera2D()
+        if headless:
+            self.world_camera = HeadlessCamera(SCREEN_WIDTH, SCREEN_HEIGHT)
+            self.gui_camera = HeadlessCamera(SCREEN_WIDTH, SCREEN_HEIGHT)
+        else:
+            self.world_camera = Camera2D()
+            self.gui_camera = Camera2D()
 
         # Отслеживание нажатых клавиш
         self.left = False
@@ -857,7 +856,7 @@ class MyGame(arcade.Window):
         self.player_list = None
         self.door_list = None
         self.door = None
-        self.floating_texts = []
+        self.floating_texts = FloatingTextPool()
 
         # Отдельная переменная для спрайта игрока
         self.player_sprite = None
@@ -865,6 +864,17 @@ class MyGame(arcade.Window):
         # Физический движок
         self.physics_engine = None
 
+        # Подгрузка тайлов чанками вокруг камеры и отсечение невидимых (создаются в setup)
+        self.chunks = None
+        self.culler = None
+
+        # Надписи интерфейса
+        self.hud = HudText()
+
+        # Адаптивное качество по времени кадра и плавность камеры текущей ступени
+        self.quality = QualityGovernor()
+        self.camera_lerp = CAMERA_LERP
+
         # Физика прыжка
         self.time_since_ground = 5.0
         self.jumps_left = MAX_JUMPS
@@ -876,18 +886,31 @@ class MyGame(arcade.Window):
         self.view_bottom = 0
         self.view_left = 0
 
+        # Размер мира (задается в файле уровня)
         self.end_of_map = 0
+        self.world_height = 1000
 
         # Загрузка звуков
-        self.collect_coin_sound = arcade.load_sound(":resources:sounds/coin1.wav")
-        self.jump_sound = arcade.load_sound(":resources:sounds/jump1.wav")
-        self.game_over = arcade.load_sound(":resources:sounds/gameover1.wav")
-        self.door_open_sound = arcade.load_sound(":resources:sounds/upgrade1.wav")
+        self.collect_coin_sound = self.load_sound(":resources:sounds/coin1.wav")
+        self.jump_sound = self.load_sound(":resources:sounds/jump1.wav")
+        self.game_over = self.load_sound(":resources:sounds/gameover1.wav")
+        self.door_open_sound = self.load_sound(":resources:sounds/upgrade1.wav")
 
         # Переменная для подсказки о двери
         self.show_door_hint = False
         self.door_hint_timer = 0.0
 
+    def load_sound(self, path):
+        """Загружает звук (в безоконном режиме звук не нужен)"""
+        if self.headless:
+            return None
+        return get_sound(path)
+
+    def play_sound(self, sound, volume=0.7):
+        """Воспроизводит звук, если он загружен"""
+        if sound:
+            arcade.play_sound(sound, volume=volume)
+
     def play_sound_with_db_volume(self, sound, sound_type):
         """
         Воспроизводит звук с громкостью из базы данных
@@ -896,6 +919,9 @@ class MyGame(arcade.Window):
             sound: объект звука arcade
             sound_type: тип звука из БД ('music', 'door_open', 'game_over')
         """
+        if not sound:
+            return
+
         try:
             volume = self.sound_db.get_volume(sound_type)
             if volume > 0:
@@ -927,96 +953,71 @@ class MyGame(arcade.Window):
         self.game_start_time = None
         self.total_play_time_seconds = 0.0
 
+        # Сбрасываем шаг симуляции
+        self.timestep.reset()
+        self.interpolation = InterpolatedPositions()
+        self.tick = 0
+
         # Создаем списки спрайтов
         self.player_list = arcade.SpriteList()
-        self.background_list = arcade.SpriteList()
-        self.wall_list = arcade.SpriteList()
+        self.background_list = make_layer("background_list")
+        self.wall_list = make_layer("wall_list")
         self.coin_list = arcade.SpriteList()
-        self.ladder_list = arcade.SpriteList()
+        self.ladder_list = make_layer("ladder_list")
         self.door_list = arcade.SpriteList()
-        self.floating_texts = []
+        self.floating_texts.clear()
+        self.apply_quality()
+
+        # Broadphase для монет: игрок проверяется только с монетами рядом (broadphase.py)
+        self.coin_grid = SpatialGrid()
 
-        # Создаем и размещаем игрока
+        # Создаем игрока (позиция задается в файле уровня)
         self.player_sprite = PlayerCharacter()
-        self.player_sprite.center_x = PLAYER_START_X
-        self.player_sprite.center_y = PLAYER_START_Y
         self.player_list.append(self.player_sprite)
 
         # Создаем дверь и добавляем в спрайт-лист
         self.door = Door()
-        self.door.center_x = DOOR_X
-        self.door.center_y = DOOR_Y + 64
         self.door_list.append(self.door)
 
-        # --- Создаем простой уровень вручную ---
-        # Создаем землю
-        for x in range(0, 2000, 64):
-            wall = arcade.Sprite(":resources:images/tiles/grassMid.png", TILE_SCALING)
-            wall.center_x = x
-            wall.center_y = 32
-            self.wall_list.append(wall)
-
-        # Создаем платформы
-        for x in range(300, 600, 64):
-            wall = arcade.Sprite(":resources:images/tiles/grassMid.png", TILE_SCALING)
-            wall.center_x = x
-            wall.center_y = 200
-            self.wall_list.append(wall)
-
-        for x in range(700, 1000, 64):
-            wall = arcade.Sprite(":resources:images/tiles/grassMid.png", TILE_SCALING)
-            wall.center_x = x
-            wall.center_y = 300
-            self.wall_list.append(wall)
-
-        # Платформа перед дверью
-        for x in range(1850, 1950, 64):
-            wall = arcade.Sprite(":resources:images/tiles/grassMid.png", TILE_SCALING)
-            wall.center_x = x
-            wall.center_y = 120
-            self.wall_list.append(wall)
-
-        # Создаем монеты
-        for x in range(200, 1200, 100):
-            coin = arcade.Sprite(":resources:images/items/coinGold.png", COIN_SCALING)
-            coin.center_x = x
-            coin.center_y = 150
-            self.coin_list.append(coin)
-
-        # Создаем лестницу
-        for y in range(80, 400, 64):
-            ladder = arcade.Sprite(":resources:images/tiles/ladderMid.png", TILE_SCALING)
-            ladder.center_x = 630
-            ladder.center_y = y
-            self.ladder_list.append(ladder)
-
-        # Устанавливаем конец карты
-        self.end_of_map = 2000
-
-        # Устанавливаем цвет фона
-        arcade.set_background_color(arcade.csscolor.CORNFLOWER_BLUE)
-
-        # Создаем физический движок
-        self.physics_engine = PhysicsEnginePlatformer(
+        # Строим уровень из файла данных (levels/data/level_1.json)
+        level = load_level_data(1)
+        build_level(self, level)
+
+        # Создаем физический движок: стены - склеенные прямоугольники уровня,
+        # спрайты тайлов нужны только для отрисовки
+        self.physics_engine = TilePhysicsEngine(
             player_sprite=self.player_sprite,
             gravity_constant=GRAVITY,
-            walls=self.wall_list,
-            ladders=self.ladder_list
+            walls=level.rects.tolist(),
+            ladders=tile_rects(level, "ladders")
         )
 
+    def on_show_view(self):
+        """ Уровень может показываться в окне меню другого размера """
+        self.on_resize(*self.window.get_size())
+
+    def on_resize(self, width, height):
+        """ Камеры подстраиваются под размер окна """
+        self.world_camera.match_window()
+        self.gui_camera.match_window()
+
     def on_draw(self):
         """ Отрисовка экрана. """
         # Очищаем экран
         self.clear()
 
+        # Позиции между двумя последними тиками для плавной картинки
+        self.interpolation.apply(self.timestep.alpha)
+
         # Используем мировую камеру для игровых объектов
         self.world_camera.use()
 
-        # Отрисовываем спрайты
-        self.wall_list.draw()
-        self.background_list.draw()
-        self.ladder_list.draw()
-        self.coin_list.draw()
+        # Отрисовываем спрайты (слои уровня - только видимые чанки)
+        self.culler.begin(self.world_camera)
+        self.culler.draw("wall_list")
+        self.culler.draw("background_list")
+        self.culler.draw("ladder_list")
+        self.culler.draw("coin_list")
         self.door_list.draw()
 
         self.player_list.draw()
@@ -1028,6 +1029,9 @@ class MyGame(arcade.Window):
         for text in self.floating_texts:
             text.draw()
 
+        # Возвращаем настоящие позиции после отрисовки мира
+        self.interpolation.restore()
+
         # Переключаемся на камеру интерфейса
         self.gui_camera.use()
 
@@ -1049,7 +1053,8 @@ class MyGame(arcade.Window):
                 (0, 0, 0, 180)
             )
 
-            arcade.draw_text(
+            self.hud.draw(
+                "intro_title",
                 "Добро пожаловать",
                 SCREEN_WIDTH // 2,
                 SCREEN_HEIGHT // 2 + 40,
@@ -1060,7 +1065,8 @@ class MyGame(arcade.Window):
                 anchor_y="center"
             )
 
-            arcade.draw_text(
+            self.hud.draw(
+                "intro_subtitle",
                 "Level 1: Обучение",
                 SCREEN_WIDTH // 2,
                 SCREEN_HEIGHT // 2 - 20,
@@ -1091,7 +1097,8 @@ class MyGame(arcade.Window):
 
         # Текст управления
         control_text = " ❗ ← → Движение | W/↑ Прыжок | S/↓ Вниз"
-        arcade.draw_text(
+        self.hud.draw(
+            "controls",
             control_text,
             guide_x,
             guide_y,
@@ -1104,7 +1111,8 @@ class MyGame(arcade.Window):
 
         # Текст задачи
         task_text = "Соберите монеты и найдите дверь в конце!"
-        arcade.draw_text(
+        self.hud.draw(
+            "task",
             task_text,
             guide_x,
             guide_y - 70,
@@ -1121,9 +1129,11 @@ class MyGame(arcade.Window):
             play_time_seconds = current_time - self.game_start_time
             play_time_minutes = play_time_seconds / 60.0
 
-            # Рисуем таймер в верхнем правом углу
+            # Рисуем таймер в верхнем правом углу (текст с точностью 0.1 сек:
+            # надпись раскладывается заново не чаще 10 раз в секунду)
             timer_text = f"Время: {play_time_seconds:.1f} сек"
-            arcade.draw_text(
+            self.hud.draw(
+                "timer",
                 timer_text,
                 SCREEN_WIDTH - 150,
                 SCREEN_HEIGHT - 50,
@@ -1154,7 +1164,8 @@ class MyGame(arcade.Window):
             )
 
             # Текст подсказки
-            arcade.draw_text(
+            self.hud.draw(
+                "door_hint",
                 "Нажмите ПРАВУЮ кнопку мыши у двери для завершения уровня",
                 hint_x,
                 hint_y,
@@ -1169,6 +1180,28 @@ class MyGame(arcade.Window):
         if self.level_complete_view:
             self.level_complete_view.draw()
 
+        # Текущая ступень качества (регулятор quality.py)
+        self.hud.draw(
+            "quality",
+            f"Качество: {self.quality.name}",
+            10,
+            10,
+            arcade.color.LIGHT_GRAY,
+            11
+        )
+
+        # Регулятор качества (кроме записи и повтора ввода: камера должна совпасть с записью)
+        if not self.input_recorder and not self.input_replay and self.quality.end_frame():
+            self.apply_quality()
+
+    def apply_quality(self):
+        """Применяет настройки текущей ступени качества"""
+        settings = self.quality.settings
+        self.floating_texts.set_limit(settings["floating_texts"])
+        self.camera_lerp = self.quality.camera_lerp
+        if self.level_complete_view:
+            self.level_complete_view.confetti_scale = settings["confetti"]
+
     def process_movement(self):
         """Обработка движения игрока"""
         if self.level_complete_view:
@@ -1189,8 +1222,22 @@ class MyGame(arcade.Window):
             elif not self.up_pressed and not self.down_pressed:
                 self.player_sprite.change_y = 0
 
+    def accept_input(self):
+        """Во время повтора записи живой ввод игрока игнорируется"""
+        return not self.input_replay or self.input_replay.dispatching
+
     def on_key_press(self, key, modifiers):
         """Вызывается при нажатии клавиши. """
+        # Escape - выход из уровня в любой момент (это не ввод симуляции, в запись не попадает)
+        if key == arcade.key.ESCAPE:
+            self.exit_level()
+            return
+
+        if not self.accept_input():
+            return
+        if self.input_recorder:
+            self.input_recorder.record_key_press(self.tick, key, modifiers)
+
         if self.level_complete_view:
             return
 
@@ -1216,6 +1263,11 @@ class MyGame(arcade.Window):
 
     def on_key_release(self, key, modifiers):
         """Вызывается при отпускании клавиши. """
+        if not self.accept_input():
+            return
+        if self.input_recorder:
+            self.input_recorder.record_key_release(self.tick, key, modifiers)
+
         if self.level_complete_view:
             return
 
@@ -1245,6 +1297,11 @@ class MyGame(arcade.Window):
 
     def on_mouse_press(self, x, y, button, modifiers):
         """Обрабатывает нажатие мыши"""
+        if not self.accept_input():
+            return
+        if self.input_recorder:
+            self.input_recorder.record_mouse_press(self.tick, x, y, button, modifiers)
+
         if self.level_complete_view:
             self.level_complete_view.on_mouse_press(x, y, button, modifiers)
             return
@@ -1257,10 +1314,17 @@ class MyGame(arcade.Window):
             if distance < self.door.interaction_radius:
                 self.complete_level()
 
+    def exit_level(self):
+        """Выход из уровня (после завершения или по Escape)"""
+        if self.host:
+            self.host.exit_level(self)
+        else:
+            # Закрываем окно уровня
+            self.window.close()
+
     def create_floating_text(self, text):
         """Создает эффект плавающего текста"""
-        floating_text = FloatingText(text, self.player_sprite)
-        self.floating_texts.append(floating_text)
+        self.floating_texts.spawn(text, self.player_sprite)
 
     def complete_level(self):
         """Завершает уровень и показывает экран завершения"""
@@ -1280,14 +1344,39 @@ class MyGame(arcade.Window):
                 self,
                 self.player_sprite.score,
                 play_time_seconds,
-                self.current_level
+                self.current_level,
+                save_result=not self.headless,
+                confetti_scale=self.quality.settings["confetti"]
             )
             self.player_frozen = True
             self.player_sprite.change_x = 0
             self.player_sprite.change_y = 0
 
     def on_update(self, delta_time):
-        """ Обновление игровой логики и движения """
+        """ Выполняет столько тиков симуляции, сколько накопилось времени """
+        self.quality.begin_frame()
+        for _ in range(self.timestep.advance(delta_time)):
+            self.simulation_step()
+
+    def simulation_step(self):
+        """ Один тик симуляции с запоминанием позиций для интерполяции """
+        # Повтор записанного ввода на тех же тиках
+        if self.input_replay:
+            self.input_replay.feed(self)
+            if self.replaced_by:
+                # Уровень перезапустился по записанному клику - тик выполняет новая игра
+                self.replaced_by.simulation_step()
+                return
+
+        self.interpolation.capture(self.player_list, (self.world_camera,))
+        self.fixed_update(self.timestep.dt)
+        self.tick += 1
+
+        if self.input_recorder:
+            self.input_recorder.ticks = self.tick
+
+    def fixed_update(self, delta_time):
+        """ Обновление игровой логики и движения (один тик) """
         if self.level_complete_view:
             self.level_complete_view.update(delta_time)
             return
@@ -1317,9 +1406,9 @@ class MyGame(arcade.Window):
         if self.door and not self.level_complete_view:
             dx = self.player_sprite.center_x - self.door.center_x
             dy = self.player_sprite.center_y - self.door.center_y
-            distance = math.hypot(dx, dy)
+            hint_radius = self.door.interaction_radius * 2
 
-            if distance < self.door.interaction_radius * 2:
+            if dx * dx + dy * dy < hint_radius * hint_radius:
                 self.show_door_hint = True
                 self.door_hint_timer = 3.0
             else:
@@ -1366,41 +1455,40 @@ class MyGame(arcade.Window):
                 self.physics_engine.jump(PLAYER_JUMP_SPEED)
                 self.jump_buffer_timer = 0
                 # Просто воспроизводим звук прыжка со стандартной громкостью
-                arcade.play_sound(self.jump_sound, volume=0.7)
+                self.play_sound(self.jump_sound, volume=0.7)
                 self.jump_cooldown = 0.3
                 self.can_jump_again = False
                 self.jump = False
 
         self.coin_list.update_animation(delta_time)
         self.player_list.update_animation(delta_time)
-        self.wall_list.update()
 
-        self.floating_texts = [text for text in self.floating_texts if text.update(delta_time)]
+        self.floating_texts.update(delta_time)
 
-        coin_hit_list = arcade.check_for_collision_with_list(self.player_sprite,
-                                                             self.coin_list)
+        coin_hit_list = self.coin_grid.collide(self.player_sprite)
 
         for coin in coin_hit_list:
             points = 10
             self.player_sprite.add_score(points)
             self.create_floating_text(f"+{points}")
             coin.remove_from_sprite_lists()
+            self.coin_grid.remove(coin)
             # Просто воспроизводим звук сбора монеты со стандартной громкостью
-            arcade.play_sound(self.collect_coin_sound, volume=0.7)
+            self.play_sound(self.collect_coin_sound, volume=0.7)
 
         target_x = self.player_sprite.center_x
         target_y = self.player_sprite.center_y
 
         current_x, current_y = self.world_camera.position
 
-        smooth_x = current_x + (target_x - current_x) * CAMERA_LERP
-        smooth_y = current_y + (target_y - current_y) * CAMERA_LERP
+        smooth_x = current_x + (target_x - current_x) * self.camera_lerp
+        smooth_y = current_y + (target_y - current_y) * self.camera_lerp
 
         half_width = SCREEN_WIDTH / 2
         half_height = SCREEN_HEIGHT / 2
 
         world_width = self.end_of_map
-        world_height = 1000
+        world_height = self.world_height
 
         cam_x = max(half_width, min(world_width - half_width, smooth_x))
         cam_y = max(half_height, min(world_height - half_height, smooth_y))
@@ -1408,13 +1496,39 @@ class MyGame(arcade.Window):
         self.world_camera.position = (cam_x, cam_y)
         self.gui_camera.position = (SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2)
 
+        # Подгружаем чанки, к которым приблизилась камера, и выгружаем дальние
+        self.chunks.update(self.world_camera)
+
+
+def create_view(host=None):
+    """
+    Создает готовый к показу вью уровня 1.
+
+    Args:
+        host: кто запускает уровень (меню); ему уйдут выход и перезапуск
+    """
+    game = MyGame()
+    game.host = host
+    game.setup()
+    return game
+
 
 def main():
     """ Главная функция """
-    window = MyGame()
-    window.setup()
+    parser = argparse.ArgumentParser(description=SCREEN_TITLE)
+    add_replay_arguments(parser)
+    args = parser.parse_args()
+
+    window = arcade.Window(SCREEN_WIDTH, SCREEN_HEIGHT, SCREEN_TITLE,
+                           update_rate=RENDER_RATE, draw_rate=RENDER_RATE)
+    game = create_view()
+    recorder = attach_input(game, args, level_number=1)
+    window.show_view(game)
     arcade.run()
 
+    if recorder:
+        recorder.save(args.record, window.current_view)
+
 
 if __name__ == "__main__":
     main()
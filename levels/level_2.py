@@ -2,116 +2,107 @@
 Платформер - Уровень 2
 """
 import arcade
+import argparse
 import os
 import sys
 import math
 import time
 from arcade.camera import Camera2D
-from arcade import PhysicsEnginePlatformer
 
 # Добавляем путь к первому уровню для импорта
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+from activity import ActivityRegion
+from assets import get_sound, get_texture, preload_sounds
+from broadphase import SpatialGrid
+from level_data import build_level, load_level_data, tile_rects
+
 # Импортируем классы из первого уровня
 from level_1 import (
     SoundDatabase,
     PlayerCharacter,
-    FloatingText,
+    FloatingTextPool,
     Door,
     LevelCompleteView,
     SCREEN_WIDTH,
     SCREEN_HEIGHT,
     TILE_SCALING,
-    COIN_SCALING,
-    SPRITE_PIXEL_SIZE,
     GRAVITY,
     PLAYER_MOVEMENT_SPEED,
     PLAYER_JUMP_SPEED,
     COYOTE_TIME,
     JUMP_BUFFER,
     MAX_JUMPS,
-    CAMERA_LERP
+    CAMERA_LERP,
+    RENDER_RATE,
+    SOUNDS_DIR,
+    level_sound_paths
+)
+from headless import HeadlessCamera
+from hud import HudText
+from quality import QualityGovernor
+from replay import add_replay_arguments, attach_input
+from static_layers import make_layer
+from storage import transaction
+from swarm import WormSwarm
+from tile_physics import TilePhysicsEngine
+from timestep import (
+    FixedTimestep,
+    InterpolatedPositions,
+    SIMULATION_RATE,
+    TICK_SCALE
 )
 
 # Настройки второго уровня
 SCREEN_TITLE = "Приключения Джо: Platformer - Уровень 2: Прогулка в лесу"
-PLAYER_START_X = SPRITE_PIXEL_SIZE * TILE_SCALING * 2
-PLAYER_START_Y = SPRITE_PIXEL_SIZE * TILE_SCALING * 3
-DOOR_X = 2200
-DOOR_Y = 120
 
 
 class WormEnemy(arcade.Sprite):
-    """Враг-слизень, который убивает игрока при касании"""
+    """
+    Враг-слизень, который убивает игрока при касании.
+    Двигает и анимирует слизней WormSwarm (swarm.py), спрайт хранит
+    начальные настройки и показывает состояние из массивов.
+    """
 
     def __init__(self):
         super().__init__()
         self.scale = TILE_SCALING * 0.8
         self.textures = []
 
-        # Загружаем текстуры для анимации
-        self.textures.append(arcade.load_texture(":resources:/images/enemies/slimeBlue.png"))
-        self.textures.append(arcade.load_texture(":resources:/images/enemies/slimeBlue_move.png"))
+        # Текстуры анимации общие для всех слизней
+        self.textures.append(get_texture(":resources:/images/enemies/slimeBlue.png"))
+        self.textures.append(get_texture(":resources:/images/enemies/slimeBlue_move.png"))
 
         self.texture = self.textures[0]
         self.cur_texture = 0
-        self.animation_timer = 0
         self.animation_speed = 0.2  # Смена текстуры каждые 0.2 секунды
 
         # Настройки движения
         self.move_direction = 1  # 1 - вправо, -1 - влево
-        self.move_speed = 1.5
+        self.move_speed = 1.5 * TICK_SCALE  # пикс/тик
         self.move_range = 100  # Дистанция движения
-        self.start_x = 0
         self.damage = 1  # Урон при касании
 
-    def update_animation(self, delta_time):
-        """Обновление анимации слизня"""
-        self.animation_timer += delta_time
-        if self.animation_timer >= self.animation_speed:
-            self.animation_timer = 0
-            self.cur_texture = (self.cur_texture + 1) % len(self.textures)
-            self.texture = self.textures[self.cur_texture]
-
-    def update_movement(self):
-        """Обновление движения слизня"""
-        if not self.start_x:
-            self.start_x = self.center_x
-
-        # Движение вперед-назад в пределах диапазона
-        self.center_x += self.move_direction * self.move_speed
-
-        # Проверяем, не вышел ли за пределы диапазона
-        if abs(self.center_x - self.start_x) >= self.move_range:
-            self.move_direction *= -1
-
 
 class Spike(arcade.Sprite):
     """Опасные шипы, убивающие игрока"""
 
     def __init__(self):
         super().__init__()
-        self.texture = arcade.load_texture(":resources:images/tiles/spikes.png")
+        self.texture = get_texture(":resources:images/tiles/spikes.png")
         self.scale = TILE_SCALING
         self.damage = 1
 
 
-class GameOverView(arcade.View):
+class GameOverView:
     """Вью для проигрыша"""
 
-    def __init__(self, window, level_class):
-        super().__init__()
+    def __init__(self, window):
         self.window = window
-        self.level_class = level_class
         self.alpha = 0
         self.show_restart_button = False
         self.restart_button_rect = None
-        self.sound_db = SoundDatabase()
-
-    def on_show_view(self):
-        """Вызывается при показе вью"""
-        # Проигрываем звук проигрыша
-        pass
+        self.hud = HudText()
 
     def update(self, delta_time):
         """Обновляет анимацию"""
@@ -168,7 +159,8 @@ class GameOverView(arcade.View):
         )
 
         # Заголовок
-        arcade.draw_text(
+        self.hud.draw(
+            "title",
             "Вы проиграли!",
             container_x,
             container_y + 60,
@@ -180,7 +172,8 @@ class GameOverView(arcade.View):
         )
 
         # Сообщение
-        arcade.draw_text(
+        self.hud.draw(
+            "message",
             "Ваш персонаж был убит",
             container_x,
             container_y,
@@ -217,7 +210,8 @@ class GameOverView(arcade.View):
                 3
             )
 
-            arcade.draw_text(
+            self.hud.draw(
+                "restart_button",
                 "RESTART",
                 x + w // 2,
                 y + h // 2,
@@ -235,21 +229,19 @@ class GameOverView(arcade.View):
             if (button_x <= x <= button_x + button_w and
                     button_y <= y <= button_y + button_h):
                 # Перезапускаем уровень
-                new_game = self.level_class()
-                new_game.setup()
-                self.window.show_view(new_game)
+                self.window.restart()
 
 
 class Level2CompleteView(LevelCompleteView):
     """Вью для завершения уровня 2"""
 
-    def __init__(self, window, score, play_time_seconds):
-        super().__init__(window, score, play_time_seconds, current_level=2)
+    def __init__(self, window, score, play_time_seconds, save_result=True, current_level=2, confetti_scale=1.0):
+        super().__init__(window, score, play_time_seconds, current_level=current_level,
+                         save_result=save_result, confetti_scale=confetti_scale)
         # level_number уже устанавливается в родительском классе
 
     def save_to_database(self):
         """Сохраняет результат уровня 2 в базу данных"""
-        import sqlite3
         from pathlib import Path
 
         try:
@@ -260,44 +252,43 @@ class Level2CompleteView(LevelCompleteView):
 
             print(f"Путь к БД: {db_path}")
 
-            conn = sqlite3.connect(str(db_path))
-            cursor = conn.cursor()
+            # Чтение старого результата и запись нового - одна транзакция
+            with transaction(str(db_path)) as conn:
+                cursor = conn.cursor()
 
-            # Вставляем результат уровня 2
-            player_id = "player_1"
-            level_number = self.current_level
+                # Вставляем результат уровня 2
+                player_id = "player_1"
+                level_number = self.current_level
 
-            # Проверяем, есть ли уже запись для этого уровня
-            cursor.execute('''
-                SELECT score FROM level_results 
-                WHERE player_id = ? AND level_number = ?
-            ''', (player_id, level_number))
-
-            existing_result = cursor.fetchone()
-
-            if existing_result:
-                # Если результат уже есть, обновляем только если новый результат лучше
-                old_score = existing_result[0]
-                if self.score > old_score:
-                    cursor.execute('''
-                        UPDATE level_results 
-                        SET score = ?, play_time_seconds = ?, completed = 1, completed_at = CURRENT_TIMESTAMP
-                        WHERE player_id = ? AND level_number = ?
-                    ''', (self.score, self.play_time_seconds, player_id, level_number))
-                    print(f"✅ Результат уровня {level_number} обновлен: {self.score} (было: {old_score})")
-                else:
-                    print(f"✅ Старый результат лучше: {old_score} > {self.score}, оставляем старый")
-            else:
-                # Если записи нет, создаем новую
+                # Проверяем, есть ли уже запись для этого уровня
                 cursor.execute('''
-                    INSERT INTO level_results 
-                    (player_id, level_number, score, completed, play_time_seconds)
-                    VALUES (?, ?, ?, 1, ?)
-                ''', (player_id, level_number, self.score, self.play_time_seconds))
-                print(f"✅ Результат уровня {level_number} сохранен: {self.score}")
-
-            conn.commit()
-            conn.close()
+                    SELECT score FROM level_results 
+                    WHERE player_id = ? AND level_number = ?
+                ''', (player_id, level_number))
+
+                existing_result = cursor.fetchone()
+
+                if existing_result:
+                    # Если результат уже есть, обновляем только если новый результат лучше
+                    old_score = existing_result[0]
+                    if self.score > old_score:
+                        cursor.execute('''
+                            UPDATE level_results 
+                            SET score = ?, play_time_seconds = ?, completed = 1, completed_at = CURRENT_TIMESTAMP
+                            WHERE player_id = ? AND level_number = ?
+                        ''', (self.score, self.play_time_seconds, player_id, level_number))
+                        print(f"✅ Результат уровня {level_number} обновлен: {self.score} (было: {old_score})")
+                    else:
+                        print(f"✅ Старый результат лучше: {old_score} > {self.score}, оставляем старый")
+                else:
+                    # Если записи нет, создаем новую
+                    cursor.execute('''
+                        INSERT INTO level_results 
+                        (player_id, level_number, score, completed, play_time_seconds)
+                        VALUES (?, ?, ?, 1, ?)
+                    ''', (player_id, level_number, self.score, self.play_time_seconds))
+                    print(f"✅ Результат уровня {level_number} сохранен: {self.score}")
+
             self.level_saved = True
 
         except Exception as e:
@@ -316,9 +307,8 @@ class Level2CompleteView(LevelCompleteView):
             (0, 0, 0, int(self.alpha * 0.7))
         )
 
-        # Частицы
-        for particle in self.particles:
-            particle.draw()
+        # Частицы (одним вызовом)
+        self.particles.draw()
 
         container_width = 600
         container_height = 400
@@ -344,7 +334,8 @@ class Level2CompleteView(LevelCompleteView):
         )
 
         # Заголовок
-        arcade.draw_text(
+        self.hud.draw(
+            "title",
             f"УРОВЕНЬ {self.current_level} ПРОЙДЕН!",
             container_x,
             container_y + 100,
@@ -356,7 +347,8 @@ class Level2CompleteView(LevelCompleteView):
         )
 
         # Подзаголовок
-        arcade.draw_text(
+        self.hud.draw(
+            "subtitle",
             "Вы справились!",
             container_x,
             container_y + 40,
@@ -368,7 +360,8 @@ class Level2CompleteView(LevelCompleteView):
         )
 
         # Счет
-        arcade.draw_text(
+        self.hud.draw(
+            "score",
             f"Ваш счет: {self.score}",
             container_x,
             container_y - 10,
@@ -381,7 +374,8 @@ class Level2CompleteView(LevelCompleteView):
 
         # Время прохождения (в секундах и минутах)
         play_time_minutes = self.play_time_seconds / 60.0
-        arcade.draw_text(
+        self.hud.draw(
+            "time",
             f"Время: {self.play_time_seconds:.1f} сек ({play_time_minutes:.1f} мин)",
             container_x,
             container_y - 60,
@@ -418,7 +412,8 @@ class Level2CompleteView(LevelCompleteView):
                 3
             )
 
-            arcade.draw_text(
+            self.hud.draw(
+                "exit_button",
                 "ВЕРНУТЬСЯ В МЕНЮ",
                 x + w // 2,
                 y + h // 2,
@@ -435,25 +430,47 @@ class Level2CompleteView(LevelCompleteView):
             button_x, button_y, button_w, button_h = self.exit_button_rect
             if (button_x <= x <= button_x + button_w and
                     button_y <= y <= button_y + button_h):
-                # Закрываем окно уровня
-                self.window.close()
+                # Выходим из уровня
+                self.window.exit_level()
 
 
 class MyGame(arcade.View):
     """
-    Главный класс игры для уровня 2
+    Главный класс игры для уровня 2.
+    Уровни с врагами и шипами (уровень 3) наследуют его со своими данными.
     """
 
-    def __init__(self):
+    # Номер уровня: по нему берутся файл данных и результат в БД
+    LEVEL_NUMBER = 2
+
+    # Музыка интро (assets/sounds)
+    INTRO_SOUND = "intro_level_2.mp3"
+
+    def __init__(self, headless=False):
         """
         Инициализатор игры
+
+        Args:
+            headless: безоконный режим - без окна, OpenGL и звука
         """
-        super().__init__()
+        if headless:
+            self.window = None
+        else:
+            super().__init__()
+
+        self.headless = headless
+
+        # Кто запустил уровень (None - отдельное окно)
+        self.host = None
 
         self.music_player = None
 
         # инициализация БД звуков
-        self.sound_db = SoundDatabase()
+        self.sound_db = None if headless else SoundDatabase()
+
+        # Все звуки уровня загружаются сразу, а не при первом проигрывании
+        if not headless:
+            preload_sounds(level_sound_paths(self.INTRO_SOUND))
 
         # интро
         self.show_intro = True
@@ -463,20 +480,24 @@ class MyGame(arcade.View):
         # заморозка игрока
         self.player_frozen = True
 
+        # Данные уровня (levels/data/level_N.json)
+        self.level_data = load_level_data(self.LEVEL_NUMBER)
+        self.intro_texts = self.level_data.get("intro", {})
+
         # музыка
-        sound_path = os.path.join(os.path.dirname(os.path.dirname(__file__)),
-                                  "assets", "sounds", "intro_level_2.mp3")
+        sound_path = os.path.join(SOUNDS_DIR, self.INTRO_SOUND)
 
         # Загружаем звук
-        self.intro_sound = arcade.load_sound(sound_path)
+        self.intro_sound = self.load_sound(sound_path) if os.path.exists(sound_path) else None
 
         # Загружаем громкость музыки из БД
-        music_volume = self.sound_db.get_volume('music')
-        self.music_player = arcade.play_sound(
-            self.intro_sound,
-            volume=music_volume,
-            loop=False
-        )
+        if self.intro_sound:
+            music_volume = self.sound_db.get_volume('music')
+            self.music_player = arcade.play_sound(
+                self.intro_sound,
+                volume=music_volume,
+                loop=False
+            )
 
         # Вью завершения уровня
         self.level_complete_view = None
@@ -493,8 +514,22 @@ class MyGame(arcade.View):
         self.total_play_time_seconds = 0.0
 
         # Камеры
-        self.world_camera = Camera2D()
-        self.gui_camera = Camera2D()
+        if headless:
+            self.world_camera = HeadlessCamera(SCREEN_WIDTH, SCREEN_HEIGHT)
+            self.gui_camera = HeadlessCamera(SCREEN_WIDTH, SCREEN_HEIGHT)
+        else:
+            self.world_camera = Camera2D()
+            self.gui_camera = Camera2D()
+
+        # Фиксированный шаг симуляции и интерполяция для отрисовки
+        self.timestep = FixedTimestep(SIMULATION_RATE)
+        self.interpolation = InterpolatedPositions()
+        self.tick = 0
+
+        # Запись и повтор ввода (replay.py)
+        self.input_recorder = None
+        self.input_replay = None
+        self.replaced_by = None
 
         # Отслеживание нажатых клавиш
         self.left = False
@@ -516,9 +551,11 @@ class MyGame(arcade.View):
         self.player_list = None
         self.door_list = None
         self.enemy_list = None
+        self.enemy_swarm = None
+        self.activity = None
         self.spike_list = None
         self.door = None
-        self.floating_texts = []
+        self.floating_texts = FloatingTextPool()
 
         # Отдельная переменная для спрайта игрока
         self.player_sprite = None
@@ -526,6 +563,17 @@ class MyGame(arcade.View):
         # Физический движок
         self.physics_engine = None
 
+        # Подгрузка тайлов чанками вокруг камеры и отсечение невидимых (создаются в setup)
+        self.chunks = None
+        self.culler = None
+
+        # Надписи интерфейса
+        self.hud = HudText()
+
+        # Адаптивное качество по времени кадра и плавность камеры текущей ступени
+        self.quality = QualityGovernor()
+        self.camera_lerp = CAMERA_LERP
+
         # Физика прыжка
         self.time_since_ground = 5.0
         self.jumps_left = MAX_JUMPS
@@ -537,18 +585,31 @@ class MyGame(arcade.View):
         self.view_bottom = 0
         self.view_left = 0
 
+        # Размер мира (задается в файле уровня)
         self.end_of_map = 0
+        self.world_height = 1000
 
         # Загрузка звуков
-        self.collect_coin_sound = arcade.load_sound(":resources:sounds/coin1.wav")
-        self.jump_sound = arcade.load_sound(":resources:sounds/jump1.wav")
-        self.game_over_sound = arcade.load_sound(":resources:sounds/gameover1.wav")
-        self.door_open_sound = arcade.load_sound(":resources:sounds/upgrade1.wav")
+        self.collect_coin_sound = self.load_sound(":resources:sounds/coin1.wav")
+        self.jump_sound = self.load_sound(":resources:sounds/jump1.wav")
+        self.game_over_sound = self.load_sound(":resources:sounds/gameover1.wav")
+        self.door_open_sound = self.load_sound(":resources:sounds/upgrade1.wav")
 
         # Переменная для подсказки о двери
         self.show_door_hint = False
         self.door_hint_timer = 0.0
 
+    def load_sound(self, path):
+        """Загружает звук (в безоконном режиме звук не нужен)"""
+        if self.headless:
+            return None
+        return get_sound(path)
+
+    def play_sound(self, sound, volume=0.7):
+        """Воспроизводит звук, если он загружен"""
+        if sound:
+            arcade.play_sound(sound, volume=volume)
+
     def play_sound_with_db_volume(self, sound, sound_type):
         """
         Воспроизводит звук с громкостью из базы данных
@@ -557,6 +618,9 @@ class MyGame(arcade.View):
             sound: объект звука arcade
             sound_type: тип звука из БД ('music', 'door_open', 'game_over')
         """
+        if not sound:
+            return
+
         try:
             volume = self.sound_db.get_volume(sound_type)
             if volume > 0:
@@ -589,190 +653,83 @@ class MyGame(arcade.View):
         self.game_start_time = None
         self.total_play_time_seconds = 0.0
 
+        # Сбрасываем шаг симуляции
+        self.timestep.reset()
+        self.interpolation = InterpolatedPositions()
+        self.tick = 0
+
         # Создаем списки спрайтов
         self.player_list = arcade.SpriteList()
-        self.background_list = arcade.SpriteList()
-        self.wall_list = arcade.SpriteList()
+        self.background_list = make_layer("background_list")
+        self.wall_list = make_layer("wall_list")
         self.coin_list = arcade.SpriteList()
-        self.ladder_list = arcade.SpriteList()
+        self.ladder_list = make_layer("ladder_list")
         self.door_list = arcade.SpriteList()
         self.enemy_list = arcade.SpriteList()
-        self.spike_list = arcade.SpriteList()
-        self.floating_texts = []
+        self.spike_list = make_layer("spike_list")
+        self.floating_texts.clear()
+
+        # Broadphase: игрок проверяется только с монетами и шипами рядом (broadphase.py)
+        self.coin_grid = SpatialGrid()
+        self.spike_grid = SpatialGrid()
 
-        # Создаем и размещаем игрока
+        # Создаем игрока (позиция задается в файле уровня)
         self.player_sprite = PlayerCharacter()
-        self.player_sprite.center_x = PLAYER_START_X
-        self.player_sprite.center_y = PLAYER_START_Y
         self.player_list.append(self.player_sprite)
 
         # Создаем дверь и добавляем в спрайт-лист
         self.door = Door()
-        self.door.center_x = DOOR_X
-        self.door.center_y = DOOR_Y + 64
         self.door_list.append(self.door)
 
-        # --- Создаем уровень 2 вручную ---
-        # Создаем землю
-        for x in range(0, 2500, 64):
-            wall = arcade.Sprite(":resources:images/tiles/grassMid.png", TILE_SCALING)
-            wall.center_x = x
-            wall.center_y = 32
-            self.wall_list.append(wall)
-
-        # Платформа 1 - стартовая
-        for x in range(0, 300, 64):
-            wall = arcade.Sprite(":resources:images/tiles/grassMid.png", TILE_SCALING)
-            wall.center_x = x
-            wall.center_y = 200
-            self.wall_list.append(wall)
-
-        # Платформа 2 - с первым врагом
-        for x in range(400, 600, 64):
-            wall = arcade.Sprite(":resources:images/tiles/grassMid.png", TILE_SCALING)
-            wall.center_x = x
-            wall.center_y = 250
-            self.wall_list.append(wall)
-
-        # Добавляем первого врага на платформу 2
-        worm1 = WormEnemy()
-        worm1.center_x = 500
-        worm1.center_y = 270 + 32  # На платформе
-        self.enemy_list.append(worm1)
-
-        # Платформа 3 - опасная, с двумя врагами
-        for x in range(700, 1000, 64):
-            wall = arcade.Sprite(":resources:images/tiles/grassMid.png", TILE_SCALING)
-            wall.center_x = x
-            wall.center_y = 320
-            self.wall_list.append(wall)
-
-        # Два врага на платформе 3
-        worm2 = WormEnemy()
-        worm2.center_x = 780
-        worm2.center_y = 340 + 32
-        worm2.move_range = 80  # Меньший диапазон
-        self.enemy_list.append(worm2)
-
-        worm3 = WormEnemy()
-        worm3.center_x = 920
-        worm3.center_y = 340 + 32
-        worm3.move_range = 50
-        worm3.move_direction = -1  # Начинает движение влево
-        self.enemy_list.append(worm3)
-
-        # Платформа 4 - высокая, нужно прыгать
-        for x in range(1100, 1300, 64):
-            wall = arcade.Sprite(":resources:images/tiles/grassMid.png", TILE_SCALING)
-            wall.center_x = x
-            wall.center_y = 420
-            self.wall_list.append(wall)
-
-        # Враг на высокой платформе
-        worm4 = WormEnemy()
-        worm4.center_x = 1200
-        worm4.center_y = 440 + 32
-        worm4.move_speed = 2.0  # Быстрее
-        self.enemy_list.append(worm4)
-
-        # Платформа 5 - движущаяся к двери
-        for x in range(1450, 1600, 64):
-            wall = arcade.Sprite(":resources:images/tiles/grassMid.png", TILE_SCALING)
-            wall.center_x = x
-            wall.center_y = 350
-            self.wall_list.append(wall)
-
-        # Платформа 6 - перед дверью
-        for x in range(1800, 2000, 64):
-            wall = arcade.Sprite(":resources:images/tiles/grassMid.png", TILE_SCALING)
-            wall.center_x = x
-            wall.center_y = 280
-            self.wall_list.append(wall)
-
-        # Последний враг перед дверью
-        worm5 = WormEnemy()
-        worm5.center_x = 1900
-        worm5.center_y = 300 + 32
-        self.enemy_list.append(worm5)
-
-        # Платформа перед дверью
-        for x in range(2150, 2250, 64):
-            wall = arcade.Sprite(":resources:images/tiles/grassMid.png", TILE_SCALING)
-            wall.center_x = x
-            wall.center_y = 120
-            self.wall_list.append(wall)
-
-        for y in range(180, 450, 64):
-            ladder = arcade.Sprite(":resources:images/tiles/ladderMid.png", TILE_SCALING)
-            ladder.center_x = 1350
-            ladder.center_y = y
-            self.ladder_list.append(ladder)
-
-        # Создаем монеты
-        coin_positions = [
-            (250, 250),  # На первой платформе
-            (550, 300),  # Над первым врагом
-            (850, 370),  # На опасной платформе
-            (1150, 470),  # На высокой платформе
-            (1250, 470),  # На высокой платформе
-            (1500, 400),  # На платформе к двери
-            (1700, 330),  # Перед последним врагом
-            (1950, 330),  # После последнего врага
-            (2000, 330),  # Вторая монета на той же платформе
-            (2100, 170),  # Перед дверью
-        ]
-
-        for x, y in coin_positions:
-            coin = arcade.Sprite(":resources:images/items/coinGold.png", COIN_SCALING)
-            coin.center_x = x
-            coin.center_y = y
-            self.coin_list.append(coin)
-
-        # Добавляем опасные шипы
-        spike_positions = [
-            (1600, 95),
-            (1632, 95),
-            (1664, 95),
-            (1696, 95),
-            (1728, 95),
-        ]
-
-        for x, y in spike_positions:
-            spike = Spike()
-            spike.center_x = x
-            spike.center_y = y
-            self.spike_list.append(spike)
-
-        # Устанавливаем конец карты
-        self.end_of_map = 2500
-
-        # Устанавливаем цвет фона (более мрачный для уровня 2)
-        arcade.set_background_color(arcade.csscolor.DARK_SLATE_GRAY)
-
-        # Создаем физический движок
-        self.physics_engine = PhysicsEnginePlatformer(
+        # Строим уровень из файла данных (levels/data/level_N.json)
+        build_level(self, self.level_data, enemy_class=WormEnemy, spike_class=Spike)
+
+        # Слизни считаются пакетом в массивах (swarm.py) и только рядом с камерой (activity.py)
+        self.enemy_swarm = WormSwarm(self.enemy_list, self.timestep.dt)
+        self.activity = ActivityRegion()
+        self.activity.update(self.world_camera)
+
+        # Настройки текущей ступени качества
+        self.apply_quality()
+
+        # Создаем физический движок: стены - склеенные прямоугольники уровня,
+        # спрайты тайлов нужны только для отрисовки
+        self.physics_engine = TilePhysicsEngine(
             player_sprite=self.player_sprite,
             gravity_constant=GRAVITY,
-            walls=self.wall_list,
-            ladders=self.ladder_list
+            walls=self.level_data.rects.tolist(),
+            ladders=tile_rects(self.level_data, "ladders")
         )
 
+    def on_show_view(self):
+        """ Уровень может показываться в окне меню другого размера """
+        self.on_resize(*self.window.get_size())
+
+    def on_resize(self, width, height):
+        """ Камеры подстраиваются под размер окна """
+        self.world_camera.match_window()
+        self.gui_camera.match_window()
+
     def on_draw(self):
         """ Отрисовка экрана. """
         # Очищаем экран
         self.clear()
 
+        # Позиции между двумя последними тиками для плавной картинки
+        self.interpolation.apply(self.timestep.alpha)
+
         # Используем мировую камеру для игровых объектов
         self.world_camera.use()
 
-        # Отрисовываем спрайты
-        self.wall_list.draw()
-        self.background_list.draw()
-        self.ladder_list.draw()
-        self.coin_list.draw()
+        # Отрисовываем спрайты (слои уровня - только видимые чанки)
+        self.culler.begin(self.world_camera)
+        self.culler.draw("wall_list")
+        self.culler.draw("background_list")
+        self.culler.draw("ladder_list")
+        self.culler.draw("coin_list")
         self.door_list.draw()
         self.enemy_list.draw()
-        self.spike_list.draw()
+        self.culler.draw("spike_list")
 
         self.player_list.draw()
 
@@ -783,6 +740,9 @@ class MyGame(arcade.View):
         for text in self.floating_texts:
             text.draw()
 
+        # Возвращаем настоящие позиции после отрисовки мира
+        self.interpolation.restore()
+
         # Переключаемся на камеру интерфейса
         self.gui_camera.use()
 
@@ -804,8 +764,9 @@ class MyGame(arcade.View):
                 (0, 0, 0, 180)
             )
 
-            arcade.draw_text(
-                "Level 2: Прогулка в лесу",
+            self.hud.draw(
+                "intro_title",
+                f"Level {self.LEVEL_NUMBER}: {self.intro_texts.get('name', '')}",
                 SCREEN_WIDTH // 2,
                 SCREEN_HEIGHT // 2 + 40,
                 color,
@@ -815,8 +776,9 @@ class MyGame(arcade.View):
                 anchor_y="center"
             )
 
-            arcade.draw_text(
-                "Избегайте опасности и доберитесь до конца!",
+            self.hud.draw(
+                "intro_subtitle",
+                self.intro_texts.get("subtitle", ""),
                 SCREEN_WIDTH // 2,
                 SCREEN_HEIGHT // 2 - 20,
                 (255, 100, 100, alpha),
@@ -824,8 +786,9 @@ class MyGame(arcade.View):
                 anchor_x="center",
                 anchor_y="center"
             )
-            arcade.draw_text(
-                "Интересный факт: Собрав все монеты на карте вы наберёте 100 поинтов!",
+            self.hud.draw(
+                "intro_fact",
+                self.intro_texts.get("fact", ""),
                 SCREEN_WIDTH // 2,
                 SCREEN_HEIGHT // 3 - 20,
                 (230, 214, 144, alpha),
@@ -833,7 +796,8 @@ class MyGame(arcade.View):
                 anchor_x="center",
                 anchor_y="center"
             )
-            arcade.draw_text(
+            self.hud.draw(
+                "intro_loading",
                 "Уровень загружается...",
                 SCREEN_WIDTH - 100,
                 SCREEN_HEIGHT // 10 - 20,
@@ -844,8 +808,9 @@ class MyGame(arcade.View):
             )
 
         # --- Рисуем номер уровня сверху ---
-        arcade.draw_text(
-            "Level: 2",
+        self.hud.draw(
+            "level",
+            f"Level: {self.LEVEL_NUMBER}",
             SCREEN_WIDTH // 2,
             SCREEN_HEIGHT - 50,
             arcade.color.YELLOW,
@@ -860,9 +825,11 @@ class MyGame(arcade.View):
             play_time_seconds = current_time - self.game_start_time
             play_time_minutes = play_time_seconds / 60.0
 
-            # Рисуем таймер в верхнем правом углу
+            # Рисуем таймер в верхнем правом углу (текст с точностью 0.1 сек:
+            # надпись раскладывается заново не чаще 10 раз в секунду)
             timer_text = f"Время: {play_time_seconds:.1f} сек"
-            arcade.draw_text(
+            self.hud.draw(
+                "timer",
                 timer_text,
                 SCREEN_WIDTH - 150,
                 SCREEN_HEIGHT - 50,
@@ -893,7 +860,8 @@ class MyGame(arcade.View):
             )
 
             # Текст подсказки
-            arcade.draw_text(
+            self.hud.draw(
+                "door_hint",
                 "Нажмите ПРАВУЮ кнопку мыши у двери для завершения уровня",
                 hint_x,
                 hint_y,
@@ -912,6 +880,29 @@ class MyGame(arcade.View):
         if self.game_over_view:
             self.game_over_view.draw()
 
+        # Текущая ступень качества (регулятор quality.py)
+        self.hud.draw(
+            "quality",
+            f"Качество: {self.quality.name}",
+            10,
+            10,
+            arcade.color.LIGHT_GRAY,
+            11
+        )
+
+        # Регулятор качества (кроме записи и повтора ввода: камера должна совпасть с записью)
+        if not self.input_recorder and not self.input_replay and self.quality.end_frame():
+            self.apply_quality()
+
+    def apply_quality(self):
+        """Применяет настройки текущей ступени качества"""
+        settings = self.quality.settings
+        self.floating_texts.set_limit(settings["floating_texts"])
+        self.camera_lerp = self.quality.camera_lerp
+        self.enemy_swarm.far_interval = settings["enemy_interval"]
+        if self.level_complete_view:
+            self.level_complete_view.confetti_scale = settings["confetti"]
+
     def process_movement(self):
         """Обработка движения игрока"""
         if self.level_complete_view or self.game_over_view:
@@ -932,8 +923,22 @@ class MyGame(arcade.View):
             elif not self.up_pressed and not self.down_pressed:
                 self.player_sprite.change_y = 0
 
+    def accept_input(self):
+        """Во время повтора записи живой ввод игрока игнорируется"""
+        return not self.input_replay or self.input_replay.dispatching
+
     def on_key_press(self, key, modifiers):
         """Вызывается при нажатии клавиши. """
+        # Escape - выход из уровня в любой момент (это не ввод симуляции, в запись не попадает)
+        if key == arcade.key.ESCAPE:
+            self.exit_level()
+            return
+
+        if not self.accept_input():
+            return
+        if self.input_recorder:
+            self.input_recorder.record_key_press(self.tick, key, modifiers)
+
         if self.level_complete_view or self.game_over_view:
             return
 
@@ -959,6 +964,11 @@ class MyGame(arcade.View):
 
     def on_key_release(self, key, modifiers):
         """Вызывается при отпускании клавиши. """
+        if not self.accept_input():
+            return
+        if self.input_recorder:
+            self.input_recorder.record_key_release(self.tick, key, modifiers)
+
         if self.level_complete_view or self.game_over_view:
             return
 
@@ -988,6 +998,11 @@ class MyGame(arcade.View):
 
     def on_mouse_press(self, x, y, button, modifiers):
         """Обрабатывает нажатие мыши"""
+        if not self.accept_input():
+            return
+        if self.input_recorder:
+            self.input_recorder.record_mouse_press(self.tick, x, y, button, modifiers)
+
         if self.level_complete_view:
             self.level_complete_view.on_mouse_press(x, y, button, modifiers)
             return
@@ -1004,10 +1019,33 @@ class MyGame(arcade.View):
             if distance < self.door.interaction_radius:
                 self.complete_level()
 
+    def exit_level(self):
+        """Выход из уровня (после завершения или по Escape)"""
+        if self.host:
+            self.host.exit_level(self)
+        else:
+            # Закрываем окно уровня
+            self.window.close()
+
+    def restart(self):
+        """Перезапускает уровень заново, начиная с интро"""
+        new_game = type(self)(headless=self.headless)
+        new_game.setup()
+
+        # Запись и повтор ввода продолжаются в новой игре
+        new_game.tick = self.tick
+        new_game.input_recorder = self.input_recorder
+        new_game.input_replay = self.input_replay
+        self.replaced_by = new_game
+
+        if self.host:
+            self.host.show_level(new_game)
+        else:
+            self.window.show_view(new_game)
+
     def create_floating_text(self, text):
         """Создает эффект плавающего текста"""
-        floating_text = FloatingText(text, self.player_sprite)
-        self.floating_texts.append(floating_text)
+        self.floating_texts.spawn(text, self.player_sprite)
 
     def complete_level(self):
         """Завершает уровень и показывает экран завершения"""
@@ -1023,9 +1061,12 @@ class MyGame(arcade.View):
             self.play_sound_with_db_volume(self.door_open_sound, 'door_open')
 
             self.level_complete_view = Level2CompleteView(
-                self.window,
+                self,
                 self.player_sprite.score,
-                play_time_seconds
+                play_time_seconds,
+                save_result=not self.headless,
+                current_level=self.LEVEL_NUMBER,
+                confetti_scale=self.quality.settings["confetti"]
             )
             self.player_frozen = True
             self.player_sprite.change_x = 0
@@ -1042,13 +1083,37 @@ class MyGame(arcade.View):
             # Проигрываем звук поражения
             self.play_sound_with_db_volume(self.game_over_sound, 'game_over')
 
-            self.game_over_view = GameOverView(self.window, MyGame)
+            self.game_over_view = GameOverView(self)
             self.player_frozen = True
             self.player_sprite.change_x = 0
             self.player_sprite.change_y = 0
 
     def on_update(self, delta_time):
-        """ Обновление игровой логики и движения """
+        """ Выполняет столько тиков симуляции, сколько накопилось времени """
+        self.quality.begin_frame()
+        for _ in range(self.timestep.advance(delta_time)):
+            self.simulation_step()
+
+    def simulation_step(self):
+        """ Один тик симуляции с запоминанием позиций для интерполяции """
+        # Повтор записанного ввода на тех же тиках
+        if self.input_replay:
+            self.input_replay.feed(self)
+            if self.replaced_by:
+                # Уровень перезапустился по записанному клику - тик выполняет новая игра
+                self.replaced_by.simulation_step()
+                return
+
+        # Интерполируются только слизни рядом с камерой: остальных не видно
+        self.interpolation.capture(self.player_list, self.enemy_swarm.active, (self.world_camera,))
+        self.fixed_update(self.timestep.dt)
+        self.tick += 1
+
+        if self.input_recorder:
+            self.input_recorder.ticks = self.tick
+
+    def fixed_update(self, delta_time):
+        """ Обновление игровой логики и движения (один тик) """
         if self.level_complete_view:
             self.level_complete_view.update(delta_time)
             return
@@ -1082,9 +1147,9 @@ class MyGame(arcade.View):
         if self.door and not self.level_complete_view and not self.game_over_view:
             dx = self.player_sprite.center_x - self.door.center_x
             dy = self.player_sprite.center_y - self.door.center_y
-            distance = math.hypot(dx, dy)
+            hint_radius = self.door.interaction_radius * 2
 
-            if distance < self.door.interaction_radius * 2:
+            if dx * dx + dy * dy < hint_radius * hint_radius:
                 self.show_door_hint = True
                 self.door_hint_timer = 3.0
             else:
@@ -1092,19 +1157,17 @@ class MyGame(arcade.View):
                 if self.door_hint_timer <= 0:
                     self.show_door_hint = False
 
-        # Обновляем врагов
-        for enemy in self.enemy_list:
-            if isinstance(enemy, WormEnemy):
-                enemy.update_animation(delta_time)
-                enemy.update_movement()
+        # Обновляем врагов в области активности вокруг камеры
+        self.activity.update(self.world_camera)
+        self.enemy_swarm.update(self.activity)
 
         # Проверяем столкновения с врагами
-        enemy_hit_list = arcade.check_for_collision_with_list(self.player_sprite, self.enemy_list)
+        enemy_hit_list = self.enemy_swarm.collide(self.player_sprite)
         if enemy_hit_list:
             self.game_over()
 
         # Проверяем столкновения с шипами
-        spike_hit_list = arcade.check_for_collision_with_list(self.player_sprite, self.spike_list)
+        spike_hit_list = self.spike_grid.collide(self.player_sprite)
         if spike_hit_list:
             self.game_over()
 
@@ -1147,41 +1210,40 @@ class MyGame(arcade.View):
                 self.physics_engine.jump(PLAYER_JUMP_SPEED)
                 self.jump_buffer_timer = 0
                 # Просто воспроизводим звук прыжка со стандартной громкостью
-                arcade.play_sound(self.jump_sound, volume=0.7)
+                self.play_sound(self.jump_sound, volume=0.7)
                 self.jump_cooldown = 0.3
                 self.can_jump_again = False
                 self.jump = False
 
         self.coin_list.update_animation(delta_time)
         self.player_list.update_animation(delta_time)
-        self.wall_list.update()
 
-        self.floating_texts = [text for text in self.floating_texts if text.update(delta_time)]
+        self.floating_texts.update(delta_time)
 
-        coin_hit_list = arcade.check_for_collision_with_list(self.player_sprite,
-                                                             self.coin_list)
+        coin_hit_list = self.coin_grid.collide(self.player_sprite)
 
         for coin in coin_hit_list:
             points = 10
             self.player_sprite.add_score(points)
             self.create_floating_text(f"+{points}")
             coin.remove_from_sprite_lists()
+            self.coin_grid.remove(coin)
             # Просто воспроизводим звук сбора монеты со стандартной громкостью
-            arcade.play_sound(self.collect_coin_sound, volume=0.7)
+            self.play_sound(self.collect_coin_sound, volume=0.7)
 
         target_x = self.player_sprite.center_x
         target_y = self.player_sprite.center_y
 
         current_x, current_y = self.world_camera.position
 
-        smooth_x = current_x + (target_x - current_x) * CAMERA_LERP
-        smooth_y = current_y + (target_y - current_y) * CAMERA_LERP
+        smooth_x = current_x + (target_x - current_x) * self.camera_lerp
+        smooth_y = current_y + (target_y - current_y) * self.camera_lerp
 
         half_width = SCREEN_WIDTH / 2
         half_height = SCREEN_HEIGHT / 2
 
         world_width = self.end_of_map
-        world_height = 1000
+        world_height = self.world_height
 
         cam_x = max(half_width, min(world_width - half_width, smooth_x))
         cam_y = max(half_height, min(world_height - half_height, smooth_y))
@@ -1189,15 +1251,40 @@ class MyGame(arcade.View):
         self.world_camera.position = (cam_x, cam_y)
         self.gui_camera.position = (SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2)
 
+        # Подгружаем чанки, к которым приблизилась камера, и выгружаем дальние
+        self.chunks.update(self.world_camera)
 
-def main():
-    """ Главная функция """
-    window = arcade.Window(SCREEN_WIDTH, SCREEN_HEIGHT, SCREEN_TITLE)
+
+def create_view(host=None):
+    """
+    Создает готовый к показу вью уровня 2.
+
+    Args:
+        host: кто запускает уровень (меню); ему уйдут выход и перезапуск
+    """
     game = MyGame()
+    game.host = host
     game.setup()
+    return game
+
+
+def main():
+    """ Главная функция """
+    parser = argparse.ArgumentParser(description=SCREEN_TITLE)
+    add_replay_arguments(parser)
+    args = parser.parse_args()
+
+    window = arcade.Window(SCREEN_WIDTH, SCREEN_HEIGHT, SCREEN_TITLE,
+                           update_rate=RENDER_RATE, draw_rate=RENDER_RATE)
+    game = create_view()
+    recorder = attach_input(game, args, level_number=2)
     window.show_view(game)
     arcade.run()
 
+    # После перезапуска уровня текущей игрой будет уже другой вью
+    if recorder:
+        recorder.save(args.record, window.current_view)
+
 
 if __name__ == "__main__":
     main()
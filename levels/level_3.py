@@ -2,13 +2,65 @@
 Уровень 3 - Храм в небесах
 Сложный уровень
 """
-
 import arcade
+import argparse
+import os
+import sys
+
+# Добавляем путь к уровням для импорта
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import level_2
+from level_1 import SCREEN_WIDTH, SCREEN_HEIGHT, RENDER_RATE
+from replay import add_replay_arguments, attach_input
+
+# Настройки третьего уровня
+SCREEN_TITLE = "Приключения Джо: Platformer - Уровень 3: Храм в небесах"
+
+
+class MyGame(level_2.MyGame):
+    """
+    Главный класс игры для уровня 3.
+    Игра та же, что на уровне 2 (враги, шипы, проигрыш),
+    карта берется из levels/data/level_3.json
+    """
+
+    LEVEL_NUMBER = 3
+
+    # Своей музыки у уровня пока нет - интро без звука
+    INTRO_SOUND = "intro_level_3.mp3"
+
+
+def create_view(host=None):
+    """
+    Создает готовый к показу вью уровня 3.
+
+    Args:
+        host: кто запускает уровень (меню); ему уйдут выход и перезапуск
+    """
+    game = MyGame()
+    game.host = host
+    game.setup()
+    return game
+
+
+def main():
+    """ Главная функция """
+    parser = argparse.ArgumentParser(description=SCREEN_TITLE)
+    add_replay_arguments(parser)
+    args = parser.parse_args()
+
+    window = arcade.Window(SCREEN_WIDTH, SCREEN_HEIGHT, SCREEN_TITLE,
+                           update_rate=RENDER_RATE, draw_rate=RENDER_RATE)
+    game = create_view()
+    recorder = attach_input(game, args, level_number=3)
+    window.show_view(game)
+    arcade.run()
 
+    # После перезапуска уровня текущей игрой будет уже другой вью
+    if recorder:
+        recorder.save(args.record, window.current_view)
 
-def create_level_3(game_view):
-    """Создает третий уровень"""
-    game_view.scene = arcade.Scene()
 
-    # TODO: Реализовать уровень 3
-    print(f"Загружен уровень 3 (заготовка)")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,388 @@
+"""
+Загрузка уровней из файлов данных (levels/data/level_N.json).
+
+Файл уровня описывает:
+    bounds      - размер мира [ширина, высота]
+    spawn       - точка появления игрока [x, y]
+    door        - центр двери [x, y]
+    background  - цвет фона (имя из arcade.csscolor)
+    textures    - имена текстур: {"grass": [путь, масштаб]}
+    walls, ladders, coins, background_tiles - ряды тайлов
+    spikes      - ряды шипов
+    enemies     - слизни: {"at": [x, y], "range": 100, "speed": 1.5, "direction": 1}
+    intro       - тексты интро: name, subtitle, fact
+
+Ряд тайлов - это {"texture": имя, "at": [x, y], "step": [dx, dy], "count": n}:
+n тайлов, начиная с точки at, каждый следующий сдвинут на step.
+Шаг и количество можно не указывать (один тайл).
+
+JSON компилируется в бинарный файл level_N.levelc рядом с ним:
+координаты float32, номера текстур, готовые хитбоксы текстур и
+прямоугольники столкновений стен (соседние тайлы стен склеены
+в большие прямоугольники, их проверяет физика; спрайты тайлов
+остаются только для отрисовки). При загрузке файл отображается
+в память, и спрайты создаются прямо из массивов. Файл пересобирается,
+когда JSON изменился (время изменения или размер).
+
+Собрать все уровни заранее:
+    python levels/level_data.py
+"""
+import glob
+import json
+import mmap
+import os
+import struct
+import tempfile
+
+import arcade
+import numpy as np
+
+from assets import get_texture
+from culling import ChunkCuller
+from streaming import ChunkStreamer
+from timestep import TICK_SCALE
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+# Обязательные поля файла уровня
+REQUIRED_FIELDS = ("bounds", "spawn", "door", "textures")
+
+# Слой файла -> спрайт-лист игры (номер слоя хранится в скомпилированном файле)
+TILE_LAYERS = (
+    ("walls", "wall_list"),
+    ("background_tiles", "background_list"),
+    ("ladders", "ladder_list"),
+    ("coins", "coin_list"),
+)
+
+# Спрайт-лист игры -> ее сетка broadphase (если игра ее завела)
+COLLISION_GRIDS = (
+    ("coin_list", "coin_grid"),
+    ("spike_list", "spike_grid"),
+)
+
+# Скомпилированный уровень: заголовок, мета-данные (JSON), массивы
+COMPILED_MAGIC = b"JOEL"
+COMPILED_VERSION = 2
+HEADER = struct.Struct("<4sHqQIIIII")  # магия, версия, mtime и размер JSON, мета, тайлов, шипов, врагов, прямоугольников
+
+TILE_DTYPE = np.dtype([("x", "<f4"), ("y", "<f4"), ("texture", "<u2"), ("layer", "<u2")])
+POINT_DTYPE = np.dtype([("x", "<f4"), ("y", "<f4")])
+ENEMY_DTYPE = np.dtype([("x", "<f4"), ("y", "<f4"), ("range", "<f4"), ("speed", "<f4"), ("direction", "<i4")])
+RECT_DTYPE = np.dtype([("left", "<f4"), ("bottom", "<f4"), ("right", "<f4"), ("top", "<f4")])
+
+# Права скомпилированного файла - как у обычного нового файла (0666 минус umask)
+_umask = os.umask(0)
+os.umask(_umask)
+FILE_MODE = 0o666 & ~_umask
+
+
+def level_path(level_number):
+    """Путь к файлу данных уровня"""
+    return os.path.join(DATA_DIR, f"level_{level_number}.json")
+
+
+def compiled_path(level_number):
+    """Путь к скомпилированному файлу уровня"""
+    return os.path.join(DATA_DIR, f"level_{level_number}.levelc")
+
+
+def read_source(level_number):
+    """Читает и проверяет JSON уровня"""
+    path = level_path(level_number)
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+
+    missing = [field for field in REQUIRED_FIELDS if field not in data]
+    if missing:
+        raise ValueError(f"В файле уровня {path} нет полей: {', '.join(missing)}")
+
+    return data
+
+
+def iter_run(run):
+    """Координаты всех тайлов ряда"""
+    x, y = run["at"]
+    dx, dy = run.get("step", (0, 0))
+    for i in range(run.get("count", 1)):
+        yield float(x + dx * i), float(y + dy * i)
+
+
+def texture_extents(texture_table):
+    """Границы хитбоксов текстур уровня с учетом масштаба: (left, bottom, right, top) от центра"""
+    extents = []
+    for _, scale, hit_box in texture_table:
+        xs = [x * scale for x, _ in hit_box]
+        ys = [y * scale for _, y in hit_box]
+        extents.append((min(xs), min(ys), max(xs), max(ys)))
+    return extents
+
+
+def merge_rects(rects):
+    """
+    Склеивает вплотную стоящие (или перекрывающиеся) прямоугольники:
+    сначала в ряды по горизонтали, затем ряды одинаковой ширины - по вертикали
+    """
+    rows = []
+    for rect in sorted(rects, key=lambda r: (r[1], r[3], r[0])):
+        if rows:
+            left, bottom, right, top = rows[-1]
+            if rect[1] == bottom and rect[3] == top and rect[0] <= right:
+                rows[-1] = (left, bottom, max(right, rect[2]), top)
+                continue
+        rows.append(tuple(rect))
+
+    merged = []
+    for rect in sorted(rows, key=lambda r: (r[0], r[2], r[1])):
+        if merged:
+            left, bottom, right, top = merged[-1]
+            if rect[0] == left and rect[2] == right and rect[1] <= top:
+                merged[-1] = (left, bottom, right, max(top, rect[3]))
+                continue
+        merged.append(rect)
+    return merged
+
+
+def build_compiled(level_number):
+    """Собирает JSON уровня в байты скомпилированного файла"""
+    source = level_path(level_number)
+    stat = os.stat(source)
+    data = read_source(level_number)
+
+    # Таблица текстур: имя из JSON -> номер, хитбоксы считаются один раз здесь
+    names = list(data["textures"])
+    texture_table = []
+    for name in names:
+        path, scale = data["textures"][name]
+        texture = get_texture(path)
+        texture_table.append([path, scale, [list(point) for point in texture.hit_box_points]])
+    extents = texture_extents(texture_table)
+
+    tiles = []
+    wall_rects = []
+    for layer, (key, _) in enumerate(TILE_LAYERS):
+        for run in data.get(key, ()):
+            if run["texture"] not in data["textures"]:
+                raise ValueError(f"Неизвестная текстура уровня: {run['texture']}")
+            texture_id = names.index(run["texture"])
+            for x, y in iter_run(run):
+                tiles.append((x, y, texture_id, layer))
+                if key == "walls":
+                    left, bottom, right, top = extents[texture_id]
+                    wall_rects.append((x + left, y + bottom, x + right, y + top))
+
+    # Стены для физики: несколько больших прямоугольников вместо сотен тайлов
+    rects = merge_rects(wall_rects)
+
+    spikes = [point for run in data.get("spikes", ()) for point in iter_run(run)]
+
+    # NaN и 0 - значения по умолчанию из класса врага
+    enemies = [(entry["at"][0], entry["at"][1],
+                entry.get("range", np.nan), entry.get("speed", np.nan),
+                entry.get("direction", 0))
+               for entry in data.get("enemies", ())]
+
+    meta = {key: data[key] for key in ("bounds", "spawn", "door", "background", "intro") if key in data}
+    meta["textures"] = texture_table
+    meta_bytes = json.dumps(meta, ensure_ascii=False).encode("utf-8")
+    meta_bytes += b" " * (-len(meta_bytes) % 4)
+
+    return b"".join([
+        HEADER.pack(COMPILED_MAGIC, COMPILED_VERSION, stat.st_mtime_ns, stat.st_size,
+                    len(meta_bytes), len(tiles), len(spikes), len(enemies), len(rects)),
+        meta_bytes,
+        np.array(tiles, dtype=TILE_DTYPE).tobytes(),
+        np.array(spikes, dtype=POINT_DTYPE).tobytes(),
+        np.array(enemies, dtype=ENEMY_DTYPE).tobytes(),
+        np.array(rects, dtype=RECT_DTYPE).tobytes(),
+    ])
+
+
+def compile_level(level_number):
+    """Собирает JSON уровня в бинарный файл и возвращает его путь"""
+    data = build_compiled(level_number)
+
+    # Старый файл может быть отображен в память другим процессом (меню,
+    # прогретые процессы уровней): пишем во временный файл и подменяем
+    # целиком, у читателей остается прежний файл
+    path = compiled_path(level_number)
+    fd, temp_path = tempfile.mkstemp(dir=DATA_DIR, prefix=f"level_{level_number}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp создает файл только для владельца, а права должны быть как у обычного файла
+        os.chmod(temp_path, FILE_MODE)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    return path
+
+
+class CompiledLevel:
+    """Скомпилированный уровень, отображенный в память"""
+
+    def __init__(self, path, buffer=None):
+        """
+        Args:
+            path: путь к скомпилированному файлу
+            buffer: уже собранные байты уровня (тогда файл не читается)
+        """
+        self.path = path
+        if buffer is not None:
+            self.buffer = buffer
+        else:
+            with open(path, "rb") as f:
+                self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (magic, self.version, self.source_mtime, self.source_size, meta_size,
+         tile_count, spike_count, enemy_count, rect_count) = HEADER.unpack_from(self.buffer)
+        if magic != COMPILED_MAGIC:
+            raise ValueError(f"Файл {path} не является скомпилированным уровнем")
+
+        offset = HEADER.size
+        self.meta = json.loads(bytes(self.buffer[offset:offset + meta_size]))
+        offset += meta_size
+
+        self.tiles, offset = self._array(TILE_DTYPE, tile_count, offset)
+        self.spikes, offset = self._array(POINT_DTYPE, spike_count, offset)
+        self.enemies, offset = self._array(ENEMY_DTYPE, enemy_count, offset)
+        self.rects, offset = self._array(RECT_DTYPE, rect_count, offset)
+
+    def _array(self, dtype, count, offset):
+        """Массив поверх отображенного файла без копирования"""
+        array = np.frombuffer(self.buffer, dtype=dtype, count=count, offset=offset)
+        return array, offset + dtype.itemsize * count
+
+    def is_stale(self, level_number):
+        """Файл собран из другой версии JSON или старым компилятором"""
+        stat = os.stat(level_path(level_number))
+        return (self.version != COMPILED_VERSION
+                or self.source_mtime != stat.st_mtime_ns
+                or self.source_size != stat.st_size)
+
+    def get(self, key, default=None):
+        """Поле из мета-данных уровня (bounds, spawn, intro, ...)"""
+        return self.meta.get(key, default)
+
+    def __getitem__(self, key):
+        return self.meta[key]
+
+
+# Уже загруженные уровни: перезапуск не перечитывает файл
+_loaded = {}
+
+
+def load_level_data(level_number):
+    """
+    Скомпилированный уровень (один раз за процесс).
+    Собирает его, если файла нет или JSON изменился.
+    """
+    if level_number in _loaded:
+        return _loaded[level_number]
+
+    path = compiled_path(level_number)
+    level = None
+    if os.path.exists(path):
+        try:
+            level = CompiledLevel(path)
+            if level.is_stale(level_number):
+                level = None
+        except (OSError, ValueError, struct.error):
+            level = None
+
+    if level is None:
+        try:
+            level = CompiledLevel(compile_level(level_number))
+        except OSError as e:
+            # Папка уровней только для чтения (или файл чужой): уровень собирается в памяти
+            print(f"Не удалось сохранить скомпилированный уровень {level_number}: {e}")
+            level = CompiledLevel(None, build_compiled(level_number))
+
+    _loaded[level_number] = level
+    return level
+
+
+def tile_rects(level, layer_key):
+    """
+    Прямоугольники (left, bottom, right, top) всех тайлов слоя файла
+    ("walls", "ladders", ...) по хитбоксам их текстур - для физики
+    """
+    layer = [key for key, _ in TILE_LAYERS].index(layer_key)
+    extents = texture_extents(level["textures"])
+
+    rects = []
+    for x, y, texture_id, _ in level.tiles[level.tiles["layer"] == layer].tolist():
+        left, bottom, right, top = extents[texture_id]
+        rects.append((x + left, y + bottom, x + right, y + top))
+    return rects
+
+
+def build_level(game, level, enemy_class=None, spike_class=None):
+    """
+    Расставляет игрока, дверь и врагов и подключает подгрузку чанков
+    (streaming.py), которая заполняет спрайт-листы тайлами вокруг камеры.
+    Списки, игрок и камера уже созданы. Монеты и шипы попадают
+    и в сетки broadphase игры (coin_grid, spike_grid), если они есть.
+
+    Args:
+        enemy_class: класс врага (нужен, если в уровне есть враги)
+        spike_class: класс шипов (нужен, если в уровне есть шипы)
+    """
+    game.end_of_map, game.world_height = level["bounds"]
+    game.player_sprite.position = tuple(map(float, level["spawn"]))
+    game.door.position = tuple(map(float, level["door"]))
+
+    # Текстуры с готовыми хитбоксами
+    textures = []
+    scales = []
+    for path, scale, hit_box in level["textures"]:
+        textures.append(get_texture(path, hit_box_points=[tuple(point) for point in hit_box]))
+        scales.append(scale)
+
+    # Тайлы и шипы подгружаются чанками вокруг камеры
+    if len(level.spikes) and spike_class is None:
+        raise ValueError("Уровень с шипами, но класс шипов не задан")
+    grids = {list_name: getattr(game, grid_name)
+             for list_name, grid_name in COLLISION_GRIDS if hasattr(game, grid_name)}
+    game.chunks = ChunkStreamer(game, level, textures, scales,
+                                [list_name for _, list_name in TILE_LAYERS], spike_class,
+                                draw_lists=not game.headless, grids=grids)
+    game.chunks.update(game.world_camera)
+    game.culler = ChunkCuller(game.chunks)
+
+    if len(level.enemies):
+        if enemy_class is None:
+            raise ValueError("Уровень с врагами, но класс врага не задан")
+        for x, y, move_range, speed, direction in level.enemies.tolist():
+            enemy = enemy_class()
+            enemy.position = (x, y)
+            if not np.isnan(move_range):
+                enemy.move_range = move_range
+            if not np.isnan(speed):
+                # В файле скорость в пикселях за тик при 60 тиках/с
+                enemy.move_speed = speed * TICK_SCALE
+            if direction:
+                enemy.move_direction = direction
+            game.enemy_list.append(enemy)
+
+    # Цвет фона
+    if not game.headless and "background" in level.meta:
+        arcade.set_background_color(getattr(arcade.csscolor, level["background"]))
+
+
+def main():
+    """ Сборка всех уровней из levels/data """
+    for source in sorted(glob.glob(os.path.join(DATA_DIR, "level_*.json"))):
+        level_number = int(os.path.basename(source)[len("level_"):-len(".json")])
+        level = CompiledLevel(compile_level(level_number))
+        print(f"Уровень {level_number}: {len(level.tiles)} тайлов, {len(level.spikes)} шипов, "
+              f"{len(level.enemies)} врагов, {len(level.rects)} прямоугольников стен -> {level.path}")
+
+
+if __name__ == "__main__":
+    main()
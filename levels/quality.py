@@ -0,0 +1,146 @@
+"""
+Адаптивное качество по измеренному времени кадра.
+
+Регулятор следит за скользящим средним времени работы кадра
+(on_update + on_draw). Если оно подбирается к бюджету кадра, качество
+понижается на ступень: меньше конфетти на экране завершения, меньше
+одновременных текстов "+10", дальние (за экраном) слизни обновляются
+реже, камера меньше сглаживается и быстрее останавливается. Когда
+запас появляется снова, качество поднимается обратно. Между
+переключениями выдерживается пауза, чтобы уровень не скакал.
+
+Все настройки только визуальные и на симуляцию не влияют. При записи
+и повторе ввода регулятор не работает, чтобы камера (а с ней и
+подгрузка чанков) была той же, что при записи.
+
+Уровень можно закрепить переменной окружения PLATFORMER_QUALITY:
+номер ступени (0 - лучшее качество) или ее имя (high, medium, low,
+minimal или название из интерфейса); по умолчанию auto.
+"""
+import os
+import time
+from collections import deque
+
+from timestep import TICK_SCALE
+
+# Ступени качества, от лучшего к худшему
+QUALITY_LEVELS = [
+    # key: имя для PLATFORMER_QUALITY
+    # name: название в интерфейсе
+    # confetti: доля частиц конфетти
+    # floating_texts: сколько текстов "+10" одновременно
+    # enemy_interval: раз во сколько тиков обновляются слизни за экраном
+    # camera_smoothing: доля пути к игроку, которую камера проходит за тик (при 60 тиках)
+    {"key": "high", "name": "высокое", "confetti": 1.0, "floating_texts": 8, "enemy_interval": 1, "camera_smoothing": 0.12},
+    {"key": "medium", "name": "среднее", "confetti": 0.5, "floating_texts": 4, "enemy_interval": 2, "camera_smoothing": 0.2},
+    {"key": "low", "name": "низкое", "confetti": 0.25, "floating_texts": 2, "enemy_interval": 4, "camera_smoothing": 0.35},
+    {"key": "minimal", "name": "минимальное", "confetti": 0.1, "floating_texts": 1, "enemy_interval": 8, "camera_smoothing": 1.0},
+]
+
+# Бюджет кадра (сек) и пороги понижения и повышения качества (доли бюджета)
+FRAME_BUDGET = 1 / 60
+LOWER_AT = 0.9
+RAISE_AT = 0.5
+
+# Сколько последних кадров усредняется
+FRAME_WINDOW = 30
+
+# Сколько кадров ждать после переключения, прежде чем переключаться снова
+SWITCH_COOLDOWN = 60
+
+
+def parse_quality(setting):
+    """
+    Номер ступени по значению PLATFORMER_QUALITY (номер, key или name);
+    None - подбирать по времени кадра (auto или непонятное значение)
+    """
+    value = setting.strip().lower()
+    if value in ("", "auto"):
+        return None
+    if value.isdigit() and int(value) < len(QUALITY_LEVELS):
+        return int(value)
+    for index, level in enumerate(QUALITY_LEVELS):
+        if value in (level["key"], level["name"]):
+            return index
+    print(f"Неизвестное качество PLATFORMER_QUALITY={setting!r}, используется auto")
+    return None
+
+
+# Закрепленная ступень качества (None - подбирать по времени кадра)
+QUALITY_SETTING = os.environ.get("PLATFORMER_QUALITY", "auto")
+FIXED_LEVEL = parse_quality(QUALITY_SETTING)
+
+
+def camera_lerp(smoothing):
+    """Доля пути камеры за тик при текущей частоте симуляции"""
+    return 1 - (1 - smoothing) ** TICK_SCALE
+
+
+class QualityGovernor:
+    """Ступень качества по скользящему времени кадра"""
+
+    def __init__(self, budget=FRAME_BUDGET, fixed_level=FIXED_LEVEL):
+        """
+        Args:
+            budget: бюджет кадра (сек)
+            fixed_level: закрепленная ступень (None - подбирать по времени кадра)
+        """
+        self.budget = budget
+        self.fixed = fixed_level is not None
+        self.level = fixed_level if self.fixed else 0
+        self.frames = deque(maxlen=FRAME_WINDOW)
+        self.cooldown = 0
+        self.frame_start = None
+
+    @property
+    def settings(self):
+        """Настройки текущей ступени"""
+        return QUALITY_LEVELS[self.level]
+
+    @property
+    def name(self):
+        return self.settings["name"]
+
+    @property
+    def camera_lerp(self):
+        return camera_lerp(self.settings["camera_smoothing"])
+
+    @property
+    def average(self):
+        """Среднее время работы кадра (сек)"""
+        return sum(self.frames) / len(self.frames) if self.frames else 0.0
+
+    def begin_frame(self):
+        """Начало работы кадра (в начале on_update)"""
+        self.frame_start = time.perf_counter()
+
+    def end_frame(self):
+        """
+        Конец работы кадра (в конце on_draw). Возвращает True,
+        если ступень качества изменилась и настройки надо применить.
+        """
+        if self.frame_start is None:
+            return False
+        self.frames.append(time.perf_counter() - self.frame_start)
+        self.frame_start = None
+
+        if self.fixed:
+            return False
+        if self.cooldown:
+            self.cooldown -= 1
+            return False
+        if len(self.frames) < self.frames.maxlen:
+            return False
+
+        average = self.average
+        if average > self.budget * LOWER_AT and self.level < len(QUALITY_LEVELS) - 1:
+            self.level += 1
+        elif average < self.budget * RAISE_AT and self.level > 0:
+            self.level -= 1
+        else:
+            return False
+
+        print(f"Качество: {self.name} (кадр {average * 1000:.1f} мс)")
+        self.frames.clear()
+        self.cooldown = SWITCH_COOLDOWN
+        return True
@@ -0,0 +1,182 @@
+"""
+Запись и воспроизведение ввода игрока по тикам симуляции.
+Одинаковый ввод на тех же тиках дает тот же результат, поэтому
+записанный проход уровня можно прогонять повторно (в окне или без него).
+
+Воспроизведение без окна:
+    python levels/replay.py run.rec
+"""
+import argparse
+import hashlib
+import os
+import struct
+import sys
+
+# Добавляем папку уровней для импорта
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from timestep import SIMULATION_RATE
+
+# Формат файла: заголовок, затем события фиксированного размера
+REPLAY_MAGIC = b"JOER"
+REPLAY_VERSION = 1
+HEADER = struct.Struct("<4sBBHII16s")  # магия, версия, уровень, тик/с, тиков, событий, хеш
+EVENT = struct.Struct("<IBiffBH")  # тик, тип, клавиша, x, y, кнопка, модификаторы
+
+# Типы событий
+KEY_PRESS = 1
+KEY_RELEASE = 2
+MOUSE_PRESS = 3
+
+
+def state_digest(game):
+    """Хеш игрового состояния для сравнения записи и повтора"""
+    player = game.player_sprite
+    parts = [
+        game.tick,
+        player.center_x, player.center_y,
+        player.change_x, player.change_y,
+        player.score,
+        len(game.coin_list),
+        game.level_complete_view is not None,
+        getattr(game, "game_over_view", None) is not None,
+    ]
+    swarm = getattr(game, "enemy_swarm", None)
+    for x, direction in (swarm.state() if swarm is not None else ()):
+        parts.append(x)
+        parts.append(direction)
+    return hashlib.md5(repr(parts).encode("utf-8")).digest()
+
+
+class InputRecorder:
+    """Записывает события клавиатуры и мыши с номером тика"""
+
+    def __init__(self, level_number, tick_rate=SIMULATION_RATE):
+        self.level_number = level_number
+        self.tick_rate = tick_rate
+        self.events = []
+        self.ticks = 0
+
+    def record_key_press(self, tick, key, modifiers):
+        self.events.append((tick, KEY_PRESS, key, 0.0, 0.0, 0, modifiers))
+
+    def record_key_release(self, tick, key, modifiers):
+        self.events.append((tick, KEY_RELEASE, key, 0.0, 0.0, 0, modifiers))
+
+    def record_mouse_press(self, tick, x, y, button, modifiers):
+        self.events.append((tick, MOUSE_PRESS, 0, x, y, button, modifiers))
+
+    def save(self, path, game):
+        """Сохраняет запись вместе с хешем итогового состояния"""
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(
+                REPLAY_MAGIC,
+                REPLAY_VERSION,
+                self.level_number,
+                self.tick_rate,
+                self.ticks,
+                len(self.events),
+                state_digest(game)
+            ))
+            for event in self.events:
+                f.write(EVENT.pack(*event))
+
+        print(f"Запись ввода сохранена: {path} ({len(self.events)} событий, {self.ticks} тиков)")
+
+
+class InputReplay:
+    """Подает записанные события в уровень на тех же тиках"""
+
+    def __init__(self, level_number, tick_rate, ticks, events, digest):
+        self.level_number = level_number
+        self.tick_rate = tick_rate
+        self.ticks = ticks
+        self.events = events
+        self.digest = digest
+        self.index = 0
+        self.dispatching = False
+
+    @classmethod
+    def load(cls, path):
+        """Читает запись из файла"""
+        with open(path, "rb") as f:
+            data = f.read()
+
+        magic, version, level_number, tick_rate, ticks, count, digest = HEADER.unpack_from(data)
+        if magic != REPLAY_MAGIC or version != REPLAY_VERSION:
+            raise ValueError(f"Файл {path} не является записью ввода версии {REPLAY_VERSION}")
+
+        events = list(EVENT.iter_unpack(data[HEADER.size:HEADER.size + count * EVENT.size]))
+        return cls(level_number, tick_rate, ticks, events, digest)
+
+    @property
+    def finished(self):
+        return self.index >= len(self.events)
+
+    def feed(self, game):
+        """Передает в уровень все события текущего тика"""
+        self.dispatching = True
+        try:
+            while not self.finished and self.events[self.index][0] == game.tick:
+                # Уровень перезапустился - остальные события достанутся новой игре
+                if game.replaced_by:
+                    break
+
+                _, kind, key, x, y, button, modifiers = self.events[self.index]
+                self.index += 1
+
+                if kind == KEY_PRESS:
+                    game.on_key_press(key, modifiers)
+                elif kind == KEY_RELEASE:
+                    game.on_key_release(key, modifiers)
+                elif kind == MOUSE_PRESS:
+                    game.on_mouse_press(x, y, button, modifiers)
+        finally:
+            self.dispatching = False
+
+
+def add_replay_arguments(parser):
+    """Добавляет в парсер аргументы записи и повтора ввода"""
+    parser.add_argument("--record", metavar="FILE", help="записать ввод в файл")
+    parser.add_argument("--replay", metavar="FILE", help="воспроизвести ввод из файла")
+
+
+def attach_input(game, args, level_number):
+    """Подключает запись или повтор ввода к уровню по аргументам командной строки"""
+    if args.replay:
+        game.input_replay = InputReplay.load(args.replay)
+    if args.record:
+        game.input_recorder = InputRecorder(level_number, game.timestep.tick_rate)
+    return game.input_recorder
+
+
+def main():
+    """ Воспроизведение записи без окна и проверка результата """
+    from headless import HeadlessRunner
+
+    parser = argparse.ArgumentParser(description="Повтор записанного ввода без окна")
+    parser.add_argument("file", help="файл записи")
+    args = parser.parse_args()
+
+    replay = InputReplay.load(args.file)
+    if replay.tick_rate != SIMULATION_RATE:
+        print(f"Запись сделана при {replay.tick_rate} тиках/с, сейчас {SIMULATION_RATE}")
+
+    runner = HeadlessRunner(replay.level_number)
+    runner.game.input_replay = replay
+    runner.step(replay.ticks)
+
+    # События, пришедшие после последнего тика (перед закрытием окна)
+    replay.feed(runner.game)
+
+    game = runner.game
+    same = state_digest(game) == replay.digest
+    print(f"Уровень {replay.level_number}: {replay.ticks} тиков, {len(replay.events)} событий")
+    print(f"Игрок: ({game.player_sprite.center_x:.2f}, {game.player_sprite.center_y:.2f}), "
+          f"очки: {game.player_sprite.score}")
+    print("Результат совпадает с записью" if same else "Результат НЕ совпадает с записью")
+    sys.exit(0 if same else 1)
+
+
+if __name__ == "__main__":
+    main()
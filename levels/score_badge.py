@@ -0,0 +1,109 @@
+"""
+Счет над головой игрока.
+
+Раньше счет каждый кадр заново раскладывался как текст и рисовался
+двумя прямоугольниками в немедленном режиме. Здесь символы ("Points: "
+и цифры) один раз рендерятся в текстуры атласа, надпись собирается
+из спрайтов-символов, а фон с рамкой лежат в постоянном
+ShapeElementList. Раскладка пересобирается, только когда меняется
+счет, а фон - только когда меняется ширина надписи. Движение игрока
+лишь сдвигает готовую плашку.
+"""
+import arcade
+from arcade.shape_list import ShapeElementList, create_rectangle_filled, create_rectangle_outline
+
+# Отрендеренные символы: (символ, размер, цвет, жирный) -> (текстура, спуск под базовой линией)
+_glyphs = {}
+
+
+def render_glyph(text, color, font_size, bold):
+    """Текстура надписи в атласе окна и спуск под базовой линией (как arcade.create_text_sprite)"""
+    key = (text, font_size, tuple(color), bold)
+    glyph = _glyphs.get(key)
+    if glyph is None:
+        label = arcade.Text(text, 0, 0, color, font_size, bold=bold, anchor_y="baseline")
+        size = (int(label.right - label.left), int(label.top - label.bottom))
+        descent = -label.bottom
+        label.y = descent
+
+        texture = arcade.Texture.create_empty(f"score_badge:{key}", size)
+        atlas = arcade.get_window().ctx.default_atlas
+        atlas.add(texture)
+        with atlas.render_into(texture) as framebuffer:
+            framebuffer.clear(color=arcade.color.TRANSPARENT_BLACK)
+            label.draw()
+
+        glyph = (texture, descent)
+        _glyphs[key] = glyph
+    return glyph
+
+
+class ScoreBadge:
+    """Плашка со счетом из заранее отрендеренных символов"""
+
+    def __init__(self, prefix="Points: ", color=arcade.color.YELLOW, font_size=14, bold=True):
+        self.prefix = prefix
+        self.color = color
+        self.font_size = font_size
+        self.bold = bold
+
+        # Спрайты символов относительно точки привязки (центр, базовая линия)
+        self.sprites = arcade.SpriteList()
+        self.offsets = []
+        # Фон и рамка относительно точки привязки
+        self.frame = None
+
+        self.score = None
+        self.width = None
+        self.anchor = None
+        self.rebuilds = 0
+
+    def _layout(self, score):
+        # Символы надписи слева направо, по центру точки привязки
+        glyphs = [render_glyph(self.prefix, self.color, self.font_size, self.bold)]
+        glyphs += [render_glyph(digit, self.color, self.font_size, self.bold) for digit in str(score)]
+        width = sum(texture.width for texture, _ in glyphs)
+        height = max(texture.height for texture, _ in glyphs)
+
+        while len(self.sprites) < len(glyphs):
+            self.sprites.append(arcade.Sprite())
+        while len(self.sprites) > len(glyphs):
+            self.sprites.pop()
+
+        self.offsets = []
+        left = -width / 2
+        for sprite, (texture, descent) in zip(self.sprites, glyphs):
+            sprite.texture = texture
+            self.offsets.append((left + texture.width / 2, texture.height / 2 - descent))
+            left += texture.width
+        self.anchor = None
+
+        if width != self.width:
+            self.width = width
+            self._build_frame(width, height)
+        self.score = score
+        self.rebuilds += 1
+
+    def _build_frame(self, text_width, text_height):
+        # Размеры как у прежней плашки: отступ 5 по бокам и 3 сверху и снизу от базовой линии
+        half_w = (text_width + 10) // 2
+        half_h = (text_height + 6) // 2
+        self.frame = ShapeElementList()
+        self.frame.append(create_rectangle_filled(0, 0, half_w * 2, half_h * 2, arcade.color.BLACK))
+        self.frame.append(create_rectangle_outline(0, 0, half_w * 2, half_h * 2, arcade.color.WHITE, 2))
+
+    def draw(self, score, x, y):
+        """Рисует плашку со счетом score; (x, y) - центр базовой линии текста"""
+        if score != self.score:
+            self._layout(score)
+
+        # Целые пиксели: символы остаются четкими
+        anchor = (round(x), round(y))
+        if anchor != self.anchor:
+            self.anchor = anchor
+            for sprite, (dx, dy) in zip(self.sprites, self.offsets):
+                sprite.position = (anchor[0] + dx, anchor[1] + dy)
+            self.frame.position = anchor
+
+        self.frame.draw()
+        self.sprites.draw()
@@ -0,0 +1,183 @@
+"""
+Настройки звуков в памяти.
+
+Раньше каждый звук двери или проигрыша читал громкость из SQLite
+прямо в кадре, а каждый клик +/- в настройках сразу писал в базу.
+Здесь таблица sound_settings читается один раз, громкость отдается
+из словаря в памяти, а изменения копятся и записываются фоновым
+потоком одной транзакцией через FLUSH_DELAY после последнего
+изменения.
+
+Тот же поток раз в POLL_INTERVAL сверяет PRAGMA data_version своего
+соединения: значение меняется, когда базу изменил кто-то другой
+(другой процесс уровня или другое соединение этого процесса), и
+тогда настройки перечитываются. Еще не записанные свои изменения
+при этом остаются.
+
+Кеш один на файл базы в процессе - см. get_settings_cache.
+"""
+import atexit
+import os
+import sqlite3
+import threading
+import time
+
+from storage import connect, transaction
+
+# Через сколько секунд после последнего изменения оно уходит в базу
+FLUSH_DELAY = 0.5
+
+# Как часто фоновый поток проверяет чужие изменения базы (сек)
+POLL_INTERVAL = 0.25
+
+# Громкость звука, которого нет в таблице
+DEFAULT_VOLUME = 0.5
+
+# Кеши процесса: абсолютный путь базы -> SettingsCache
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_settings_cache(path):
+    """Общий для процесса кеш настроек базы path"""
+    path = os.path.abspath(path)
+    with _caches_lock:
+        cache = _caches.get(path)
+        if cache is None:
+            cache = SettingsCache(path)
+            _caches[path] = cache
+        return cache
+
+
+def read_settings(conn):
+    """Все настройки таблицы: тип звука -> {'volume', 'enabled'}"""
+    rows = conn.execute('''
+        SELECT sound_type, volume, is_enabled FROM sound_settings
+    ''').fetchall()
+    return {sound_type: {'volume': volume, 'enabled': bool(is_enabled)}
+            for sound_type, volume, is_enabled in rows}
+
+
+class SettingsCache:
+    """Настройки звуков в памяти с отложенной записью в фоне"""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        # Не дает двум записям (фоновой и flush) идти одновременно
+        self.flush_lock = threading.Lock()
+
+        self.values = read_settings(connect(path))
+        # Измененные, но еще не записанные типы звуков
+        self.dirty = set()
+        self.flush_at = None
+
+        self.reloads = 0
+        self.flushes = 0
+
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="settings-cache", daemon=True)
+        self.thread.start()
+
+    def get_volume(self, sound_type):
+        """Громкость звука (0, если звук выключен) - без обращения к диску"""
+        setting = self.values.get(sound_type)
+        if setting is None:
+            return DEFAULT_VOLUME
+        return setting['volume'] if setting['enabled'] else 0.0
+
+    def get_all(self):
+        """Копия всех настроек"""
+        with self.lock:
+            return {sound_type: dict(setting) for sound_type, setting in self.values.items()}
+
+    def set_volume(self, sound_type, volume):
+        """Меняет громкость в памяти; в базу она уйдет позже"""
+        self._change(sound_type, volume=max(0.0, min(1.0, volume)))
+
+    def set_enabled(self, sound_type, enabled=True):
+        """Включает или выключает звук в памяти; в базу это уйдет позже"""
+        self._change(sound_type, enabled=bool(enabled))
+
+    def _change(self, sound_type, **fields):
+        with self.lock:
+            setting = self.values.get(sound_type)
+            if setting is None:
+                # Таблица обновляет только существующие строки
+                return
+            self.values[sound_type] = dict(setting, **fields)
+            self.dirty.add(sound_type)
+            self.flush_at = time.monotonic() + FLUSH_DELAY
+
+    def flush(self):
+        """Записывает накопленные изменения одной транзакцией"""
+        with self.flush_lock:
+            with self.lock:
+                if not self.dirty:
+                    return
+                pending = {sound_type: self.values[sound_type] for sound_type in self.dirty}
+                self.dirty.clear()
+                self.flush_at = None
+
+            try:
+                with transaction(self.path) as conn:
+                    for sound_type, setting in pending.items():
+                        conn.execute('''
+                            UPDATE sound_settings
+                            SET volume = ?, is_enabled = ?, last_updated = CURRENT_TIMESTAMP
+                            WHERE sound_type = ?
+                        ''', (setting['volume'], 1 if setting['enabled'] else 0, sound_type))
+            except sqlite3.Error:
+                # Вернем изменения в очередь, запишем в следующий раз
+                with self.lock:
+                    self.dirty.update(pending)
+                    self.flush_at = time.monotonic() + FLUSH_DELAY
+                raise
+            self.flushes += 1
+
+    def reload(self, conn=None):
+        """Перечитывает настройки из базы; свои незаписанные изменения остаются"""
+        values = read_settings(conn or connect(self.path))
+        with self.lock:
+            for sound_type in self.dirty:
+                if sound_type in self.values:
+                    values[sound_type] = self.values[sound_type]
+            self.values = values
+        self.reloads += 1
+
+    def close(self):
+        """Останавливает фоновый поток и записывает оставшееся"""
+        self.stop_event.set()
+        if self.thread.is_alive() and self.thread is not threading.current_thread():
+            self.thread.join()
+        self.flush()
+
+    def _run(self):
+        # У потока свое соединение: data_version меняют только чужие записи
+        conn = connect(self.path)
+        data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+        # Изменения между первой загрузкой и стартом потока
+        self.reload(conn)
+
+        while not self.stop_event.wait(POLL_INTERVAL):
+            try:
+                if self.flush_at is not None and time.monotonic() >= self.flush_at:
+                    self.flush()
+
+                version = conn.execute("PRAGMA data_version").fetchone()[0]
+                if version != data_version:
+                    data_version = version
+                    self.reload(conn)
+            except sqlite3.Error as e:
+                print(f"Ошибка фоновой записи настроек: {e}")
+
+
+@atexit.register
+def _close_caches():
+    with _caches_lock:
+        caches = list(_caches.values())
+    for cache in caches:
+        try:
+            cache.close()
+        except sqlite3.Error as e:
+            print(f"Настройки не записаны: {e}")
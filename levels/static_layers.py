@@ -0,0 +1,118 @@
+"""
+Статичные слои уровня: стены, фон, лестницы, шипы.
+
+Спрайты этих слоев не двигаются и не меняются после создания. Слои
+не участвуют в покадровых обновлениях, а буферы спрайт-листов уходят
+на видеокарту один раз: arcade перезаливает буфер, только когда в нем
+что-то изменилось. Состав слоя меняет только подгрузка чанков
+(streaming.py): спрайт-листы чанков собираются один раз при загрузке.
+
+Статичный слой считает свои изменения (version): любое изменение
+спрайта (позиция, размер, угол, текстура, цвет) или состава списка
+увеличивает счетчик, и запеченная текстура слоя (baking.py)
+перезапекается. Сами статичные спрайты не меняются, так что счетчик
+растет только при сборке слоя.
+
+В режиме отладки (PLATFORMER_DEBUG=1) статичный слой ловит ошибки:
+изменение его спрайта и вызов update() / update_animation() бросают
+StaticLayerError.
+"""
+import os
+
+import arcade
+
+# Режим отладки: дополнительные проверки ценой скорости
+DEBUG = os.environ.get("PLATFORMER_DEBUG", "0") not in ("", "0")
+
+# Спрайт-листы игры, которые не меняются после постройки уровня
+STATIC_LAYERS = ("wall_list", "background_list", "ladder_list", "spike_list")
+
+
+class StaticLayerError(RuntimeError):
+    """Статичный слой изменили"""
+
+
+# Методы SpriteList, которые меняют спрайты или состав списка
+VERSIONED_METHODS = (
+    "append", "insert", "remove", "pop", "clear", "__setitem__",
+    "swap", "reverse", "shuffle", "sort",
+    "_update_all", "_update_texture", "_update_position", "_update_position_x",
+    "_update_position_y", "_update_angle", "_update_size", "_update_width",
+    "_update_height", "_update_color", "_update_depth",
+)
+
+
+def _bump_version(method):
+    def wrapper(self, *args, **kwargs):
+        self.version += 1
+        return method(self, *args, **kwargs)
+
+    wrapper.__name__ = method.__name__
+    wrapper.__doc__ = method.__doc__
+    return wrapper
+
+
+class VersionedSpriteList(arcade.SpriteList):
+    """Спрайт-лист, который считает свои изменения в version"""
+
+    def __init__(self, **kwargs):
+        self.version = 0
+        super().__init__(**kwargs)
+
+
+for _name in VERSIONED_METHODS:
+    setattr(VersionedSpriteList, _name, _bump_version(getattr(arcade.SpriteList, _name)))
+
+
+class StaticSpriteList(VersionedSpriteList):
+    """Спрайт-лист статичного слоя, который проверяет, что его спрайты не меняются"""
+
+    def __init__(self, name, **kwargs):
+        self.name = name
+        self._loading = False
+        super().__init__(**kwargs)
+
+    def _init_deferred(self):
+        # Ленивый список при инициализации сам записывает текстуры всех спрайтов
+        self._loading = True
+        try:
+            super()._init_deferred()
+        finally:
+            self._loading = False
+
+    def _changed(self, sprite):
+        raise StaticLayerError(f"Спрайт статичного слоя {self.name} изменился: {sprite}")
+
+    _update_position = _changed
+    _update_position_x = _changed
+    _update_position_y = _changed
+    _update_angle = _changed
+    _update_size = _changed
+    _update_width = _changed
+    _update_height = _changed
+    _update_color = _changed
+    _update_depth = _changed
+
+    def _update_texture(self, sprite):
+        if not self._loading:
+            self._changed(sprite)
+        super()._update_texture(sprite)
+
+    def update(self, *args, **kwargs):
+        raise StaticLayerError(f"Статичный слой {self.name} не обновляется покадрово")
+
+    def update_animation(self, *args, **kwargs):
+        raise StaticLayerError(f"Статичный слой {self.name} не анимируется")
+
+
+def make_layer(name, **kwargs):
+    """
+    Спрайт-лист слоя name. Статичные слои (STATIC_LAYERS) считают свои
+    изменения (в режиме отладки еще и проверяют их), остальные - обычный
+    SpriteList.
+    """
+    if name not in STATIC_LAYERS:
+        return arcade.SpriteList(**kwargs)
+    if DEBUG:
+        return StaticSpriteList(name, **kwargs)
+    return VersionedSpriteList(**kwargs)
@@ -0,0 +1,90 @@
+"""
+Общий слой хранения SQLite для меню и уровней.
+
+Раньше каждый метод баз открывал соединение и закрывал его, а в
+режиме журнала по умолчанию запись блокирует всю базу: меню и процесс
+уровня, пишущие game_stats.db одновременно, ловили "database is
+locked". Здесь у каждого потока одно долгоживущее соединение на файл
+базы (sqlite3 не дает делить соединение между потоками), журнал WAL
+(читатели не ждут писателя), ожидание занятой базы вместо ошибки и
+кеш подготовленных запросов соединения.
+
+Автокоммит модуля sqlite3 выключен: одиночные запросы выполняются
+сразу, а изменения из нескольких запросов оборачиваются в
+transaction() - BEGIN IMMEDIATE берет блокировку записи в начале,
+поэтому "прочитать и обновить" не пересекается с другим писателем.
+"""
+import atexit
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+# Сколько ждать занятую другим писателем базу (мс)
+BUSY_TIMEOUT_MS = 5000
+
+# Сколько подготовленных запросов держит кеш соединения
+CACHED_STATEMENTS = 128
+
+_local = threading.local()
+
+
+def _connections():
+    """Соединения текущего потока: абсолютный путь -> sqlite3.Connection"""
+    connections = getattr(_local, "connections", None)
+    if connections is None:
+        connections = _local.connections = {}
+    return connections
+
+
+def connect(path):
+    """Долгоживущее соединение текущего потока с базой path"""
+    path = os.path.abspath(path)
+    connections = _connections()
+    conn = connections.get(path)
+    if conn is None:
+        conn = sqlite3.connect(
+            path,
+            timeout=BUSY_TIMEOUT_MS / 1000,
+            isolation_level=None,
+            cached_statements=CACHED_STATEMENTS,
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+        # В WAL достаточно синхронизации на контрольных точках
+        conn.execute("PRAGMA synchronous=NORMAL")
+        connections[path] = conn
+    return conn
+
+
+@contextmanager
+def transaction(path):
+    """
+    Транзакция записи в базу path: COMMIT при выходе, ROLLBACK при
+    исключении. Вложенный вызов выполняется в уже открытой транзакции.
+    """
+    conn = connect(path)
+    if conn.in_transaction:
+        yield conn
+        return
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+
+def close(path=None):
+    """Закрывает соединения текущего потока (с базой path или все)"""
+    connections = _connections()
+    paths = list(connections) if path is None else [os.path.abspath(path)]
+    for key in paths:
+        conn = connections.pop(key, None)
+        if conn is not None:
+            conn.close()
+
+
+atexit.register(close)
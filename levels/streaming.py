@@ -0,0 +1,199 @@
+"""
+Подгрузка мира кусками (чанками) вокруг камеры.
+
+Мир делится на квадратные чанки CHUNK_SIZE x CHUNK_SIZE. В спрайт-листах
+уровня (и значит в физике и отрисовке) находятся только тайлы и шипы
+чанков рядом с камерой. Чанки, которые ушли далеко от камеры,
+выгружаются, их спрайты удаляются. Собранные монеты запоминаются
+и при повторной загрузке чанка не появляются.
+
+Враги не выгружаются: у них есть состояние (патруль), и их мало.
+
+Для отрисовки у каждого загруженного чанка есть свои спрайт-листы
+по слоям (chunk_lists), по ним culling.py рисует только видимые чанки.
+"""
+import arcade
+import numpy as np
+
+from static_layers import make_layer
+
+# Размер чанка в пикселях (16 тайлов по 64)
+CHUNK_SIZE = 1024
+
+# Запас вокруг видимой области: чанки в нем загружаются
+LOAD_MARGIN = 256
+
+# Чанки выгружаются, только когда ушли дальше этого запаса (чтобы не дергать на границе)
+UNLOAD_MARGIN = 768
+
+
+def group_by_chunk(xs, ys):
+    """Индексы элементов по чанкам: {(cx, cy): массив индексов}"""
+    if len(xs) == 0:
+        return {}
+
+    chunk_x = np.floor(np.asarray(xs) / CHUNK_SIZE).astype(np.int64)
+    chunk_y = np.floor(np.asarray(ys) / CHUNK_SIZE).astype(np.int64)
+    order = np.lexsort((chunk_y, chunk_x))
+    keys = np.stack((chunk_x[order], chunk_y[order]), axis=1)
+
+    # Начала групп одинаковых ключей в отсортированном порядке
+    starts = np.flatnonzero(np.any(keys[1:] != keys[:-1], axis=1)) + 1
+    starts = np.concatenate(([0], starts))
+    groups = np.split(order, starts[1:])
+
+    return {tuple(keys[start].tolist()): group.tolist() for start, group in zip(starts, groups)}
+
+
+def chunk_range(left, bottom, right, top):
+    """Ключи чанков, пересекающих прямоугольник"""
+    x0 = int(left // CHUNK_SIZE)
+    x1 = int(right // CHUNK_SIZE)
+    y0 = int(bottom // CHUNK_SIZE)
+    y1 = int(top // CHUNK_SIZE)
+    return {(x, y) for x in range(x0, x1 + 1) for y in range(y0, y1 + 1)}
+
+
+class ChunkStreamer:
+    """Загружает и выгружает чанки уровня по положению камеры"""
+
+    def __init__(self, game, level, textures, scales, list_names, spike_class=None, draw_lists=True,
+                 grids=None):
+        """
+        Args:
+            game: игра со спрайт-листами
+            level: скомпилированный уровень (level_data.CompiledLevel)
+            textures, scales: текстуры и масштабы по номеру текстуры уровня
+            list_names: имя спрайт-листа игры для каждого слоя тайлов
+            spike_class: класс шипов (если в уровне есть шипы)
+            draw_lists: вести спрайт-листы чанков для отрисовки (без окна не нужны)
+            grids: сетки broadphase по имени спрайт-листа игры (монеты, шипы)
+        """
+        self.game = game
+        self.textures = textures
+        self.scales = scales
+        self.list_names = list_names
+        self.layer_lists = [getattr(game, name) for name in list_names]
+        self.spike_class = spike_class
+        self.draw_lists = draw_lists
+
+        # Сетки broadphase: по номеру слоя тайлов и для шипов
+        grids = grids or {}
+        self.layer_grids = [grids.get(name) for name in list_names]
+        self.spike_grid = grids.get("spike_list")
+
+        # Списки из массивов один раз: дальше чанки берут строки по индексам
+        self.tiles = level.tiles.tolist()
+        self.spikes = level.spikes.tolist()
+        self.tile_chunks = group_by_chunk(level.tiles["x"], level.tiles["y"])
+        self.spike_chunks = group_by_chunk(level.spikes["x"], level.spikes["y"])
+
+        # Загруженные чанки: ключ -> [(тип, индекс, спрайт)]
+        self.loaded = {}
+
+        # Спрайт-листы загруженных чанков для отрисовки: ключ -> {имя списка игры: SpriteList}
+        self.chunk_lists = {}
+
+        # Удаленные игрой спрайты (собранные монеты): (тип, индекс)
+        self.removed = set()
+
+        # Область, для которой чанки уже загружены
+        self.view_key = None
+
+        self.loads = 0
+        self.unloads = 0
+
+    def update(self, camera):
+        """Приводит набор загруженных чанков в соответствие с камерой"""
+        cam_x, cam_y = camera.position
+        half_w = camera.width / 2
+        half_h = camera.height / 2
+
+        # Нужный диапазон чанков не изменился - ничего не делаем
+        view_key = (int((cam_x - half_w - LOAD_MARGIN) // CHUNK_SIZE),
+                    int((cam_x + half_w + LOAD_MARGIN) // CHUNK_SIZE),
+                    int((cam_y - half_h - LOAD_MARGIN) // CHUNK_SIZE),
+                    int((cam_y + half_h + LOAD_MARGIN) // CHUNK_SIZE))
+        if view_key == self.view_key:
+            return
+        self.view_key = view_key
+
+        wanted = chunk_range(cam_x - half_w - LOAD_MARGIN, cam_y - half_h - LOAD_MARGIN,
+                             cam_x + half_w + LOAD_MARGIN, cam_y + half_h + LOAD_MARGIN)
+        keep = chunk_range(cam_x - half_w - UNLOAD_MARGIN, cam_y - half_h - UNLOAD_MARGIN,
+                           cam_x + half_w + UNLOAD_MARGIN, cam_y + half_h + UNLOAD_MARGIN)
+
+        for key in [key for key in self.loaded if key not in keep]:
+            self.unload_chunk(key)
+
+        for key in sorted(wanted):
+            if key not in self.loaded:
+                self.load_chunk(key)
+
+    def load_chunk(self, key):
+        """Создает спрайты чанка и добавляет их в спрайт-листы игры"""
+        entries = []
+        per_layer = [[] for _ in self.layer_lists]
+
+        for index in self.tile_chunks.get(key, ()):
+            if ("tile", index) in self.removed:
+                continue
+            x, y, texture_id, layer = self.tiles[index]
+            sprite = arcade.Sprite(self.textures[texture_id], self.scales[texture_id],
+                                   center_x=x, center_y=y)
+            per_layer[layer].append(sprite)
+            entries.append(("tile", index, sprite))
+
+        for sprite_list, grid, sprites in zip(self.layer_lists, self.layer_grids, per_layer):
+            if sprites:
+                sprite_list.extend(sprites)
+                if grid is not None:
+                    for sprite in sprites:
+                        grid.add(sprite)
+
+        spikes = []
+        for index in self.spike_chunks.get(key, ()):
+            spike = self.spike_class()
+            spike.position = self.spikes[index]
+            spikes.append(spike)
+            entries.append(("spike", index, spike))
+        if spikes:
+            self.game.spike_list.extend(spikes)
+            if self.spike_grid is not None:
+                for spike in spikes:
+                    self.spike_grid.add(spike)
+
+        if self.draw_lists:
+            chunk_lists = {}
+            for list_name, sprites in zip(self.list_names + ["spike_list"], per_layer + [spikes]):
+                if sprites:
+                    # Собирается один раз: буфер уходит на видеокарту при первой отрисовке
+                    chunk_lists[list_name] = make_layer(list_name, capacity=len(sprites))
+                    chunk_lists[list_name].extend(sprites)
+            self.chunk_lists[key] = chunk_lists
+
+        self.loaded[key] = entries
+        self.loads += 1
+
+    def unload_chunk(self, key):
+        """Удаляет спрайты чанка из игры"""
+        self.chunk_lists.pop(key, None)
+        for kind, index, sprite in self.loaded.pop(key):
+            if sprite.sprite_lists:
+                sprite.remove_from_sprite_lists()
+                grid = self.spike_grid if kind == "spike" else self.layer_grids[self.tiles[index][3]]
+                if grid is not None:
+                    grid.remove(sprite)
+            else:
+                # Спрайт уже убрала игра (монета собрана)
+                self.removed.add((kind, index))
+        self.unloads += 1
+
+    def stats(self):
+        """Счетчики для отладки и бенчмарков"""
+        return {
+            "chunks": len(self.loaded),
+            "sprites": sum(len(entries) for entries in self.loaded.values()),
+            "loads": self.loads,
+            "unloads": self.unloads,
+        }
@@ -0,0 +1,156 @@
+"""
+Все слизни уровня одним пакетом.
+
+Состояние врагов хранится в массивах numpy. Патруль слизня -
+движение вперед-назад с постоянной скоростью, то есть периодическая
+функция номера тика: за n = ceil(range / speed) шагов слизень доходит
+до края, разворачивается, за 2n шагов доходит до другого края и еще
+за n возвращается (период 4n тиков). Анимация тоже периодична.
+Поэтому состояние любого слизня на любом тике считается сразу,
+без пошагового обновления.
+
+Считаются и переписываются в спрайты только слизни, чей участок
+патруля задевает область активности камеры (activity.py): их видно,
+и с ними может столкнуться игрок. Остальные спят и ничего не стоят,
+а проснувшись, оказываются ровно там, где были бы. Поэтому сотни
+слизней стоят примерно как пять.
+"""
+import arcade
+import numpy as np
+
+
+def ticks_per_frame(animation_speed, dt):
+    """Через сколько тиков сменится кадр: таймер растет на dt, пока не дойдет до animation_speed"""
+    timer = 0.0
+    ticks = 0
+    while timer < animation_speed:
+        timer += dt
+        ticks += 1
+    return max(ticks, 1)
+
+
+class WormSwarm:
+    """Массивы состояния слизней и их спрайты"""
+
+    def __init__(self, sprites, dt):
+        """
+        Args:
+            sprites: спрайты слизней (WormEnemy) с начальными настройками
+                     (move_speed, move_range, move_direction, animation_speed)
+            dt: длительность тика в секундах (для анимации)
+        """
+        self.sprites = list(sprites)
+        self.tick = 0
+
+        self.start_x = np.array([sprite.center_x for sprite in self.sprites], dtype=np.float64)
+        self.y = np.array([sprite.center_y for sprite in self.sprites], dtype=np.float64)
+        self.speed = np.array([sprite.move_speed for sprite in self.sprites], dtype=np.float64)
+        move_range = np.array([sprite.move_range for sprite in self.sprites], dtype=np.float64)
+
+        # Шагов до края: наименьшее n, при котором n * speed >= range (как проверял слизень)
+        steps = np.ceil(move_range / self.speed)
+        steps = np.where((steps - 1) * self.speed >= move_range, steps - 1, steps)
+        steps = np.where(steps * self.speed < move_range, steps + 1, steps)
+        self.steps = np.maximum(steps, 1).astype(np.int64)
+        self.period = 4 * self.steps
+
+        # Фаза на тике 0: смещение 0, вправо - фаза n, влево - 3n
+        direction = np.array([sprite.move_direction for sprite in self.sprites], dtype=np.int64)
+        self.phase = np.where(direction > 0, self.steps, 3 * self.steps)
+
+        # Анимация: кадр меняется каждые frame_ticks тиков
+        self.frame_ticks = np.array([ticks_per_frame(sprite.animation_speed, dt) for sprite in self.sprites],
+                                    dtype=np.int64)
+        self.frame_count = np.array([len(sprite.textures) for sprite in self.sprites], dtype=np.int64)
+
+        # Половины размеров текстур (с запасом на самую большую)
+        self.half_w = np.array([max(texture.width for texture in sprite.textures) * sprite.scale_x / 2
+                                for sprite in self.sprites], dtype=np.float64)
+        self.half_h = np.array([max(texture.height for texture in sprite.textures) * sprite.scale_y / 2
+                                for sprite in self.sprites], dtype=np.float64)
+
+        # Участок патруля каждого слизня (с размером спрайта)
+        reach = self.steps * self.speed + self.half_w
+        self.span_left = self.start_x - reach
+        self.span_right = self.start_x + reach
+
+        # Проснувшиеся слизни (в области активности)
+        self.active = []
+
+        # Раз во сколько тиков обновлять спрайты проснувшихся слизней за экраном
+        # (регулятор качества, quality.py; на состояние слизней не влияет)
+        self.far_interval = 1
+
+    def __len__(self):
+        return len(self.sprites)
+
+    def positions(self, indices=None):
+        """x и направление слизней на текущем тике"""
+        if indices is None:
+            indices = slice(None)
+        steps = self.steps[indices]
+        phase = (self.phase[indices] + self.tick) % self.period[indices]
+
+        # Первая половина периода - путь вправо от -n до n, вторая - обратно
+        forward = phase < 2 * steps
+        offset = np.where(forward, phase - steps, 3 * steps - phase)
+        direction = np.where(forward, 1, -1)
+        return self.start_x[indices] + offset * self.speed[indices], direction
+
+    def update(self, region):
+        """Один тик: будит слизней в области активности и обновляет их спрайты"""
+        self.tick += 1
+        if not self.sprites:
+            return
+
+        awake = np.flatnonzero(region.mask(self.span_left, self.y - self.half_h,
+                                           self.span_right, self.y + self.half_h))
+        self.active = [self.sprites[i] for i in awake.tolist()]
+        if self.far_interval > 1 and self.tick % self.far_interval:
+            # Между редкими обновлениями - только слизни, чей участок виден на экране
+            awake = awake[region.view_mask(self.span_left[awake], self.y[awake] - self.half_h[awake],
+                                           self.span_right[awake], self.y[awake] + self.half_h[awake])]
+        self.sync(awake)
+
+    def sync(self, indices):
+        """Переписывает состояние слизней в их спрайты"""
+        if not len(indices):
+            return
+        xs, directions = self.positions(indices)
+        frames = (self.tick // self.frame_ticks[indices]) % self.frame_count[indices]
+
+        sprites = self.sprites
+        for i, x, direction, frame in zip(indices.tolist(), xs.tolist(), directions.tolist(), frames.tolist()):
+            sprite = sprites[i]
+            sprite.center_x = x
+            sprite.move_direction = direction
+            if sprite.cur_texture != frame:
+                sprite.cur_texture = frame
+                sprite.texture = sprite.textures[frame]
+
+    def collide(self, player):
+        """Слизни, с которыми сталкивается игрок (как check_for_collision_with_list)"""
+        if not self.sprites:
+            return []
+
+        # Кандидаты - по участкам патруля, затем по текущим x, точная проверка - по хитбоксам
+        px, py = player.position
+        half_w = player.width / 2
+        half_h = player.height / 2
+        candidates = np.flatnonzero((self.span_left < px + half_w) & (self.span_right > px - half_w)
+                                    & (np.abs(self.y - py) < self.half_h + half_h))
+        if not len(candidates):
+            return []
+        xs, _ = self.positions(candidates)
+        candidates = candidates[np.abs(xs - px) < self.half_w[candidates] + half_w]
+        if not len(candidates):
+            return []
+
+        self.sync(candidates)
+        return [self.sprites[i] for i in candidates.tolist()
+                if arcade.check_for_collision(player, self.sprites[i])]
+
+    def state(self):
+        """Пары (x, направление) всех слизней - для хеша состояния повтора"""
+        xs, directions = self.positions()
+        return list(zip(xs.tolist(), directions.tolist()))
@@ -0,0 +1,203 @@
+"""
+Физика игрока по сетке тайлов.
+
+Замена arcade.PhysicsEnginePlatformer для статичной геометрии уровня
+с тем же интерфейсом (update, can_jump, is_on_ladder, jump).
+
+Стены и лестницы - прямоугольники (left, bottom, right, top), разложенные
+по ячейкам сетки GRID_CELL. Проверка берет только ячейки рядом с игроком,
+поэтому ее стоимость не зависит от размера уровня. Игрок - AABB своего
+хитбокса; движение по y, затем по x, упор в ближайшую грань на пути
+(swept AABB), без пошагового выталкивания и бинарного поиска.
+
+Геометрия берется из данных уровня целиком, а не из спрайт-листов,
+поэтому физика не зависит от того, какие чанки сейчас загружены.
+"""
+import math
+
+# Размер ячейки сетки (размер тайла)
+GRID_CELL = 64
+
+
+class TileGrid:
+    """Прямоугольники, разложенные по ячейкам сетки"""
+
+    def __init__(self, rects=(), cell_size=GRID_CELL):
+        self.cell_size = cell_size
+        self.cells = {}
+        self.count = 0
+        for rect in rects:
+            self.add(rect)
+
+    def _cell_range(self, left, bottom, right, top):
+        size = self.cell_size
+        return (int(math.floor(left / size)), int(math.floor(right / size)),
+                int(math.floor(bottom / size)), int(math.floor(top / size)))
+
+    def add(self, rect):
+        """Добавляет прямоугольник во все ячейки, которые он задевает"""
+        x0, x1, y0, y1 = self._cell_range(*rect)
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                self.cells.setdefault((cx, cy), []).append(rect)
+        self.count += 1
+
+    def query(self, left, bottom, right, top):
+        """Прямоугольники из ячеек, которые задевает область (без повторов)"""
+        x0, x1, y0, y1 = self._cell_range(left, bottom, right, top)
+        cells = self.cells
+        if x0 == x1 and y0 == y1:
+            return cells.get((x0, y0), ())
+
+        found = {}
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                for rect in cells.get((cx, cy), ()):
+                    found[rect] = None
+        return found
+
+    def overlaps(self, left, bottom, right, top):
+        """Есть ли прямоугольник, пересекающий область (касание не считается)"""
+        for r_left, r_bottom, r_right, r_top in self.query(left, bottom, right, top):
+            if r_left < right and r_right > left and r_bottom < top and r_top > bottom:
+                return True
+        return False
+
+
+class TilePhysicsEngine:
+    """Платформерная физика игрока по сетке стен и лестниц"""
+
+    def __init__(self, player_sprite, walls, ladders=(), gravity_constant=0.5):
+        """
+        Args:
+            player_sprite: спрайт игрока
+            walls: прямоугольники стен (left, bottom, right, top)
+            ladders: прямоугольники лестниц
+            gravity_constant: гравитация в пикс/тик^2
+        """
+        self.player_sprite = player_sprite
+        self.gravity_constant = gravity_constant
+        self.walls = TileGrid(walls)
+        self.ladders = TileGrid(ladders)
+
+        # Результаты проверок для текущей позиции игрока: игра спрашивает
+        # can_jump и is_on_ladder по несколько раз за тик
+        self._checks = {}
+        self._checks_position = None
+
+    def _player_box(self):
+        player = self.player_sprite
+        return player.left, player.bottom, player.right, player.top
+
+    def _cached(self, key):
+        position = self.player_sprite.position
+        if position != self._checks_position:
+            self._checks.clear()
+            self._checks_position = position
+        return self._checks.get(key)
+
+    def can_jump(self, y_distance=5):
+        """Стоит ли игрок на стене (в пределах y_distance под ногами)"""
+        key = ("ground", y_distance)
+        grounded = self._cached(key)
+        if grounded is None:
+            left, bottom, right, top = self._player_box()
+            grounded = self.walls.overlaps(left, bottom - y_distance, right, top - y_distance)
+            self._checks[key] = grounded
+        return grounded
+
+    def is_on_ladder(self):
+        """Касается ли игрок лестницы"""
+        on_ladder = self._cached("ladder")
+        if on_ladder is None:
+            on_ladder = self.ladders.overlaps(*self._player_box())
+            self._checks["ladder"] = on_ladder
+        return on_ladder
+
+    def _push_out(self):
+        """Выталкивает игрока из стен, в которых он оказался (точка появления в земле)"""
+        left, bottom, right, top = self._player_box()
+        inside = [rect for rect in self.walls.query(left, bottom, right, top)
+                  if rect[0] < right and rect[2] > left and rect[1] < top and rect[3] > bottom]
+        if not inside:
+            return
+
+        # Сдвиги к граням задетых стен, от кратчайшего; берем первый, после которого свободно
+        moves = []
+        for r_left, r_bottom, r_right, r_top in inside:
+            moves.extend(((0, r_top - bottom), (0, r_bottom - top),
+                          (r_right - left, 0), (r_left - right, 0)))
+        moves.sort(key=lambda move: abs(move[0]) + abs(move[1]))
+
+        for dx, dy in moves:
+            if not self.walls.overlaps(left + dx, bottom + dy, right + dx, top + dy):
+                self.player_sprite.center_x += dx
+                self.player_sprite.center_y += dy
+                return
+
+    def jump(self, velocity):
+        """Прыжок с начальной скоростью вверх"""
+        self.player_sprite.change_y = velocity
+
+    def update(self):
+        """Двигает игрока на один тик и возвращает стены, в которые он уперся по пути"""
+        player = self.player_sprite
+        self._push_out()
+        if not self.is_on_ladder():
+            player.change_y -= self.gravity_constant
+
+        hits = []
+        left, bottom, right, top = self._player_box()
+
+        # --- Движение по y: упираемся в ближайшую грань на пути
+        dy = player.change_y
+        if dy:
+            if dy < 0:
+                stop = None
+                for rect in self.walls.query(left, bottom + dy, right, bottom):
+                    r_left, _, r_right, r_top = rect
+                    if r_left < right and r_right > left and bottom + dy < r_top <= bottom:
+                        if stop is None or r_top > stop:
+                            stop = r_top
+                        hits.append(rect)
+                move = dy if stop is None else stop - bottom
+            else:
+                stop = None
+                for rect in self.walls.query(left, top, right, top + dy):
+                    r_left, r_bottom, r_right, _ = rect
+                    if r_left < right and r_right > left and top <= r_bottom < top + dy:
+                        if stop is None or r_bottom < stop:
+                            stop = r_bottom
+                        hits.append(rect)
+                move = dy if stop is None else stop - top
+
+            if stop is not None:
+                player.change_y = 0
+            player.center_y = round(player.center_y + move, 2)
+            bottom += move
+            top += move
+
+        # --- Движение по x
+        dx = player.change_x
+        if dx:
+            if dx > 0:
+                stop = None
+                for rect in self.walls.query(right, bottom, right + dx, top):
+                    r_left, r_bottom, _, r_top = rect
+                    if r_bottom < top and r_top > bottom and right <= r_left < right + dx:
+                        if stop is None or r_left < stop:
+                            stop = r_left
+                        hits.append(rect)
+                move = dx if stop is None else stop - right
+            else:
+                stop = None
+                for rect in self.walls.query(left + dx, bottom, left, top):
+                    _, r_bottom, r_right, r_top = rect
+                    if r_bottom < top and r_top > bottom and left + dx < r_right <= left:
+                        if stop is None or r_right > stop:
+                            stop = r_right
+                        hits.append(rect)
+                move = dx if stop is None else stop - left
+            player.center_x += move
+
+        return hits
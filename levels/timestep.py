@@ -0,0 +1,79 @@
+"""
+Фиксированный шаг симуляции и интерполяция позиций при отрисовке
+"""
+
+# Частота симуляции (тиков в секунду)
+SIMULATION_RATE = 60
+
+# Частота, под которую подобраны все скорости игры (пикс/тик)
+BASE_TICK_RATE = 60
+
+# Множитель скоростей для выбранной частоты симуляции
+TICK_SCALE = BASE_TICK_RATE / SIMULATION_RATE
+
+# Максимум тиков за один кадр, чтобы не уйти в "спираль смерти" при лагах
+MAX_STEPS_PER_FRAME = 5
+
+
+class FixedTimestep:
+    """Аккумулятор времени кадра для симуляции с фиксированным шагом"""
+
+    def __init__(self, tick_rate=SIMULATION_RATE, max_steps=MAX_STEPS_PER_FRAME):
+        self.tick_rate = tick_rate
+        self.dt = 1.0 / tick_rate
+        self.max_steps = max_steps
+        self.accumulator = 0.0
+
+    def reset(self):
+        """Сбрасывает накопленное время"""
+        self.accumulator = 0.0
+
+    def advance(self, delta_time):
+        """
+        Добавляет время кадра и возвращает количество тиков,
+        которые нужно выполнить в этом кадре
+        """
+        # Ограничиваем длинные кадры (зависание, перетаскивание окна)
+        self.accumulator += min(delta_time, self.max_steps * self.dt)
+
+        steps = 0
+        while self.accumulator >= self.dt:
+            self.accumulator -= self.dt
+            steps += 1
+
+        return steps
+
+    @property
+    def alpha(self):
+        """Доля следующего тика, прошедшая с последнего шага (0..1)"""
+        return self.accumulator / self.dt
+
+
+class InterpolatedPositions:
+    """
+    Хранит позиции объектов до последнего тика и на время отрисовки
+    подставляет промежуточные значения между двумя тиками
+    """
+
+    def __init__(self):
+        self.previous = []
+        self.saved = []
+
+    def capture(self, *groups):
+        """Запоминает позиции объектов перед тиком симуляции"""
+        self.previous = [(obj, obj.position) for group in groups for obj in group]
+
+    def apply(self, alpha):
+        """Выставляет интерполированные позиции перед отрисовкой"""
+        self.saved = []
+        for obj, (prev_x, prev_y) in self.previous:
+            cur_x, cur_y = obj.position
+            self.saved.append((obj, (cur_x, cur_y)))
+            obj.position = (prev_x + (cur_x - prev_x) * alpha,
+                            prev_y + (cur_y - prev_y) * alpha)
+
+    def restore(self):
+        """Возвращает настоящие позиции после отрисовки"""
+        for obj, position in self.saved:
+            obj.position = position
+        self.saved = []
@@ -0,0 +1,237 @@
+"""
+Заранее запущенные процессы для уровней.
+
+Если уровень нужно запускать в отдельном процессе (изоляция от меню),
+холодный старт "python levels/level_X.py" каждый раз заново импортирует
+arcade, создает окно и грузит текстуры. Пул держит наготове процессы,
+которые все это уже сделали, и отдает им только номер уровня.
+Каждый процесс запускает один уровень и завершается, а пул сразу
+поднимает ему замену.
+"""
+import importlib
+import multiprocessing
+import os
+import sys
+
+# Добавляем папку уровней для импорта
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Уровни, которые прогреваются в каждом процессе
+WARM_LEVELS = (1, 2, 3)
+
+# Сколько раз подряд процесс может упасть при прогреве, прежде чем пул отключится
+MAX_WARMUP_FAILURES = 3
+
+# Состояния процесса
+STARTING = "starting"
+READY = "ready"
+RUNNING = "running"
+
+
+def get_level_module(level_number):
+    """Модуль уровня (level_1, level_2, ...)"""
+    return importlib.import_module(f"level_{level_number}")
+
+
+class WorkerHost:
+    """Хозяин уровня внутри процесса: выход из уровня закрывает окно"""
+
+    def __init__(self, window):
+        self.window = window
+
+    def show_level(self, game):
+        """Показывает уровень (и после перезапуска)"""
+        game.host = self
+        self.window.show_view(game)
+
+    def exit_level(self, game):
+        """Игрок вышел в меню - процесс завершает работу"""
+        self.window.close()
+
+
+def warm_up(level_numbers):
+    """
+    Импортирует уровни и один раз собирает их без окна, чтобы заполнить
+    кеш текстур, и заранее загружает звуки уровней
+    """
+    from assets import preload_sounds
+    from headless import get_level_class
+    from level_1 import level_sound_paths
+
+    for level_number in level_numbers:
+        level_class = get_level_class(level_number)
+        game = level_class(headless=True)
+        game.setup()
+        # Безоконная сборка звуки не грузит - первый звук в уровне не должен читать диск
+        preload_sounds(level_sound_paths(level_class.INTRO_SOUND))
+
+
+def worker_main(conn, level_numbers=WARM_LEVELS):
+    """Точка входа процесса: прогрев, ожидание номера уровня, запуск уровня"""
+    import arcade
+    from level_1 import SCREEN_WIDTH, SCREEN_HEIGHT, RENDER_RATE
+
+    warm_up(level_numbers)
+
+    # Окно и OpenGL контекст создаются заранее, но пока скрыты
+    window = arcade.Window(SCREEN_WIDTH, SCREEN_HEIGHT, "", visible=False,
+                           update_rate=RENDER_RATE, draw_rate=RENDER_RATE)
+    conn.send(("ready", os.getpid()))
+
+    try:
+        message = conn.recv()
+    except EOFError:
+        return
+    if message[0] != "run":
+        return
+
+    level_number = message[1]
+    module = get_level_module(level_number)
+
+    window.set_caption(module.SCREEN_TITLE)
+    host = WorkerHost(window)
+    host.show_level(module.create_view(host=host))
+    window.set_visible(True)
+    arcade.run()
+
+    conn.send(("done", level_number))
+
+
+class LevelWorker:
+    """Один процесс пула и канал связи с ним"""
+
+    def __init__(self, context):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=worker_main, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.state = STARTING
+        self.level_number = None
+
+    def poll(self):
+        """Читает сообщения процесса, если они есть"""
+        try:
+            while self.conn.poll():
+                message = self.conn.recv()
+                if message[0] == "ready":
+                    self.state = READY
+                elif message[0] == "done":
+                    self.process.join(timeout=1)
+        except (EOFError, OSError):
+            pass
+
+    @property
+    def alive(self):
+        return self.process.is_alive()
+
+    def run(self, level_number):
+        """Отдает процессу номер уровня"""
+        self.conn.send(("run", level_number))
+        self.state = RUNNING
+        self.level_number = level_number
+
+    def stop(self):
+        """Останавливает процесс"""
+        if self.alive:
+            try:
+                self.conn.send(("stop",))
+            except (BrokenPipeError, OSError):
+                pass
+            self.process.join(timeout=1)
+        if self.alive:
+            self.process.terminate()
+        self.conn.close()
+
+
+class LevelWorkerPool:
+    """
+    Пул прогретых процессов для запуска уровней.
+
+    Меню вызывает launch() вместо запуска python levels/level_X.py и
+    периодически poll(), который возвращает завершившиеся уровни
+    и заменяет умершие процессы новыми.
+    """
+
+    def __init__(self, size=1):
+        # spawn: процесс меню уже держит окно и OpenGL контекст, fork их копировать не должен
+        self.context = multiprocessing.get_context("spawn")
+        self.size = size
+        self.spare = []
+        self.running = []
+        self.warmup_failures = 0
+        self.enabled = True
+
+    def start(self):
+        """Поднимает недостающие запасные процессы"""
+        while self.enabled and len(self.spare) < self.size:
+            self.spare.append(LevelWorker(self.context))
+
+    def launch(self, level_number):
+        """Запускает уровень в запасном процессе; False, если пул недоступен"""
+        self.check_spare()
+        if not self.enabled or not self.spare:
+            return False
+
+        # Лучше всего процесс, который уже прогрелся
+        ready = [worker for worker in self.spare if worker.state == READY]
+        worker = ready[0] if ready else self.spare[0]
+        self.spare.remove(worker)
+
+        try:
+            worker.run(level_number)
+        except (BrokenPipeError, OSError):
+            worker.stop()
+            return False
+
+        self.running.append(worker)
+        self.start()
+        return True
+
+    def check_spare(self):
+        """Проверка здоровья запасных процессов: умершие заменяются"""
+        for worker in list(self.spare):
+            worker.poll()
+            if worker.alive:
+                if worker.state == READY:
+                    self.warmup_failures = 0
+                continue
+
+            self.spare.remove(worker)
+            worker.stop()
+            if worker.state == STARTING:
+                self.warmup_failures += 1
+                print(f"Процесс уровня упал при прогреве (код {worker.process.exitcode})")
+
+        if self.warmup_failures >= MAX_WARMUP_FAILURES:
+            print("Пул процессов уровней отключен: процессы не прогреваются")
+            self.enabled = False
+            return
+
+        self.start()
+
+    def poll(self):
+        """Возвращает список (номер уровня, код выхода) завершившихся уровней"""
+        finished = []
+        for worker in list(self.running):
+            worker.poll()
+            if worker.alive:
+                continue
+
+            self.running.remove(worker)
+            worker.stop()
+            finished.append((worker.level_number, worker.process.exitcode))
+
+        self.check_spare()
+        return finished
+
+    @property
+    def busy(self):
+        return bool(self.running)
+
+    def shutdown(self):
+        """Останавливает все процессы пула"""
+        self.enabled = False
+        for worker in self.spare + self.running:
+            worker.stop()
+        self.spare = []
+        self.running = []
@@ -1,7 +1,17 @@
 import arcade
 import arcade.gui as gui
 import os
-import sqlite3
+import sys
+
+# Уровни лежат в папке levels и импортируют друг друга как модули
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "levels"))
+
+import level_1
+import level_2
+import level_3
+import storage
+from settings_cache import get_settings_cache
+from workers import LevelWorkerPool
 
 # Настройки экрана
 SCREEN_WIDTH = 1000
@@ -23,6 +33,16 @@ GRAVITY = 1.0
 PLAYER_SPEED = 5
 PLAYER_JUMP = 15
 
+# Уровни запускаются внутри окна меню: номер уровня -> фабрика вью
+LEVEL_FACTORIES = {
+    1: level_1.create_view,
+    2: level_2.create_view,
+    3: level_3.create_view,
+}
+
+# Сколько прогретых процессов держать для уровней (0 - уровни идут в окне меню)
+LEVEL_WORKERS = int(os.environ.get("PLATFORMER_LEVEL_WORKERS", "0"))
+
 
 # Система базы данных звуков
 class SoundDatabase:
@@ -30,92 +50,52 @@ class SoundDatabase:
         self.db_file = db_file
         self.init_database()
 
+        # Настройки читаются из памяти, изменения уходят в базу в фоне
+        self.cache = get_settings_cache(self.db_file)
+
     def init_database(self):
         """Инициализирует базу данных звуков"""
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
+        with storage.transaction(self.db_file) as conn:
+            cursor = conn.cursor()
 
-        # Создаем таблицу для настроек звуков
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS sound_settings (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                sound_type TEXT NOT NULL,
-                volume REAL NOT NULL,
-                is_enabled INTEGER DEFAULT 1,
-                last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(sound_type)
-            )
-        ''')
-
-        # Вставляем начальные значения, если их нет
-        default_settings = [
-            ('music', 0.5),
-            ('ui_click', 0.8),
-            ('environment', 0.6),
-            ('door_open', 0.7),  # Громкость открытия двери
-            ('game_over', 0.6)  # Громкость проигрыша
-        ]
-
-        for sound_type, volume in default_settings:
+            # Создаем таблицу для настроек звуков
             cursor.execute('''
-                INSERT OR IGNORE INTO sound_settings (sound_type, volume)
-                VALUES (?, ?)
-            ''', (sound_type, volume))
-
-        conn.commit()
-        conn.close()
+                CREATE TABLE IF NOT EXISTS sound_settings (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    sound_type TEXT NOT NULL,
+                    volume REAL NOT NULL,
+                    is_enabled INTEGER DEFAULT 1,
+                    last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    UNIQUE(sound_type)
+                )
+            ''')
+
+            # Вставляем начальные значения, если их нет
+            default_settings = [
+                ('music', 0.5),
+                ('ui_click', 0.8),
+                ('environment', 0.6),
+                ('door_open', 0.7),  # Громкость открытия двери
+                ('game_over', 0.6)  # Громкость проигрыша
+            ]
+
+            for sound_type, volume in default_settings:
+                cursor.execute('''
+                    INSERT OR IGNORE INTO sound_settings (sound_type, volume)
+                    VALUES (?, ?)
+                ''', (sound_type, volume))
 
     def get_volume(self, sound_type):
-        """Получает громкость для типа звука"""
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
-
-        cursor.execute('''
-            SELECT volume, is_enabled FROM sound_settings WHERE sound_type = ?
-        ''', (sound_type,))
-
-        result = cursor.fetchone()
-        conn.close()
-
-        if result:
-            volume, is_enabled = result
-            return volume if is_enabled else 0.0
-        return 0.5
+        """Получает громкость для типа звука (из памяти)"""
+        return self.cache.get_volume(sound_type)
 
     def set_volume(self, sound_type, volume):
-        """Устанавливает громкость для типа звука"""
-        volume = max(0.0, min(1.0, volume))  # Ограничиваем от 0 до 1
-
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
-
-        cursor.execute('''
-            UPDATE sound_settings 
-            SET volume = ?, last_updated = CURRENT_TIMESTAMP
-            WHERE sound_type = ?
-        ''', (volume, sound_type))
-
-        conn.commit()
-        conn.close()
+        """Устанавливает громкость для типа звука (запись в БД откладывается)"""
+        self.cache.set_volume(sound_type, volume)
 
     def get_all_settings(self):
-        """Получает все настройки звуков"""
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
-
-        cursor.execute('''
-            SELECT sound_type, volume, is_enabled FROM sound_settings
-        ''')
-
-        settings = {}
-        for sound_type, volume, is_enabled in cursor.fetchall():
-            settings[sound_type] = {
-                'volume': volume,
-                'enabled': bool(is_enabled)
-            }
-
-        conn.close()
-        return settings
+        """Получает все настройки звуков (из памяти)"""
+        return self.cache.get_all()
 
 
 # Система базы данных игровой статистики
@@ -126,53 +106,49 @@ class GameStatsDatabase:
 
     def init_database(self):
         """Инициализирует базу данных игровой статистики"""
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
-
-        # Создаем таблицу для прогресса игроков
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS player_progress (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                player_id TEXT NOT NULL UNIQUE,
-                unlocked_levels INTEGER DEFAULT 1,
-                total_coins INTEGER DEFAULT 0,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-
-        # Создаем таблицу для результатов уровней
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS level_results (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                player_id TEXT NOT NULL,
-                level_number INTEGER NOT NULL,
-                score INTEGER NOT NULL,
-                completed INTEGER DEFAULT 0,
-                play_time_seconds REAL DEFAULT 0,
-                completed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
+        with storage.transaction(self.db_file) as conn:
+            cursor = conn.cursor()
 
-        # Создаем индексы для быстрого поиска
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_player_level 
-            ON level_results (player_id, level_number)
-        ''')
-
-        # Вставляем начального игрока, если его нет
-        cursor.execute('''
-            INSERT OR IGNORE INTO player_progress (player_id, unlocked_levels, total_coins)
-            VALUES (?, 1, 0)
-        ''', ("player_1",))
+            # Создаем таблицу для прогресса игроков
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS player_progress (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    player_id TEXT NOT NULL UNIQUE,
+                    unlocked_levels INTEGER DEFAULT 1,
+                    total_coins INTEGER DEFAULT 0,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+
+            # Создаем таблицу для результатов уровней
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS level_results (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    player_id TEXT NOT NULL,
+                    level_number INTEGER NOT NULL,
+                    score INTEGER NOT NULL,
+                    completed INTEGER DEFAULT 0,
+                    play_time_seconds REAL DEFAULT 0,
+                    completed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+
+            # Создаем индексы для быстрого поиска
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_player_level 
+                ON level_results (player_id, level_number)
+            ''')
 
-        conn.commit()
-        conn.close()
+            # Вставляем начального игрока, если его нет
+            cursor.execute('''
+                INSERT OR IGNORE INTO player_progress (player_id, unlocked_levels, total_coins)
+                VALUES (?, 1, 0)
+            ''', ("player_1",))
 
     def is_level_completed(self, player_id, level_number):
         """Проверяет, пройден ли уровень"""
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
+        cursor = storage.connect(self.db_file).cursor()
 
         cursor.execute('''
             SELECT COUNT(*) FROM level_results 
@@ -180,14 +156,12 @@ class GameStatsDatabase:
         ''', (player_id, level_number))
 
         result = cursor.fetchone()
-        conn.close()
 
         return result[0] > 0 if result else False
 
     def get_completed_levels_count(self, player_id="player_1"):
         """Получает количество пройденных уровней"""
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
+        cursor = storage.connect(self.db_file).cursor()
 
         cursor.execute('''
             SELECT COUNT(DISTINCT level_number) 
@@ -196,29 +170,24 @@ class GameStatsDatabase:
         ''', (player_id,))
 
         result = cursor.fetchone()
-        conn.close()
 
         return result[0] if result else 0
 
     def update_level_result(self, player_id, level_number, score, play_time_seconds, completed=True):
         """Обновляет результат прохождения уровня"""
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
-
-        # Обновляем или вставляем результат уровня
-        cursor.execute('''
-            INSERT OR REPLACE INTO level_results 
-            (player_id, level_number, score, completed, play_time_seconds, completed_at)
-            VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
-        ''', (player_id, level_number, score, 1 if completed else 0, play_time_seconds))
+        with storage.transaction(self.db_file) as conn:
+            cursor = conn.cursor()
 
-        conn.commit()
-        conn.close()
+            # Обновляем или вставляем результат уровня
+            cursor.execute('''
+                INSERT OR REPLACE INTO level_results 
+                (player_id, level_number, score, completed, play_time_seconds, completed_at)
+                VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+            ''', (player_id, level_number, score, 1 if completed else 0, play_time_seconds))
 
     def get_level_score(self, player_id, level_number):
         """Получает лучший счет для уровня"""
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
+        cursor = storage.connect(self.db_file).cursor()
 
         cursor.execute('''
             SELECT MAX(score) FROM level_results 
@@ -226,29 +195,25 @@ class GameStatsDatabase:
         ''', (player_id, level_number))
 
         result = cursor.fetchone()
-        conn.close()
 
         return result[0] if result and result[0] else 0
 
     def reset_progress(self, player_id="player_1"):
         """Сбрасывает весь прогресс игрока"""
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
+        with storage.transaction(self.db_file) as conn:
+            cursor = conn.cursor()
 
-        # Удаляем все результаты уровней
-        cursor.execute('''
-            DELETE FROM level_results WHERE player_id = ?
-        ''', (player_id,))
-
-        # Сбрасываем прогресс игрока
-        cursor.execute('''
-            UPDATE player_progress 
-            SET unlocked_levels = 1, total_coins = 0, last_updated = CURRENT_TIMESTAMP
-            WHERE player_id = ?
-        ''', (player_id,))
+            # Удаляем все результаты уровней
+            cursor.execute('''
+                DELETE FROM level_results WHERE player_id = ?
+            ''', (player_id,))
 
-        conn.commit()
-        conn.close()
+            # Сбрасываем прогресс игрока
+            cursor.execute('''
+                UPDATE player_progress 
+                SET unlocked_levels = 1, total_coins = 0, last_updated = CURRENT_TIMESTAMP
+                WHERE player_id = ?
+            ''', (player_id,))
 
 
 # Система сохранения прогресса
@@ -614,70 +579,33 @@ class LevelSelectView(arcade.View):
         self.ui_manager.add(anchor)
 
     def launch_level(self, level_number):
-        """Запускает указанный уровень"""
+        """Запускает указанный уровень в этом же окне"""
         print(f"Запуск уровня {level_number}...")
 
-        # Получаем текущую громкость из БД
-        music_volume = self.progress.sound_db.get_volume('music')
+        if level_number not in LEVEL_FACTORIES:
+            print(f"Уровень {level_number} не найден")
+            return
 
-        # Скрываем окно меню и выключаем звук
-        self.window.set_visible(False)
+        # Выключаем музыку меню на время уровня
         if self.music_stream:
             try:
                 self.music_stream.volume = 0
             except:
                 print("Не удалось выключить звук")
 
-        # Пауза
-        import time
-        time.sleep(0.1)
-
-        # Запускаем уровень
-        try:
-            import subprocess
-            level_files = {
-                1: "levels/level_1.py",
-                2: "levels/level_2.py",
-                3: "levels/level_3.py"
-            }
+        host = LevelHost(self.window, self.progress, self.music_player, self.music_stream, self.click_sound)
 
-            if level_number in level_files:
-                level_file = level_files[level_number]
-                if os.path.exists(level_file):
-                    process = subprocess.Popen(["python", level_file])
-                    process.wait()
-                    print(f"Уровень {level_number} завершен с кодом: {process.returncode}")
-                else:
-                    print(f"Файл уровня {level_number} не найден: {level_file}")
-                    self.window.set_visible(True)
-            else:
-                print(f"Уровень {level_number} не найден")
-                self.window.set_visible(True)
+        # Уровень в отдельном прогретом процессе, меню ждет его завершения
+        if self.window.level_workers and self.window.level_workers.launch(level_number):
+            self.window.level_host = host
+            self.window.set_visible(False)
+            return
 
+        try:
+            host.start(LEVEL_FACTORIES[level_number])
         except Exception as e:
             print(f"Ошибка при запуске уровня {level_number}: {e}")
-
-        # Возвращаем видимость
-        self.window.set_visible(True)
-
-        # Включаем звук с сохраненной громкостью из БД
-        if self.music_stream:
-            try:
-                # Получаем актуальную громкость из БД
-                current_music_volume = self.progress.sound_db.get_volume('music')
-                self.music_stream.volume = current_music_volume
-                print(f"Включен звук с громкостью: {current_music_volume * 100}%")
-            except Exception as e:
-                print(f"Не удалось включить звук: {e}")
-        else:
-            # Если музыки нет, пробуем запустить
-            if self.music_player:
-                current_music_volume = self.progress.sound_db.get_volume('music')
-                if current_music_volume > 0:
-                    self.music_stream = self.music_player.play(
-                        volume=current_music_volume,
-                        loop=True
-                    )
+            host.return_to_menu()
 
     def on_hide_view(self):
         self.ui_manager.disable()
@@ -698,6 +626,64 @@ class LevelSelectView(arcade.View):
                     pass
 
 
+# Запуск уровней внутри окна меню
+class LevelHost:
+    """
+    Показывает вью уровня в окне меню и возвращает в выбор уровней
+    после выхода. Окно, OpenGL контекст, кеш текстур и поток музыки
+    остаются теми же, что и в меню.
+    """
+
+    def __init__(self, window, progress_manager, music_player=None, music_stream=None, click_sound=None):
+        self.window = window
+        self.progress = progress_manager
+        self.music_player = music_player
+        self.music_stream = music_stream
+        self.click_sound = click_sound
+
+    def start(self, create_view):
+        """Создает уровень фабрикой и показывает его"""
+        # Уровни рассчитаны на свой размер окна
+        self.window.set_size(level_1.SCREEN_WIDTH, level_1.SCREEN_HEIGHT)
+        self.show_level(create_view(host=self))
+
+    def show_level(self, game):
+        """Показывает вью уровня (и после перезапуска уровня)"""
+        game.host = self
+        self.window.show_view(game)
+
+    def exit_level(self, game):
+        """Игрок вышел из уровня"""
+        self.return_to_menu()
+
+    def return_to_menu(self):
+        """Возвращает размер окна, музыку и экран выбора уровней"""
+        self.window.set_size(SCREEN_WIDTH, SCREEN_HEIGHT)
+        self.window.background_color = arcade.color.BLACK
+
+        # Включаем звук с сохраненной громкостью из БД
+        current_music_volume = self.progress.sound_db.get_volume('music')
+        if self.music_stream:
+            try:
+                self.music_stream.volume = current_music_volume
+            except Exception as e:
+                print(f"Не удалось включить звук: {e}")
+        elif self.music_player and current_music_volume > 0:
+            # Если музыки нет, пробуем запустить
+            self.music_stream = self.music_player.play(
+                volume=current_music_volume,
+                loop=True
+            )
+
+        level_select_view = LevelSelectView(
+            self.progress,
+            self.music_player,
+            self.music_stream,
+            self.click_sound
+        )
+        self.window.show_view(level_select_view)
+
+
 # Настройки
 class SettingsView(arcade.View):
     def __init__(self, progress_manager, menu_view, music_player=None, music_stream=None, click_sound=None):
@@ -956,6 +942,14 @@ class GameWindow(arcade.Window):
         else:
             print(f"Файл звука клика не найден: {CLICK_SOUND_FILE}")
 
+        # Прогретые процессы для запуска уровней
+        self.level_workers = None
+        self.level_host = None
+        if LEVEL_WORKERS > 0:
+            self.level_workers = LevelWorkerPool(LEVEL_WORKERS)
+            self.level_workers.start()
+            arcade.schedule(self.check_level_workers, 0.25)
+
         # Запускаем главное меню
         menu_view = MainMenuView(
             self.progress_manager,
@@ -965,6 +959,30 @@ class GameWindow(arcade.Window):
         )
         self.show_view(menu_view)
 
+    def check_level_workers(self, delta_time):
+        """Проверяет процессы уровней и возвращает меню после выхода из уровня"""
+        for level_number, exit_code in self.level_workers.poll():
+            print(f"Уровень {level_number} завершен с кодом: {exit_code}")
+
+            if self.level_host and not self.level_workers.busy:
+                self.set_visible(True)
+                self.level_host.return_to_menu()
+                self.level_host = None
+
+    def on_close(self):
+        """
+        Закрытие окна во время уровня возвращает в меню, закрытие
+        меню останавливает процессы уровней
+        """
+        view = self.current_view
+        if isinstance(getattr(view, "host", None), LevelHost):
+            view.exit_level()
+            return
+
+        if self.level_workers:
+            self.level_workers.shutdown()
+        super().on_close()
+
 
 # Запуск игры
 def main():